@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Скрипти імпортують youtube_marketing з каталогу scripts
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
@@ -0,0 +1,68 @@
+import sqlite3
+
+from youtube_marketing.app_database import AppDatabaseWriter
+from youtube_marketing.reports import write_reports
+
+FIRST_COLLECTED_AT = '2024-01-01 00:00:00.000'
+
+
+def _comment(comment_id, likes, quality_level='good', text='Дякую за відео, навчився гальмувати'):
+    return {
+        'comment_id': comment_id,
+        'author': 'Андрій Л.',
+        'author_channel_url': 'http://www.youtube.com/channel/UCtest',
+        'text': text,
+        'published_at': '2024-02-01T10:00:00Z',
+        'like_count': likes,
+        'video_id': 'aaaaaaaaaa1',
+        'video_title': 'Як правильно входити в повороти',
+        'video_url': 'https://www.youtube.com/watch?v=aaaaaaaaaa1',
+        'marketing_classification': {
+            'quality_level': quality_level, 'score': 7.0, 'categories': ['testimonial'],
+            'is_marketing_worthy': True
+        }
+    }
+
+
+def _rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return {row[0]: row[1:] for row in conn.execute(
+            'SELECT "id", "likeCount", "qualityLevel", "text", "source", "collectedAt", "updatedAt" '
+            'FROM "YouTubeComment"'
+        )}
+    finally:
+        conn.close()
+
+
+def test_reingest_updates_rows_and_keeps_collected_at(tmp_path):
+    path = str(tmp_path / 'app.db')
+
+    writer = AppDatabaseWriter(path, source='scraper', batch_size=2)
+    write_reports([_comment('c1', 3), _comment('c2', 0), _comment('c3', 1)], [writer])
+    assert writer.total == 3
+    assert len(_rows(path)) == 3
+
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute('UPDATE "YouTubeComment" SET "collectedAt" = ?, "updatedAt" = ?',
+                     (FIRST_COLLECTED_AT, FIRST_COLLECTED_AT))
+    conn.close()
+
+    # Ті самі comment_id з новими лайками, рівнем і текстом + дубль у тій самій пачці
+    writer = AppDatabaseWriter(f'sqlite:///{path}', source='api', batch_size=2)
+    write_reports([
+        _comment('c1', 10, 'excellent', 'Оновлений текст'),
+        _comment('c1', 12, 'excellent', 'Оновлений текст'),
+        _comment('c4', 5)
+    ], [writer])
+
+    rows = _rows(path)
+    assert sorted(rows) == ['c1', 'c2', 'c3', 'c4']
+    likes, quality_level, text, source, collected_at, updated_at = rows['c1']
+    assert (likes, quality_level, text, source) == (12, 'excellent', 'Оновлений текст', 'api')
+    assert collected_at == FIRST_COLLECTED_AT
+    assert updated_at > FIRST_COLLECTED_AT
+    # Коментарі, яких не було в повторному завантаженні, не змінюються
+    assert rows['c2'][3:] == ('scraper', FIRST_COLLECTED_AT, FIRST_COLLECTED_AT)
+    assert rows['c4'][4] > FIRST_COLLECTED_AT
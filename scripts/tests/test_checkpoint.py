@@ -0,0 +1,97 @@
+import os
+import sqlite3
+import importlib.util
+from datetime import datetime, timedelta
+
+from youtube_marketing.checkpoint import CheckpointStore, is_new_or_edited, reached_watermark
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _comment(comment_id, published_at, updated_at=None, text='Дякую за відео'):
+    return {
+        'id': comment_id,
+        'snippet': {'topLevelComment': {'snippet': {
+            'authorDisplayName': 'Андрій Л.',
+            'textDisplay': text,
+            'publishedAt': published_at,
+            'updatedAt': updated_at or published_at,
+            'likeCount': 1
+        }}}
+    }
+
+
+def _age_full_walk(path, video_id, days):
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("UPDATE videos SET full_walk_at = ? WHERE video_id = ?",
+                     ((datetime.now() - timedelta(days=days)).isoformat(), video_id))
+    conn.close()
+
+
+def test_watermarks():
+    state = {'last_published_at': '2024-02-01T00:00:00Z', 'last_updated_at': '2024-02-01T00:00:00Z'}
+
+    assert is_new_or_edited({}, '2024-01-01T00:00:00Z', None)
+    assert is_new_or_edited(state, '2024-02-02T00:00:00Z', '2024-02-02T00:00:00Z')
+    assert is_new_or_edited(state, '2024-01-01T00:00:00Z', '2024-03-01T00:00:00Z')
+    assert not is_new_or_edited(state, '2024-01-01T00:00:00Z', '2024-01-01T00:00:00Z')
+    assert reached_watermark(state, '2024-02-01T00:00:00Z')
+    assert not reached_watermark({}, '2024-02-01T00:00:00Z')
+
+
+def test_rewalk_due_after_period(tmp_path):
+    path = str(tmp_path / 'checkpoint.db')
+    store = CheckpointStore(path, rewalk_days=7)
+    store.save_page('v1', None, [{'comment_id': 'c1', 'published_at': '2024-01-01T00:00:00Z'}], None, 'relevance')
+    store.mark_video_done('v1', None, 1, full_walk=True)
+    assert not store.is_rewalk_due(store.get_video_state('v1'))
+
+    # Дозбір до водяного знака не оновлює час повного проходу
+    _age_full_walk(path, 'v1', 8)
+    store.mark_video_done('v1', None, 1)
+    assert store.is_rewalk_due(store.get_video_state('v1'))
+
+    assert not CheckpointStore(path, rewalk_days=0).is_rewalk_due(store.get_video_state('v1'))
+    assert not store.is_rewalk_due({})
+
+
+def test_rewalk_picks_up_edited_old_comment(tmp_path, monkeypatch):
+    monkeypatch.setenv('YOUTUBE_API_KEY', 'test')
+    spec = importlib.util.spec_from_file_location(
+        'simple_collector', os.path.join(SCRIPTS_DIR, 'youtube-simple-collector.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    path = str(tmp_path / 'checkpoint.db')
+    pages = {'items': [_comment('c2', '2024-02-01T00:00:00Z'), _comment('c1', '2024-01-01T00:00:00Z')]}
+    orders = []
+
+    def api_get(endpoint, params):
+        assert endpoint == 'commentThreads'
+        orders.append(params['order'])
+        return pages
+
+    def collect(comment_count):
+        collector = module.SimpleYouTubeCollector(checkpoint=CheckpointStore(path, rewalk_days=7))
+        collector.api_get = api_get
+        return {c['comment_id']: c for c in collector.get_video_comments('v1', 'Відео', comment_count)}
+
+    assert set(collect(2)) == {'c1', 'c2'}
+    # Старший коментар відредаговано: commentCount той самий, тож без повного проходу відео пропускається
+    pages = {'items': [_comment('c2', '2024-02-01T00:00:00Z'),
+                       _comment('c1', '2024-01-01T00:00:00Z', '2024-03-01T00:00:00Z', 'Дякую, оновлено')]}
+    assert collect(2)['c1']['text'] == 'Дякую за відео'
+    assert orders == ['relevance']
+
+    _age_full_walk(path, 'v1', 8)
+    comments = collect(2)
+    assert orders == ['relevance', 'relevance']
+    assert comments['c1']['text'] == 'Дякую, оновлено'
+    assert comments['c1']['updated_at'] == '2024-03-01T00:00:00Z'
+
+    # Після повного проходу - знову дозбір до водяного знака
+    pages = {'items': [_comment('c3', '2024-04-01T00:00:00Z'), _comment('c2', '2024-02-01T00:00:00Z')]}
+    assert set(collect(3)) == {'c1', 'c2', 'c3'}
+    assert orders[-1] == 'time'
+
@@ -0,0 +1,27 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from youtube_marketing.corpus_store import parse_timestamp
+
+
+@pytest.mark.parametrize('value', ['2024-02-01T10:00:00Z', '2024-02-01T10:00:00+00:00', '2024-02-01T12:00:00+02:00'])
+def test_parse_timestamp_api_times(value):
+    assert parse_timestamp(value) == datetime(2024, 2, 1, 10, 0, tzinfo=timezone.utc)
+
+
+def test_parse_timestamp_scraper_date():
+    assert parse_timestamp('2024-01-15') == datetime(2024, 1, 15, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize('value', [None, '', '15 січня 2024'])
+def test_parse_timestamp_unknown(value):
+    assert parse_timestamp(value) is None
+
+
+def test_query_rejects_invalid_bounds(tmp_path):
+    pytest.importorskip('pyarrow')
+    from youtube_marketing.corpus_store import CorpusStore
+
+    with pytest.raises(ValueError):
+        CorpusStore(str(tmp_path)).query(since='вчора')
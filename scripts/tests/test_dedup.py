@@ -0,0 +1,33 @@
+from youtube_marketing.dedup import Deduplicator
+from youtube_marketing.reports import ReportWriter, write_reports
+
+
+class ListWriter(ReportWriter):
+    def __init__(self):
+        self.comments = []
+
+    def add(self, comment):
+        self.comments.append(comment)
+
+
+def _comments():
+    text = 'Дякую за відео! Завдяки вам я навчився правильно гальмувати на мотоциклі'
+    return [
+        {'comment_id': 'c1', 'text': text},
+        {'comment_id': 'c2', 'text': 'Найкращий канал про мотобезпеку, рекомендую всім початківцям'},
+        {'comment_id': 'c3', 'text': text + '!'},
+    ]
+
+
+def test_grouped_and_canonical_writers():
+    deduplicator = Deduplicator(3)
+    full, best, stored = ListWriter(), ListWriter(), ListWriter()
+    write_reports(deduplicator.annotate(_comments()),
+                  [full, deduplicator.writer(best), deduplicator.stored(stored)])
+
+    assert full.comments == _comments()
+    assert [(c['comment_id'], c['occurrences']) for c in best.comments] == [('c1', 2), ('c2', 1)]
+    assert [(c['comment_id'], c.get('occurrences', 1), c.get('duplicate_of')) for c in stored.comments] == [
+        ('c1', 2, None), ('c2', 1, None), ('c3', 2, 'c1')
+    ]
+    assert deduplicator.folded == 1
@@ -0,0 +1,91 @@
+import os
+import json
+
+import pytest
+
+from conftest import FIXTURES_DIR
+from youtube_marketing.playlist_page import (
+    extract_initial_data, extract_ytcfg, parse_playlist_items, scrape_playlist
+)
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def _continuation_page():
+    return json.loads(_fixture('playlist_continuation.json'))
+
+
+def test_parse_first_page():
+    data = extract_initial_data(_fixture('playlist_page.html'))
+    videos, continuation = parse_playlist_items(data)
+
+    assert [video['video_id'] for video in videos] == ['aaaaaaaaaa1', 'aaaaaaaaaa2']
+    assert videos[0]['title'] == 'Як правильно входити в повороти'
+    assert videos[1]['title'] == 'Екстрене гальмування: практичні вправи'
+    assert videos[0]['url'] == 'https://www.youtube.com/watch?v=aaaaaaaaaa1'
+    assert continuation == 'TOKEN-PAGE-2'
+
+
+def test_parse_continuation_page():
+    videos, continuation = parse_playlist_items(_continuation_page())
+
+    assert [video['video_id'] for video in videos] == ['aaaaaaaaaa2', 'aaaaaaaaaa3', 'aaaaaaaaaa4']
+    assert videos[1]['title'] == 'Посадка і положення тіла'
+    assert continuation is None
+
+
+def test_extract_ytcfg_merges_all_calls():
+    config = extract_ytcfg(_fixture('playlist_page.html'))
+
+    assert config['INNERTUBE_API_KEY'] == 'AIzaTestKey'
+    assert config['EXPERIMENT_FLAGS'] == {'web_player': True}
+
+
+def test_scrape_playlist_follows_continuations():
+    requests = []
+
+    def fetch(params, payload):
+        requests.append((params, payload))
+        return _continuation_page()
+
+    videos = scrape_playlist(_fixture('playlist_page.html'), fetch)
+
+    assert [video['video_id'] for video in videos] == ['aaaaaaaaaa1', 'aaaaaaaaaa2', 'aaaaaaaaaa3', 'aaaaaaaaaa4']
+    assert len(requests) == 1
+    params, payload = requests[0]
+    assert params == {'prettyPrint': 'false', 'key': 'AIzaTestKey'}
+    assert payload['continuation'] == 'TOKEN-PAGE-2'
+    assert payload['context']['client']['hl'] == 'uk'
+
+
+def test_scrape_playlist_max_videos_skips_continuation():
+    def fetch(params, payload):
+        raise AssertionError("продовження не потрібне")
+
+    videos = scrape_playlist(_fixture('playlist_page.html'), fetch, max_videos=1)
+
+    assert [video['video_id'] for video in videos] == ['aaaaaaaaaa1']
+
+
+def test_scrape_playlist_keeps_videos_when_continuation_fails():
+    def fetch(params, payload):
+        raise ConnectionError("timeout")
+
+    videos = scrape_playlist(_fixture('playlist_page.html'), fetch)
+
+    assert [video['video_id'] for video in videos] == ['aaaaaaaaaa1', 'aaaaaaaaaa2']
+
+
+def test_scrape_playlist_without_initial_data():
+    assert scrape_playlist('<html><body>Before you continue to YouTube</body></html>', None) == []
+
+
+def test_scrape_playlist_strict_raises_when_continuation_fails():
+    def fetch(params, payload):
+        raise ConnectionError("timeout")
+
+    with pytest.raises(ConnectionError):
+        scrape_playlist(_fixture('playlist_page.html'), fetch, partial=False)
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from youtube_marketing.http_client import HttpError, HttpResponse
+from youtube_marketing.quota import QuotaExhausted, QuotaScheduler, quota_day
+
+
+def _http_error(status, reason):
+    body = json.dumps({'error': {'code': status, 'errors': [{'reason': reason}]}}).encode('utf-8')
+    return HttpError(HttpResponse('https://www.googleapis.com/youtube/v3/commentThreads', status, {}, body, 0.0))
+
+
+def _failing(error):
+    calls = []
+
+    def request():
+        calls.append(1)
+        raise error
+    return request, calls
+
+
+@pytest.mark.parametrize('reason', ['quotaExceeded', 'dailyLimitExceeded'])
+def test_server_quota_exceeded_raises_quota_exhausted(tmp_path, reason):
+    usage_path = str(tmp_path / 'quota_usage.json')
+    scheduler = QuotaScheduler(daily_budget=100, usage_path=usage_path, base_delay=0)
+    request, calls = _failing(_http_error(403, reason))
+
+    with pytest.raises(QuotaExhausted):
+        scheduler.call('commentThreads', request)
+    assert len(calls) == 1
+
+    # Локальний бюджет вважається витраченим: наступні запити не виконуються, і в інших процесах теж
+    with pytest.raises(QuotaExhausted):
+        scheduler.call('commentThreads', lambda: {})
+    with open(usage_path, encoding='utf-8') as f:
+        assert json.load(f)[quota_day()] == 100
+    with pytest.raises(QuotaExhausted):
+        QuotaScheduler(daily_budget=100, usage_path=usage_path).call('videos', lambda: {})
+
+
+def test_other_forbidden_errors_are_not_quota():
+    scheduler = QuotaScheduler(daily_budget=100, base_delay=0)
+    request, calls = _failing(_http_error(403, 'commentsDisabled'))
+
+    with pytest.raises(HttpError):
+        scheduler.call('commentThreads', request)
+    assert len(calls) == 1
+    assert scheduler.call('commentThreads', lambda: {'items': []}) == {'items': []}
+
+
+def test_rate_limit_is_retried():
+    scheduler = QuotaScheduler(daily_budget=100, max_retries=2, base_delay=0)
+    request, calls = _failing(_http_error(403, 'rateLimitExceeded'))
+
+    with pytest.raises(HttpError):
+        scheduler.call('commentThreads', request)
+    assert len(calls) == 3
@@ -0,0 +1,68 @@
+import os
+import json
+import importlib.util
+from argparse import Namespace
+from collections import Counter
+
+from conftest import FIXTURES_DIR
+from youtube_marketing.sink import read_json_header
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _load_script():
+    spec = importlib.util.spec_from_file_location(
+        'rescore_comments', os.path.join(SCRIPTS_DIR, 'youtube-rescore-comments.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _comment(comment_id, text, level):
+    return {'comment_id': comment_id, 'author': 'Андрій Л.', 'text': text, 'like_count': 0,
+            'video_title': 'Екстрене гальмування', 'quality': {'category': level, 'score': 0}}
+
+
+def test_rescore_json_recounts_header(tmp_path):
+    source, target = str(tmp_path / 'best.json'), str(tmp_path / 'rescored.json')
+    comments = [
+        _comment('c1', 'ok', 'excellent'),
+        _comment('c2', 'Дякую за відео! Завдяки вам я навчився правильно гальмувати і тепер '
+                       'впевнено їжджу містом вже 3 місяці, рекомендую всім початківцям', 'good'),
+    ]
+    with open(source, 'w', encoding='utf-8') as f:
+        json.dump({'collection_date': '2024-01-01', 'excellent_comments': 1, 'good_comments': 1,
+                   'comments': comments}, f, ensure_ascii=False, indent=2)
+
+    module = _load_script()
+    args = Namespace(processes=1, shard_size=1)
+    assert module.rescore_json(source, target, args, None, None, Counter()) == 2
+
+    with open(target, encoding='utf-8') as f:
+        document = json.load(f)
+    levels = [comment['quality']['category'] for comment in document['comments']]
+    assert levels[0] != 'excellent'
+    assert document['excellent_comments'] == levels.count('excellent')
+    assert document['good_comments'] == levels.count('good')
+    assert document['collection_date'] == '2024-01-01'
+    assert 'total_comments' not in document
+
+
+def test_rescore_json_plain_list(tmp_path):
+    source, target = str(tmp_path / 'list.json'), str(tmp_path / 'rescored.json')
+    with open(source, 'w', encoding='utf-8') as f:
+        json.dump([_comment('c1', 'ok', 'excellent')], f)
+
+    assert _load_script().rescore_json(source, target, Namespace(processes=1, shard_size=10),
+                                       None, None, Counter()) == 1
+    with open(target, encoding='utf-8') as f:
+        rescored = json.load(f)
+    assert [comment['comment_id'] for comment in rescored] == ['c1']
+    assert read_json_header(target) == (None, True)
+
+
+def test_read_json_header_skips_list():
+    path = os.path.join(FIXTURES_DIR, 'header.json')
+    assert read_json_header(path) == ({'collected_at': '2024-01-01', 'total_comments': 2, 'tail': [1]}, True)
+    assert read_json_header(path, 'videos') == (
+        {'collected_at': '2024-01-01', 'total_comments': 2, 'comments': [{'id': 1}, {'id': 2}], 'tail': [1]}, False)
@@ -0,0 +1,46 @@
+import json
+
+from youtube_marketing.snapshot_diff import DeltaSummary, diff_snapshots, has_comment_ids
+
+
+def _comment(comment_id, text, likes):
+    comment = {'video_id': 'aaaaaaaaaa1', 'video_title': 'Екстрене гальмування', 'author': 'Андрій Л.',
+               'text': text, 'like_count': likes, 'quality': {'category': 'good'}}
+    if comment_id:
+        comment['comment_id'] = comment_id
+    return comment
+
+
+def _write(path, comments):
+    with open(path, 'w', encoding='utf-8') as f:
+        for comment in comments:
+            f.write(json.dumps(comment, ensure_ascii=False) + '\n')
+    return str(path)
+
+
+def _summary(old, new, **kwargs):
+    summary = DeltaSummary()
+    for change in diff_snapshots(old, new, **kwargs):
+        summary.add(change)
+    return summary.counts
+
+
+def test_old_snapshot_without_ids_is_matched_by_content(tmp_path):
+    old = _write(tmp_path / 'old.jsonl', [_comment(None, 'Дякую', 1), _comment(None, 'Клас', 2)])
+    new = _write(tmp_path / 'new.jsonl', [_comment('c1', 'Дякую', 3), _comment('c2', 'Клас', 2),
+                                          _comment('c3', 'Новий', 0)])
+
+    assert not has_comment_ids(old)
+    assert has_comment_ids(new)
+    counts = _summary(old, new)
+    assert (counts['new'], counts['removed'], counts['likes_changed'], counts['unchanged']) == (1, 0, 1, 1)
+
+
+def test_snapshots_with_ids_detect_edits(tmp_path):
+    old = _write(tmp_path / 'old.jsonl', [_comment('c1', 'Дякую', 1)])
+    new = _write(tmp_path / 'new.jsonl', [_comment('c1', 'Дякую, оновлено', 1)])
+
+    counts = _summary(old, new)
+    assert (counts['new'], counts['removed'], counts['edited']) == (0, 0, 1)
+    counts = _summary(old, new, by_content=True)
+    assert (counts['new'], counts['removed'], counts['edited']) == (1, 1, 0)
@@ -5,259 +5,826 @@ YouTube Comments Collector using YouTube Data API
 """
 
 import os
-import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional
-from googleapiclient.discovery import build
+from typing import Callable, List, Dict, Optional
 from googleapiclient.errors import HttpError
 
+from youtube_marketing.classification import classify_for_marketing
+from youtube_marketing.batch import classify_batch_for_marketing
+from youtube_marketing.sink import JsonlCommentStream, open_comments_store
+from youtube_marketing.records import CommentRecord, MarketingClassification, VideoRef, VideoTable
+from youtube_marketing.jobs import DEFAULT_PLAYLIST_ID, load_job_spec, run_sharded, merge_shards
+from youtube_marketing.response_cache import (
+    ResponseCache, CachedHttplib2, add_cache_arguments, cache_from_args
+)
+from youtube_marketing.reports import (
+    write_reports, ReportWriter, JsonReportWriter, CategoryReportWriter, MarkdownReportWriter
+)
+from youtube_marketing.checkpoint import DEFAULT_REWALK_DAYS, CheckpointStore, is_new_or_edited, reached_watermark
+from youtube_marketing.metadata import VIDEOS_BATCH_SIZE, fetch_videos_metadata, apply_metadata
+from youtube_marketing.pipeline import Pipeline, PipelineStage, format_pipeline_stats
+from youtube_marketing.search_index import add_index_arguments
+from youtube_marketing.app_database import add_app_database_arguments, app_database_url_from_args
+from youtube_marketing.corpus_store import add_corpus_arguments, corpus_dir_from_args
+from youtube_marketing.storage import storage_writers, print_storage
+from youtube_marketing.dedup import DEFAULT_MAX_DISTANCE, Deduplicator, add_dedup_arguments, dedup_distance_from_args
+from youtube_marketing.metrics import Metrics, add_metrics_arguments, export_metrics
+from youtube_marketing.discovery import build_youtube_client, discovery_path, is_discovery_cached
+from youtube_marketing.quota import (
+    QuotaScheduler, QuotaExhausted, add_quota_arguments, scheduler_from_args, format_quota_stats
+)
+from youtube_marketing.watch import (
+    DEFAULT_PLAYLIST_REFRESH, DEFAULT_WATCH_CHECKPOINT, DEFAULT_WATCH_STREAM,
+    WatchSchedule, BudgetPacer, add_watch_arguments, check_cost, sleep_seconds
+)
+
+
 class YouTubeAPICollector:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, workers: int = 1,
+                 requests_per_second: Optional[float] = None,
+                 checkpoint: Optional[CheckpointStore] = None,
+                 stream_path: Optional[str] = None,
+                 cache: Optional[ResponseCache] = None,
+                 quota: Optional[QuotaScheduler] = None,
+                 max_comments: Optional[int] = 100, include_replies: bool = False,
+                 reply_workers: int = 4, prefetch_metadata: bool = True, queue_size: int = 4,
+                 playlist_id: Optional[str] = None,
+                 dedup_distance: Optional[int] = DEFAULT_MAX_DISTANCE,
+                 search_index: Optional[str] = None, app_database: Optional[str] = None,
+                 corpus_dir: Optional[str] = None, corpus_format: str = 'parquet',
+                 metrics: Optional[Metrics] = None):
         self.api_key = api_key or os.getenv('YOUTUBE_API_KEY')
         if not self.api_key:
-            raise ValueError("YouTube API key не знайдено. Встановіть YOUTUBE_API_KEY")
+            if not (cache and cache.offline):
+                raise ValueError("YouTube API key не знайдено. Встановіть YOUTUBE_API_KEY")
+            self.api_key = 'offline'  # Ключ не входить у ключ кешу, тож повтор працює без нього
         
-        self.youtube = build('youtube', 'v3', developerKey=self.api_key)
-        self.comments_data = []
-        self.playlist_id = "PLNz8wZnk2_6WvkuOVxq-wubNOPGHYTfk3"
+        self.cache = cache
+        # Клієнт API створюється при першому запиті (googleapiclient імпортується лише тоді)
+        self._youtube = None
+        # Список у пам'яті або JSONL потік (--stream), що пишеться одразу після класифікації
+        self.comments_data = open_comments_store(stream_path)
+        # Поля відео (ID, назва, URL) один раз на відео, спільні для всіх його коментарів
+        self.videos = VideoTable()
+        self.playlist_id = playlist_id or DEFAULT_PLAYLIST_ID
+        # Майже однакові коментарі (копіпаст, боти) згортаються у звітах (None - не згортати)
+        self.dedup_distance = dedup_distance
+        # SQLite база з повнотекстовим пошуком по всій історії (None - не вести)
+        self.search_index = search_index
+        # База сайту (таблиця YouTubeComment), куди коментарі завантажуються пачками
+        self.app_database = app_database
+        # Колонковий корпус (Parquet/Arrow) з розділами за датою збору і відео (None - не вести)
+        self.corpus_dir = corpus_dir
+        self.corpus_format = corpus_format
+
+        # Налаштування паралельного збору коментарів (queue_size - глибина черг між етапами)
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        # Швидкість, денний бюджет квоти і повтори тимчасових помилок (спільні для всіх потоків)
+        self.quota = quota or QuotaScheduler(requests_per_second, cache=cache)
+        # Таймери, лічильники і гістограми запуску (експортуються в main)
+        self.metrics = metrics or Metrics('api')
+        if self.quota.metrics is None:
+            self.quota.metrics = self.metrics
+        self.pages_fetched = 0
+        self.reply_pages_fetched = 0
+        self._stats_lock = threading.Lock()
+        self._thread_local = threading.local()
+
+        # Ліміт коментарів на відео (None або 0 - без обмеження) і збір відповідей
+        self.max_comments = max_comments or None
+        self.include_replies = include_replies
+        # Спільний пул для сторінок відповідей усіх гілок (і всіх відео)
+        self._reply_pool = ThreadPoolExecutor(max_workers=max(1, reply_workers)) if include_replies else None
+
+        # Попередній videos.list: відео без нових коментарів не обходимо
+        self.prefetch_metadata = prefetch_metadata
+        self.skipped_videos = 0
+
+        # Контрольні точки для інкрементального збору (None - збір з нуля)
+        self.checkpoint = checkpoint
+        self.run_id = None
+
+    @property
+    def youtube(self):
+        if self._youtube is None:
+            self._youtube = self._build_client()
+        return self._youtube
+
+    def _build_client(self):
+        """Створює клієнт API з локального discovery документа (через кеш відповідей, якщо він увімкнений)"""
+        if self.cache:
+            import httplib2
+            return build_youtube_client(self.api_key, http=CachedHttplib2(httplib2.Http(), self.cache))
+        return build_youtube_client(self.api_key)
+
+    def _client(self):
+        """Повертає клієнт API для поточного потоку (httplib2 не потокобезпечний)"""
+        if threading.current_thread() is threading.main_thread():
+            return self.youtube
+
+        client = getattr(self._thread_local, 'youtube', None)
+        if client is None:
+            client = self._build_client()
+            self._thread_local.youtube = client
+        return client
+
+    def _count_page(self, replies: bool = False):
+        """Рахує завантажені сторінки коментарів для статистики пропускної здатності"""
+        with self._stats_lock:
+            if replies:
+                self.reply_pages_fetched += 1
+            else:
+                self.pages_fetched += 1
+        self.metrics.inc('comment_pages', kind='replies' if replies else 'threads')
+
+    @staticmethod
+    def _comment_record(comment_id: str, comment_data: Dict, video: VideoRef) -> CommentRecord:
+        """Перетворює snippet коментаря API на запис збирача"""
+        published_at = comment_data['publishedAt']
+        return CommentRecord(
+            video,
+            comment_id=comment_id,
+            author=comment_data['authorDisplayName'],
+            author_channel_url=comment_data['authorChannelUrl'],
+            text=comment_data['textDisplay'],
+            published_at=published_at,
+            updated_at=comment_data.get('updatedAt', published_at),
+            like_count=comment_data['likeCount']
+        )
+
+    def get_thread_replies(self, parent_id: str) -> List[Dict]:
+        """Отримує всі відповіді гілки через comments.list (сторінками по 100)"""
+        replies = []
+        next_page_token = None
+
+        while True:
+            response = self.quota.call('comments', self._client().comments().list(
+                part='snippet',
+                parentId=parent_id,
+                maxResults=100,
+                pageToken=next_page_token
+            ).execute)
+            self._count_page(replies=True)
+
+            replies.extend(response.get('items', []))
+            next_page_token = response.get('nextPageToken')
+            if not next_page_token:
+                return replies
+
+    def _thread_replies(self, items: List[Dict]) -> List[List[Dict]]:
+        """
+        Відповіді для кожної гілки сторінки: вбудовані в commentThreads, якщо їх там
+        усі, інакше повний список через comments.list (паралельно для всіх таких гілок)
+        """
+        incomplete = [
+            item['id'] for item in items
+            if item['snippet'].get('totalReplyCount', 0) > len(item.get('replies', {}).get('comments', []))
+        ]
+        fetched = dict(zip(incomplete, self._reply_pool.map(self.get_thread_replies, incomplete)))
+
+        return [
+            fetched[item['id']] if item['id'] in fetched else item.get('replies', {}).get('comments', [])
+            for item in items
+        ]
     
     def get_playlist_videos(self) -> List[Dict]:
-        """Отримує всі відео з плейлиста"""
+        """
+        Отримує всі відео з плейлиста. Помилка API на будь-якій сторінці передається
+        далі: неповний список не повинен стати знімком запуску в контрольній точці.
+        """
         videos = []
         next_page_token = None
         
-        try:
-            while True:
-                playlist_response = self.youtube.playlistItems().list(
-                    part='snippet',
-                    playlistId=self.playlist_id,
-                    maxResults=50,
-                    pageToken=next_page_token
-                ).execute()
-                
-                for item in playlist_response.get('items', []):
-                    video_info = {
-                        'video_id': item['snippet']['resourceId']['videoId'],
-                        'title': item['snippet']['title'],
-                        'published_at': item['snippet']['publishedAt']
-                    }
-                    videos.append(video_info)
-                
-                next_page_token = playlist_response.get('nextPageToken')
-                if not next_page_token:
-                    break
-                    
-        except HttpError as e:
-            print(f"Помилка API: {e}")
+        while True:
+            playlist_response = self.quota.call('playlistItems', self.youtube.playlistItems().list(
+                part='snippet',
+                playlistId=self.playlist_id,
+                maxResults=50,
+                pageToken=next_page_token
+            ).execute)
+            
+            for item in playlist_response.get('items', []):
+                video_info = {
+                    'video_id': item['snippet']['resourceId']['videoId'],
+                    'title': item['snippet']['title'],
+                    'published_at': item['snippet']['publishedAt']
+                }
+                videos.append(video_info)
+            
+            next_page_token = playlist_response.get('nextPageToken')
+            if not next_page_token:
+                break
             
         return videos
     
-    def get_video_comments(self, video_id: str, video_title: str) -> List[Dict]:
+    def get_videos_metadata(self, video_ids: List[str]) -> Dict[str, Dict]:
+        """Назви та статистика відео пачками по 50 (videos.list)"""
+        return fetch_videos_metadata(video_ids, lambda ids: self.quota.call('videos', self.youtube.videos().list(
+            part='snippet,statistics',
+            id=','.join(ids),
+            maxResults=len(ids)
+        ).execute))
+
+    def get_videos(self) -> List[Dict]:
+        """Відео плейлиста разом з кількістю коментарів (для пропуску незмінених відео)"""
+        with self.metrics.timer('stage_seconds', stage='playlist'):
+            videos = self.get_playlist_videos()
+        if self.prefetch_metadata and videos:
+            try:
+                with self.metrics.timer('stage_seconds', stage='metadata'):
+                    metadata = self.get_videos_metadata([v['video_id'] for v in videos])
+                apply_metadata(videos, metadata)
+            except HttpError as e:
+                print(f"Помилка API при отриманні метаданих відео: {e}")
+        return videos
+
+    def get_video_comments(self, video_id: str, video_title: str,
+                           comment_count: Optional[int] = None) -> List[Dict]:
         """Отримує коментарі для конкретного відео"""
         comments = []
-        next_page_token = None
-        
+        state = self.checkpoint.get_video_state(video_id) if self.checkpoint else {}
+
+        if self.checkpoint and self.checkpoint.is_video_done(state, self.run_id):
+            return self.checkpoint.load_comments(video_id, self.videos)
+
+        # Час повного проходу: лише так видно відредаговані старші коментарі
+        rewalk = bool(self.checkpoint) and self.checkpoint.is_rewalk_due(state)
+
+        # Коментарів немає або їх кількість не змінилась - commentThreads не потрібен
+        if comment_count == 0 or (self.checkpoint and not rewalk
+                                  and self.checkpoint.is_video_unchanged(state, comment_count)):
+            with self._stats_lock:
+                self.skipped_videos += 1
+            if self.checkpoint:
+                self.checkpoint.mark_video_done(video_id, self.run_id, comment_count)
+                return self.checkpoint.load_comments(video_id, self.videos)
+            return []
+
+        if self.checkpoint:
+            next_page_token = self.checkpoint.resume_token(state, self.run_id)
+        else:
+            next_page_token = None
+
+        # Після першого збору завантажуємо лише нове: від найновіших до водяного знака
+        if next_page_token:
+            order = state.get('page_order') or 'relevance'
+        else:
+            order = 'time' if state.get('last_published_at') and not rewalk else 'relevance'
+
+        video = self.videos.get(video_id, video_title)
         try:
-            while len(comments) < 100:  # Обмежуємо до 100 коментарів на відео
-                comments_response = self.youtube.commentThreads().list(
-                    part='snippet',
+            while not self.max_comments or len(comments) < self.max_comments:
+                comments_response = self.quota.call('commentThreads', self._client().commentThreads().list(
+                    part='snippet,replies' if self.include_replies else 'snippet',
                     videoId=video_id,
                     maxResults=100,
                     pageToken=next_page_token,
-                    order='relevance'  # Найбільш релевантні коментарі
-                ).execute()
+                    order=order  # Найбільш релевантні коментарі (або найновіші при дозборі)
+                ).execute)
+                self._count_page()
                 
+                items = []
+                reached_known = False
                 for item in comments_response.get('items', []):
                     comment_data = item['snippet']['topLevelComment']['snippet']
-                    
-                    comment = {
-                        'author': comment_data['authorDisplayName'],
-                        'author_channel_url': comment_data['authorChannelUrl'],
-                        'text': comment_data['textDisplay'],
-                        'published_at': comment_data['publishedAt'],
-                        'updated_at': comment_data.get('updatedAt', comment_data['publishedAt']),
-                        'like_count': comment_data['likeCount'],
-                        'video_id': video_id,
-                        'video_title': video_title,
-                        'video_url': f"https://www.youtube.com/watch?v={video_id}"
-                    }
-                    
-                    comments.append(comment)
+                    published_at = comment_data['publishedAt']
+                    updated_at = comment_data.get('updatedAt', published_at)
+
+                    if order == 'time' and reached_watermark(state, published_at):
+                        reached_known = True
+                    if not is_new_or_edited(state, published_at, updated_at):
+                        continue
+                    items.append(item)
+
+                replies = self._thread_replies(items) if self.include_replies else [[] for _ in items]
+
+                page = []
+                for item, thread_replies in zip(items, replies):
+                    comment_data = item['snippet']['topLevelComment']['snippet']
+                    page.append(self._comment_record(item['id'], comment_data, video))
+
+                    # Відповіді йдуть одразу після свого коментаря
+                    for reply in thread_replies:
+                        record = self._comment_record(reply['id'], reply['snippet'], video)
+                        record['parent_id'] = item['id']
+                        page.append(record)
                 
-                next_page_token = comments_response.get('nextPageToken')
+                comments.extend(page)
+                next_page_token = None if reached_known else comments_response.get('nextPageToken')
+                if self.checkpoint:
+                    self.checkpoint.save_page(video_id, self.run_id, page, next_page_token, order)
                 if not next_page_token:
                     break
                     
         except HttpError as e:
             print(f"Помилка при отриманні коментарів для відео {video_id}: {e}")
+            return comments
+
+        if self.checkpoint:
+            self.checkpoint.mark_video_done(video_id, self.run_id, comment_count, full_walk=order != 'time')
+            return self.checkpoint.load_comments(video_id, self.videos)
             
         return comments
     
     def classify_comment_for_marketing(self, comment: Dict) -> Dict:
         """Класифікує коментар для маркетингових цілей"""
-        text = comment['text'].lower()
-        
-        # Маркетингові категорії
-        categories = {
-            'testimonial': {
-                'keywords': ['завдяки', 'благодаря', 'thanks to', 'допомогло', 'helped', 
-                           'врятувало', 'saved', 'навчився', 'learned', 'тепер я', 'now i'],
-                'weight': 5
-            },
-            'positive_feedback': {
-                'keywords': ['чудово', 'excellent', 'найкращ', 'best', 'рекомендую', 
-                           'recommend', 'корисно', 'useful', 'дякую', 'thanks'],
-                'weight': 3
-            },
-            'success_story': {
-                'keywords': ['вдалося', 'managed', 'зміг', 'досяг', 'achieved', 
-                           'результат', 'result', 'покращ', 'improved'],
-                'weight': 4
-            },
-            'emotional': {
-                'keywords': ['❤️', '🔥', '💪', '🏍️', 'люблю', 'love', 'захват', 'amazing'],
-                'weight': 2
-            },
-            'specific_benefit': {
-                'keywords': ['безпека', 'safety', 'впевнен', 'confident', 'професіонал', 
-                           'professional', 'досвід', 'experience'],
-                'weight': 4
-            }
-        }
-        
-        score = 0
-        matched_categories = []
-        
-        # Базові бали за характеристики
-        if len(text) > 100:
-            score += 2
-        if comment['like_count'] > 5:
-            score += 2
-        if comment['like_count'] > 20:
-            score += 3
-            
-        # Перевірка категорій
-        for category, data in categories.items():
-            for keyword in data['keywords']:
-                if keyword in text:
-                    score += data['weight']
-                    matched_categories.append(category)
-                    break
-        
-        # Визначення рівня якості
-        if score >= 10:
-            quality_level = 'excellent'
-        elif score >= 6:
-            quality_level = 'good'
-        elif score >= 3:
-            quality_level = 'moderate'
-        else:
-            quality_level = 'low'
-            
-        return {
-            'score': score,
-            'quality_level': quality_level,
-            'categories': list(set(matched_categories)),
-            'is_marketing_worthy': score >= 6
-        }
+        return classify_for_marketing(comment)
     
+    def dry_run(self):
+        """Показує, що буде зібрано, без жодного запиту до API"""
+        print("🧪 Пробний запуск (без запитів до API)")
+        print(f"   📋 Плейлист: {self.playlist_id}")
+        print(f"   🧵 Потоків: {self.workers}, коментарів на відео: {self.max_comments or 'без обмеження'}"
+              f"{', з відповідями' if self.include_replies else ''}")
+        print(f"   🎫 Квота: залишилось {self.quota.remaining}/{self.quota.daily_budget} одиниць на добу")
+        if self.cache:
+            print(f"   🗄️  Кеш: {self.cache.path}{' (офлайн)' if self.cache.offline else ''}")
+        if self.checkpoint:
+            run = self.checkpoint.resume_run(self.playlist_id)
+            if run:
+                print(f"   ♻️  Буде продовжено запуск #{run['run_id']} ({len(run['videos'])} відео)")
+            else:
+                print("   🆕 Буде розпочато новий запуск")
+        if is_discovery_cached():
+            print(f"   📘 Discovery документ: {discovery_path()}")
+        else:
+            print(f"   📘 Discovery документ буде збережено в {discovery_path()}")
+
     def collect_all_comments(self):
         """Збирає коментарі з усіх відео плейлиста"""
         print(f"🔍 Отримуємо відео з плейлиста {self.playlist_id}...")
-        videos = self.get_playlist_videos()
+        try:
+            if self.checkpoint:
+                run = self.checkpoint.open_run(self.playlist_id, self.get_videos)
+                self.run_id, videos = run['run_id'], run['videos']
+                if run['resumed']:
+                    print(f"♻️  Продовжуємо перерваний запуск #{self.run_id}")
+            else:
+                videos = self.get_videos()
+        except (QuotaExhausted, HttpError) as e:
+            # Без повного списку відео запуск не починається (і не зберігається в контрольній точці)
+            print(f"\n⛔ {e}. Збір зупинено до отримання списку відео")
+            self.metrics.set('collection_completed', 0)
+            if self._reply_pool:
+                self._reply_pool.shutdown()
+            return
         print(f"📹 Знайдено {len(videos)} відео")
-        
-        for i, video in enumerate(videos, 1):
-            print(f"\n📺 Обробка відео {i}/{len(videos)}: {video['title']}")
-            
-            comments = self.get_video_comments(video['video_id'], video['title'])
-            print(f"   💬 Знайдено {len(comments)} коментарів")
-            
-            # Класифікуємо кожен коментар
-            for comment in comments:
-                classification = self.classify_comment_for_marketing(comment)
-                comment['marketing_classification'] = classification
-                
-                # Додаємо тільки якісні коментарі
-                if classification['is_marketing_worthy']:
-                    self.comments_data.append(comment)
-            
-            print(f"   ✨ Відібрано {sum(1 for c in comments if c['marketing_classification']['is_marketing_worthy'])} якісних коментарів")
+
+        started = time.monotonic()
+        self.pages_fetched = 0
+
+        # Завантаження, класифікація і запис працюють одночасно, пов'язані обмеженими чергами
+        pipeline = Pipeline([
+            PipelineStage('fetch', self._fetch_stage, workers=self.workers),
+            PipelineStage('classify', self._classify_stage),
+            PipelineStage('write', lambda item: self._write_stage(item, len(videos)))
+        ], queue_size=self.queue_size)
+
+        completed = True
+        try:
+            pipeline.run(enumerate(videos, 1))
+        except QuotaExhausted as e:
+            # Зібране зберігається; з контрольною точкою наступний запуск продовжить з цього місця
+            completed = False
+            print(f"\n⛔ {e}. Збір зупинено")
+
+        elapsed = max(time.monotonic() - started, 1e-9)
+        stage_stats = pipeline.stats()
+        print(f"\n⚡ Пропускна здатність ({self.workers} потоків): "
+              f"{stage_stats['write']['items'] / elapsed:.2f} відео/с, {self.pages_fetched / elapsed:.2f} сторінок/с")
+        print(format_pipeline_stats(stage_stats))
+        if self.skipped_videos:
+            print(f"⏭️  Пропущено {self.skipped_videos} відео без нових коментарів")
+        if self._reply_pool:
+            self._reply_pool.shutdown()
+            print(f"💬 Сторінок відповідей: {self.reply_pages_fetched}")
+        if self.cache:
+            cache_stats = self.cache.stats()
+            print(f"🗄️  Кеш: {cache_stats['hits']} влучань, {cache_stats['revalidated']} підтверджено (304), "
+                  f"{cache_stats['misses']} завантажено")
+        print(format_quota_stats(self.quota.stats()))
+
+        self.metrics.set('videos', len(videos))
+        self.metrics.set('videos_skipped', self.skipped_videos)
+        self.metrics.set('collection_completed', int(completed))
+        self.metrics.record_pipeline(stage_stats)
+        self.metrics.record_quota(self.quota.stats())
+        if self.cache:
+            for outcome in ('hits', 'revalidated', 'misses'):
+                self.metrics.set('cache_responses', cache_stats[outcome], outcome=outcome)
+
+        if self.checkpoint and completed:
+            self.checkpoint.finish_run(self.run_id)
+
+    def _fetch_stage(self, item):
+        """Етап конвеєра: завантаження коментарів відео (паралельно, якщо workers > 1)"""
+        i, video = item
+        with self.metrics.timer('stage_seconds', stage='fetch'):
+            comments = self.get_video_comments(video['video_id'], video['title'], video.get('comment_count'))
+        self.metrics.inc('comments', len(comments), stage='fetched')
+        return i, video, comments
+
+    def _classify_stage(self, item):
+        """Етап конвеєра: класифікація всіх коментарів відео одним пакетом"""
+        i, video, comments = item
+        with self.metrics.timer('stage_seconds', stage='classify'):
+            for comment, classification in zip(comments, classify_batch_for_marketing(comments)):
+                comment['marketing_classification'] = MarketingClassification.from_dict(classification)
+        self.metrics.inc('comments', len(comments), stage='classified')
+        return i, video, comments
+
+    def _write_stage(self, item, total: int):
+        """Етап конвеєра: відбір якісних коментарів у сховище (список або JSONL потік)"""
+        i, video, comments = item
+        print(f"\n📺 Обробка відео {i}/{total}: {video['title']}")
+        print(f"   💬 Знайдено {len(comments)} коментарів")
+
+        # Додаємо тільки якісні коментарі
+        with self.metrics.timer('stage_seconds', stage='write'):
+            worthy = [c for c in comments if c['marketing_classification']['is_marketing_worthy']]
+            for comment in worthy:
+                self.comments_data.append(comment)
+        self.metrics.inc('comments', len(worthy), stage='kept')
+
+        print(f"   ✨ Відібрано {len(worthy)} якісних коментарів")
     
-    def save_results(self):
-        """Зберігає результати в структуровані файли"""
-        output_dir = "/Users/chyngys/scripts/neb-content-appv2/marketing_data"
+    def watch(self, schedule: WatchSchedule, pacer: BudgetPacer,
+              playlist_refresh: float = DEFAULT_PLAYLIST_REFRESH, cycles: int = 0,
+              on_cycle: Optional[Callable[[], None]] = None):
+        """
+        Режим спостереження (потрібні контрольні точки): цикли перевірки відео за розкладом.
+        Кожен цикл дізнається commentCount відео, чий час настав (videos.list, 1 одиниця
+        на 50 відео), і завантажує нові коментарі лише там, де їх кількість змінилась, -
+        спершу з найшвидших відео, поки це дозволяє pacer. Нові якісні коментарі
+        дописуються в потік і накопичувальні сховища. Ctrl+C зупиняє після збереження розкладу.
+        """
+        print(f"👀 Спостереження за плейлистом {self.playlist_id}: інтервали "
+              f"{schedule.min_interval:.0f}-{schedule.max_interval:.0f} с, "
+              f"квота {self.quota.daily_budget} одиниць на добу")
+        cycle = 0
+        try:
+            while True:
+                cycle += 1
+                try:
+                    self._watch_cycle(cycle, schedule, pacer, playlist_refresh)
+                except QuotaExhausted as e:
+                    print(f"⛔ {e}")
+                except HttpError as e:
+                    print(f"Помилка API: {e}")
+                schedule.save()
+                if on_cycle:
+                    on_cycle()
+                if cycles and cycle >= cycles:
+                    break
+                delay = sleep_seconds(schedule, pacer, playlist_refresh, time.time())
+                print(f"💤 Наступна перевірка через {delay:.0f} с")
+                time.sleep(delay)
+        except KeyboardInterrupt:
+            print("\n🛑 Спостереження зупинено")
+        finally:
+            schedule.save()
+            if self._reply_pool:
+                self._reply_pool.shutdown()
+
+    def _watch_cycle(self, cycle: int, schedule: WatchSchedule, pacer: BudgetPacer, playlist_refresh: float):
+        """Один цикл спостереження: плейлист (якщо час), перевірка commentCount, дозбір змінених відео"""
+        now = time.time()
+        self.metrics.inc('watch_cycles')
+        if schedule.playlist_due(now, playlist_refresh) and pacer.available() >= check_cost(len(schedule.videos) or 1):
+            with self.metrics.timer('stage_seconds', stage='playlist'):
+                videos = self.get_playlist_videos()
+            if videos:
+                added = schedule.update_playlist(videos, now)
+                if added:
+                    print(f"📹 Нових відео в розкладі: {added} (усього {len(schedule.videos)})")
+
+        due = schedule.due(now)
+        affordable = max(0, pacer.available()) * VIDEOS_BATCH_SIZE
+        postponed = max(0, len(due) - affordable)
+        due = due[:affordable]
+        if due:
+            with self.metrics.timer('stage_seconds', stage='metadata'):
+                metadata = self.get_videos_metadata([entry['video_id'] for entry in due])
+
+        changed = []
+        for entry in due:
+            info = metadata.get(entry['video_id']) or {}
+            comment_count = info.get('comment_count')
+            delta = schedule.observe(entry['video_id'], comment_count, now)
+            state = self.checkpoint.get_video_state(entry['video_id'])
+            if comment_count and (not self.checkpoint.is_video_unchanged(state, comment_count)
+                                  or self.checkpoint.is_rewalk_due(state)):
+                changed.append({'video_id': entry['video_id'], 'title': info.get('title') or entry['title'],
+                                'comment_count': comment_count})
+            if delta:
+                self.metrics.observe('watch_new_comments_per_check', delta)
+
+        # Найшвидші відео першими: на них бюджет витрачається, коли його бракує на всі
+        changed.sort(key=lambda video: -schedule.videos[video['video_id']]['rate'])
+        budget = max(0, pacer.available())
+        for video in changed[budget:]:
+            schedule.postpone(video['video_id'], now)
+        postponed += len(changed[budget:])
+        changed = changed[:budget]
+
+        fresh = []
+
+        def write(item):
+            self._write_stage(item, len(changed))
+            fresh.extend(c for c in item[2] if c['marketing_classification']['is_marketing_worthy'])
+
+        try:
+            if changed:
+                pipeline = Pipeline([
+                    PipelineStage('fetch', self._watch_fetch_stage, workers=self.workers),
+                    PipelineStage('classify', self._classify_stage),
+                    PipelineStage('write', write)
+                ], queue_size=self.queue_size)
+                pipeline.run(enumerate(changed, 1))
+        finally:
+            # Відео, записані в потік і контрольну точку до помилки, більше не дозбираються -
+            # їхні коментарі мають потрапити в сховища і тоді, коли цикл перервано
+            if fresh:
+                storage = self._storage_writers()
+                if storage:
+                    write_reports(fresh, list(storage.values()))
+                    print_storage(storage)
+
+        quota_stats = self.quota.stats()
+        stats = schedule.stats()
+        print(f"🔄 Цикл {cycle}: перевірено {len(due)} відео, дозібрано {len(changed)}, "
+              f"відкладено {postponed}, нових якісних коментарів {len(fresh)}; "
+              f"квота {quota_stats['daily_used']}/{quota_stats['daily_budget']}, "
+              f"активних відео {stats['active']}/{stats['videos']}")
+        self.metrics.inc('watch_checks', len(due))
+        self.metrics.inc('watch_fetches', len(changed))
+        self.metrics.inc('watch_postponed', postponed)
+        self.metrics.set('watch_videos', stats['videos'])
+        self.metrics.set('watch_active_videos', stats['active'])
+        self.metrics.set('watch_budget_available', pacer.available())
+        self.metrics.record_quota(quota_stats)
+
+    def _watch_fetch_stage(self, item):
+        """Етап конвеєра спостереження: лише нові й відредаговані з попередньої перевірки коментарі"""
+        state = self.checkpoint.get_video_state(item[1]['video_id'])
+        i, video, comments = self._fetch_stage(item)
+        return i, video, [c for c in comments if is_new_or_edited(state, c['published_at'], c.get('updated_at'))]
+
+    def save_results(self, output_dir: Optional[str] = None):
+        """
+        Зберігає результати в структуровані файли (один прохід по зібраних коментарях).
+        Час кожного writer-а записується в self.report_timings.
+        """
+        output_dir = output_dir or "/Users/chyngys/scripts/neb-content-appv2/marketing_data"
         os.makedirs(output_dir, exist_ok=True)
+
+        def is_excellent(comment):
+            return comment['marketing_classification']['quality_level'] == 'excellent'
         
         # Основний файл з усіма коментарями
         all_comments_file = os.path.join(output_dir, "youtube_comments_all.json")
-        with open(all_comments_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'collection_date': datetime.now().isoformat(),
-                'playlist_id': self.playlist_id,
-                'total_comments': len(self.comments_data),
-                'comments': self.comments_data
-            }, f, ensure_ascii=False, indent=2)
         
         # Файл з найкращими коментарями для маркетингу
-        excellent_comments = [c for c in self.comments_data 
-                            if c['marketing_classification']['quality_level'] == 'excellent']
-        
         best_comments_file = os.path.join(output_dir, "youtube_comments_best.json")
-        with open(best_comments_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'collection_date': datetime.now().isoformat(),
-                'total_excellent': len(excellent_comments),
-                'comments': excellent_comments
-            }, f, ensure_ascii=False, indent=2)
         
         # Файл з коментарями по категоріях
         categorized_file = os.path.join(output_dir, "youtube_comments_by_category.json")
-        categories_dict = {}
         
-        for comment in self.comments_data:
-            for category in comment['marketing_classification']['categories']:
-                if category not in categories_dict:
-                    categories_dict[category] = []
-                categories_dict[category].append({
+        # Markdown файл для легкого перегляду
+        markdown_file = os.path.join(output_dir, "youtube_comments_for_marketing.md")
+
+        comments = self.comments_data
+        # Згортаються лише звіти з найкращими; повні звіти і сховища отримують усі коментарі,
+        # сховища - з розміром групи (occurrences) і ключем першої копії (duplicate_of)
+        deduplicator = Deduplicator(self.dedup_distance) if self.dedup_distance is not None else None
+        if deduplicator:
+            comments = deduplicator.annotate(comments)
+
+        def canonical(writer):
+            return deduplicator.writer(writer) if deduplicator else writer
+
+        def grouped(writer):
+            return deduplicator.stored(writer) if deduplicator else writer
+
+        writers = [
+            JsonReportWriter(all_comments_file, {
+                'collection_date': datetime.now().isoformat(),
+                'playlist_id': self.playlist_id,
+                'total_comments': None
+            }, count_field='total_comments'),
+            canonical(JsonReportWriter(best_comments_file, {
+                'collection_date': datetime.now().isoformat(),
+                'total_excellent': None
+            }, count_field='total_excellent', accept=is_excellent)),
+            CategoryReportWriter(
+                categorized_file,
+                categories=lambda comment: comment['marketing_classification']['categories'],
+                entry=lambda comment: {
                     'author': comment['author'],
                     'text': comment['text'],
                     'video_title': comment['video_title'],
                     'date': comment['published_at'],
                     'likes': comment['like_count'],
                     'url': comment['video_url']
-                })
-        
-        with open(categorized_file, 'w', encoding='utf-8') as f:
-            json.dump(categories_dict, f, ensure_ascii=False, indent=2)
-        
-        # Створюємо Markdown файл для легкого перегляду
-        markdown_file = os.path.join(output_dir, "youtube_comments_for_marketing.md")
-        with open(markdown_file, 'w', encoding='utf-8') as f:
-            f.write("# YouTube Comments for Marketing\n\n")
-            f.write(f"Collected on: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n")
-            
-            f.write("## 🌟 Excellent Testimonials\n\n")
-            for comment in excellent_comments[:10]:  # Top 10
-                f.write(f"### {comment['author']}\n")
-                f.write(f"*Video: {comment['video_title']}*\n")
-                f.write(f"*Date: {comment['published_at'][:10]}*\n")
-                f.write(f"*Likes: {comment['like_count']}*\n\n")
-                f.write(f"> {comment['text']}\n\n")
-                f.write("---\n\n")
+                }
+            ),
+            canonical(MarkdownReportWriter(
+                markdown_file,
+                header=("# YouTube Comments for Marketing\n\n"
+                        f"Collected on: {datetime.now().strftime('%Y-%m-%d %H:%M')}\n\n"
+                        "## 🌟 Excellent Testimonials\n\n"),
+                render=lambda i, comment: (
+                    f"### {comment['author']}\n"
+                    f"*Video: {comment['video_title']}*\n"
+                    f"*Date: {comment['published_at'][:10]}*\n"
+                    f"*Likes: {comment['like_count']}*\n"
+                    + (f"*Repeated: {comment['occurrences']} times*\n" if comment.get('occurrences', 1) > 1 else '')
+                    + "\n"
+                    f"> {comment['text']}\n\n"
+                    "---\n\n"
+                ),
+                n=10,  # Top 10
+                section=lambda comment: '' if is_excellent(comment) else None
+            ))
+        ]
+        storage = self._storage_writers()
+        writers.extend(grouped(writer) for writer in storage.values())
+        self.report_timings = {}
+        with self.metrics.timer('stage_seconds', stage='reports'):
+            written = write_reports(comments, writers, timings=self.report_timings)
+        self.metrics.record_reports(self.report_timings)
+        self.metrics.set('comments_written', written)
         
         print(f"\n✅ Результати збережено:")
+        if deduplicator and deduplicator.folded:
+            print(f"   🧬 Згорнуто {deduplicator.folded} майже однакових коментарів у звітах з найкращими")
         print(f"   📄 Всі коментарі: {all_comments_file}")
         print(f"   ⭐ Найкращі: {best_comments_file}")
         print(f"   📊 По категоріях: {categorized_file}")
         print(f"   📝 Markdown: {markdown_file}")
+        print_storage(storage)
+
+    def _storage_writers(self) -> Dict[str, ReportWriter]:
+        """Writer-и накопичувальних сховищ (пошукова база, база сайту, корпус), якщо вони задані"""
+        return storage_writers('api', self.search_index, self.app_database, self.corpus_dir, self.corpus_format)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Збір коментарів YouTube через Data API")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Кількість паралельних потоків для завантаження коментарів")
+    parser.add_argument('--checkpoint', default=os.getenv('YOUTUBE_CHECKPOINT_DB'),
+                        help="SQLite файл контрольних точок для інкрементального та відновлюваного збору")
+    parser.add_argument('--rewalk-days', type=float, default=DEFAULT_REWALK_DAYS,
+                        help="Як часто проходити всі сторінки відео, щоб помітити відредаговані старі "
+                             "коментарі (дозбір бачить лише нові), 0 - ніколи")
+    parser.add_argument('--stream', default=None,
+                        help="JSONL файл, куди кожен якісний коментар пишеться одразу після оцінки")
+    parser.add_argument('--max-comments', type=int, default=100,
+                        help="Максимум коментарів (разом з відповідями) на відео, 0 - без обмеження")
+    parser.add_argument('--replies', action='store_true',
+                        help="Збирати повні гілки: відповіді на коментарі через comments.list")
+    parser.add_argument('--reply-workers', type=int, default=4,
+                        help="Кількість паралельних потоків для сторінок відповідей")
+    parser.add_argument('--playlist', default=None,
+                        help="ID плейлиста (за замовчуванням плейлист каналу NEB)")
+    parser.add_argument('--jobs', default=None,
+                        help="JSON специфікація кількох плейлистів/каналів для паралельного збору")
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                        help="Кількість процесів для завдань зі специфікації --jobs")
+    parser.add_argument('--shard-dir', default='youtube_shards',
+                        help="Каталог для результатів кожного завдання (shard) і об'єднаного файлу")
+    parser.add_argument('--queue-size', type=int, default=4,
+                        help="Глибина черг між етапами завантаження, класифікації і запису (у відео)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Перевірити налаштування і показати план збору без запитів до API")
+    parser.add_argument('--no-prefetch', action='store_true',
+                        help="Не отримувати videos.list перед збором (не пропускати незмінені відео)")
+    add_cache_arguments(parser)
+    add_quota_arguments(parser)
+    add_dedup_arguments(parser)
+    add_index_arguments(parser)
+    add_app_database_arguments(parser)
+    add_corpus_arguments(parser)
+    add_metrics_arguments(parser)
+    add_watch_arguments(parser)
+    return parser.parse_args()
+
+def build_collector(args, playlist_id: Optional[str] = None,
+                    stream_path: Optional[str] = None,
+                    metrics: Optional[Metrics] = None) -> YouTubeAPICollector:
+    """Створює збирач з параметрів командного рядка"""
+    checkpoint = CheckpointStore(args.checkpoint, args.rewalk_days) if args.checkpoint else None
+    cache = cache_from_args(args)
+    return YouTubeAPICollector(workers=args.workers, checkpoint=checkpoint,
+                               stream_path=stream_path or args.stream, cache=cache,
+                               quota=scheduler_from_args(args, cache, metrics),
+                               metrics=metrics,
+                               max_comments=args.max_comments, include_replies=args.replies,
+                               reply_workers=args.reply_workers,
+                               prefetch_metadata=not args.no_prefetch,
+                               queue_size=args.queue_size,
+                               playlist_id=playlist_id or args.playlist,
+                               dedup_distance=dedup_distance_from_args(args),
+                               search_index=args.index,
+                               app_database=app_database_url_from_args(args),
+                               corpus_dir=corpus_dir_from_args(args),
+                               corpus_format=args.corpus_format)
+
+
+def collect_shard(job: Dict, shard_path: str, args) -> Dict:
+    """Збирає один плейлист у власний JSONL shard (виконується в окремому процесі)"""
+    import contextlib
+
+    with open(shard_path.replace('.jsonl', '.log'), 'w', encoding='utf-8') as log, \
+            contextlib.redirect_stdout(log):
+        collector = build_collector(args, job['playlist_id'], shard_path)
+        collector.collect_all_comments()
+        collector.comments_data.close()
+        return {'comments': len(collector.comments_data), 'quota': collector.quota.stats()['units_used']}
+
+
+def collect_jobs(args, metrics: Optional[Metrics] = None) -> YouTubeAPICollector:
+    """Паралельний збір за специфікацією --jobs і детерміноване об'єднання результатів"""
+    jobs = load_job_spec(args.jobs)
+    processes = min(args.processes, len(jobs))
+    print(f"🗂️  {len(jobs)} завдань, {processes} процесів, shard-и в {args.shard_dir}")
+
+    # Процеси ділять денний бюджет через спільний файл квоти, а швидкість - порівну
+    os.makedirs(args.shard_dir, exist_ok=True)
+    args.quota_usage = args.quota_usage or os.path.join(args.shard_dir, 'quota_usage.json')
+    if args.rps:
+        args.rps = args.rps / processes
+    merged_path = args.stream or os.path.join(args.shard_dir, 'merged.jsonl')
+    args.stream = None
+
+    # Збирач для об'єднаних результатів (заодно перевіряє ключ API до запуску процесів)
+    collector = build_collector(args, playlist_id=','.join(job['playlist_id'] for job in jobs), metrics=metrics)
+
+    started = time.monotonic()
+    results = run_sharded(jobs, collect_shard, processes, args.shard_dir, args)
+    failed = [result for result in results if 'error' in result]
+    for result in failed:
+        print(f"\n❌ {result['name']}:\n{result['error']}")
+    print(f"\n⚡ {len(jobs) - len(failed)}/{len(jobs)} завдань за {time.monotonic() - started:.1f} с")
+    collector.metrics.set('jobs', len(jobs))
+    collector.metrics.set('jobs_failed', len(failed))
+    collector.metrics.set('api_units_used_jobs', sum(result.get('quota', 0) for result in results))
+
+    collector.comments_data = merge_shards(results, merged_path)
+    print(f"🔗 Об'єднано {len(collector.comments_data)} унікальних коментарів")
+    return collector
+
+
+def watch(args, metrics: Metrics) -> YouTubeAPICollector:
+    """
+    Режим спостереження до Ctrl+C (або --watch-cycles циклів). Контрольні точки і
+    JSONL потік обов'язкові (є типові файли); потік дописується між перезапусками,
+    тож підсумкові звіти і статистика після зупинки охоплюють усе спостереження.
+    """
+    args.checkpoint = args.checkpoint or DEFAULT_WATCH_CHECKPOINT
+    stream_path = args.stream or DEFAULT_WATCH_STREAM
+    args.stream = None
+    collector = build_collector(args, metrics=metrics)
+    collector.comments_data = JsonlCommentStream(stream_path, resume=True)
+    existing = len(collector.comments_data)
+    print(f"🧵 Потік: {stream_path} ({existing} коментарів), контрольні точки: {args.checkpoint}, "
+          f"розклад: {args.watch_state}")
+
+    schedule = WatchSchedule(args.watch_state, min_interval=args.min_interval, max_interval=args.max_interval)
+    pacer = BudgetPacer(collector.quota, burst=args.watch_burst)
+    # Метрики оновлюються після кожного циклу: моніторинг бачить живий процес
+    collector.watch(schedule, pacer, playlist_refresh=args.playlist_refresh, cycles=args.watch_cycles,
+                    on_cycle=lambda: export_metrics(metrics, args.metrics_json, args.metrics_textfile))
+    collector.comments_data.close()
+    print(f"🆕 За цей запуск додано {len(collector.comments_data) - existing} якісних коментарів")
+    return collector
+
 
 def main():
+    args = parse_args()
+    metrics = Metrics('api')
+    succeeded = False
+
     try:
-        # Спробуємо використати API
-        collector = YouTubeAPICollector()
-        collector.collect_all_comments()
-        collector.save_results()
+        if args.jobs:
+            collector = collect_jobs(args, metrics)
+            collector.save_results()
+        elif args.watch and not args.dry_run:
+            collector = watch(args, metrics)
+            collector.save_results()
+        else:
+            # Спробуємо використати API
+            collector = build_collector(args, metrics=metrics)
+            if args.dry_run:
+                collector.dry_run()
+                return
+            collector.collect_all_comments()
+            collector.save_results()
         
         print(f"\n📊 Фінальна статистика:")
         print(f"   Всього якісних коментарів: {len(collector.comments_data)}")
@@ -269,7 +836,13 @@ def main():
         
         print(f"   Відмінних: {excellent}")
         print(f"   Хороших: {good}")
+        metrics.set('comments_kept', len(collector.comments_data))
+        metrics.set('comments_by_quality', excellent, quality='excellent')
+        metrics.set('comments_by_quality', good, quality='good')
+        succeeded = True
         
+    except QuotaExhausted as e:
+        print(f"\n⛔ {e}. Збір зупинено")
     except ValueError as e:
         print(f"\n⚠️  {e}")
         print("\n📝 Інструкція по отриманню YouTube API Key:")
@@ -281,6 +854,11 @@ def main():
         print("   export YOUTUBE_API_KEY='ваш_ключ_тут'")
         print("\nАбо запустіть простий збирач без API:")
         print("   python scripts/youtube-comments-collector.py")
+    finally:
+        # Метрики пишуться і після невдалого запуску: run_success=0 видно в моніторингу
+        if not args.dry_run:
+            metrics.set('run_success', int(succeeded))
+            export_metrics(metrics, args.metrics_json, args.metrics_textfile)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк класифікаторів, згортання дублікатів і writer-ів save_results
+Корпус генерується з шаблонів collect-sample-comments.py (youtube_marketing.samples)
+з фіксованим seed, тож запуски різних версій коду можна порівнювати між собою.
+Результати пишуться в JSON, --compare показує зміни відносно попереднього файлу.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import contextlib
+import subprocess
+import importlib.util
+from datetime import datetime
+
+from youtube_marketing.samples import synthetic_comments
+from youtube_marketing.sink import JsonlCommentStream
+from youtube_marketing.dedup import find_near_duplicates
+from youtube_marketing.batch import classify_batch_for_marketing
+
+SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+CHUNK_SIZE = 10_000
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# збирач: (файл, клас, метод класифікації, поле результату, чи зберігає коментар)
+COLLECTORS = {
+    'api': ('youtube-api-collector.py', 'YouTubeAPICollector', 'classify_comment_for_marketing',
+            'marketing_classification', lambda result: result['is_marketing_worthy']),
+    'simple': ('youtube-simple-collector.py', 'SimpleYouTubeCollector', 'classify_comment',
+               'classification', lambda result: result['is_marketing_worthy']),
+    'scraper': ('youtube-comments-collector.py', 'YouTubeCommentsCollector', 'classify_comment_quality',
+                'quality', lambda result: True),
+}
+
+
+def load_collector_class(name: str):
+    """Клас збирача з файлу скрипта (None, якщо бракує залежностей)"""
+    filename, class_name = COLLECTORS[name][:2]
+    spec = importlib.util.spec_from_file_location(f"benchmark_{name}", os.path.join(SCRIPT_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except ImportError as e:
+        print(f"⚠️  Пропускаємо {filename}: {e}")
+        return None
+    return getattr(module, class_name)
+
+
+def build_collector(name: str, cls, work_dir: str, storage: bool):
+    """Збирач без мережі: згортання вимкнене, сховища (за --storage) - у робочій теці"""
+    options = {'dedup_distance': None}
+    if storage:
+        options['search_index'] = os.path.join(work_dir, f"{name}-index.sqlite")
+        options['app_database'] = os.path.join(work_dir, f"{name}-app.db")
+        if importlib.util.find_spec('pyarrow'):
+            options['corpus_dir'] = os.path.join(work_dir, f"{name}-corpus")
+    if name == 'api':
+        return cls(api_key='benchmark', **options)
+    if name == 'simple':
+        # Ключ лише проходить перевірку конструктора: запитів до API немає
+        os.environ.setdefault('YOUTUBE_API_KEY', 'benchmark')
+    return cls(**options)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPT_DIR,
+                              capture_output=True, text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+
+class BenchmarkResults:
+    def __init__(self, seed: int):
+        self.meta = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': seed,
+        }
+        self.results = []
+
+    def add(self, name: str, size: int, seconds: float, items: int):
+        self.results.append({
+            'name': name,
+            'size': size,
+            'items': items,
+            'seconds': round(seconds, 4),
+            'per_second': round(items / seconds, 1) if seconds > 0 else None
+        })
+        rate = f"{items / seconds:,.0f}/с" if seconds > 0 else '-'
+        print(f"   ⏱️  {name}: {seconds:.3f} с ({rate})")
+
+    def save(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'meta': self.meta, 'results': self.results}, f, ensure_ascii=False, indent=2)
+
+
+def bench_size(size: int, args, results: BenchmarkResults, classes):
+    print(f"\n📦 Корпус {size:,} коментарів (seed {args.seed})")
+    work_dir = tempfile.mkdtemp(prefix=f"youtube-bench-{size}-", dir=args.work_dir)
+    try:
+        collectors = {name: cls.__new__(cls) for name, cls in classes.items()}
+        streams = {name: JsonlCommentStream(os.path.join(work_dir, f"{name}.jsonl")) for name in classes}
+        texts = []
+        timings = {'corpus': 0.0, 'batch': 0.0}
+        timings.update({name: 0.0 for name in classes})
+
+        generated = synthetic_comments(size, args.seed)
+        while True:
+            started = time.perf_counter()
+            chunk = [comment for _, comment in zip(range(CHUNK_SIZE), generated)]
+            timings['corpus'] += time.perf_counter() - started
+            if not chunk:
+                break
+            texts.extend(comment['text'] for comment in chunk)
+
+            if 'api' in classes:
+                started = time.perf_counter()
+                classify_batch_for_marketing(chunk)
+                timings['batch'] += time.perf_counter() - started
+
+            for name, collector in collectors.items():
+                method, field, keep = COLLECTORS[name][2:]
+                classify = getattr(collector, method)
+                started = time.perf_counter()
+                classified = [classify(comment) for comment in chunk]
+                timings[name] += time.perf_counter() - started
+                # Сховище збирача - лише коментарі, які він би залишив (без замірів)
+                for comment, result in zip(chunk, classified):
+                    if keep(result):
+                        streams[name].append(dict(comment, **{field: result}))
+
+        results.add('corpus.generate', size, timings['corpus'], size)
+        for name in classes:
+            results.add(f"classify.{name}.{COLLECTORS[name][2]}", size, timings[name], size)
+        if 'api' in classes:
+            results.add('classify.api.classify_batch_for_marketing', size, timings['batch'], size)
+
+        started = time.perf_counter()
+        groups = find_near_duplicates(texts)
+        results.add('dedup.find_near_duplicates', size, time.perf_counter() - started, size)
+        print(f"      🧬 {size - len(set(groups)):,} майже однакових коментарів")
+        del texts, groups
+
+        for name, cls in classes.items():
+            streams[name].close()
+            collector = build_collector(name, cls, work_dir, args.storage)
+            collector.comments_data = streams[name]
+            output_dir = os.path.join(work_dir, f"{name}-reports")
+            started = time.perf_counter()
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                collector.save_results(output_dir=output_dir)
+            elapsed = time.perf_counter() - started
+
+            count = len(streams[name])
+            results.add(f"save_results.{name}", size, elapsed, count)
+            for writer, seconds in collector.report_timings.items():
+                results.add(f"save_results.{name}.{writer}", size, seconds, count)
+    finally:
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        else:
+            print(f"   📁 Файли збережено в {work_dir}")
+
+
+def compare(results: BenchmarkResults, path: str, threshold: float) -> int:
+    """Порівнює з попереднім файлом результатів; повертає кількість погіршень"""
+    with open(path, encoding='utf-8') as f:
+        previous = json.load(f)
+    baseline = {(item['name'], item['size']): item for item in previous['results']}
+
+    print(f"\n📊 Порівняння з {path} ({previous['meta'].get('git_revision') or '?'} "
+          f"від {previous['meta'].get('created_at', '?')}):")
+    regressions = 0
+    for item in results.results:
+        before = baseline.get((item['name'], item['size']))
+        if not before or not before['seconds'] or not item['seconds']:
+            continue
+        ratio = item['seconds'] / before['seconds']
+        marker = '  '
+        if ratio > threshold:
+            marker = '⚠️'
+            regressions += 1
+        elif ratio < 1 / threshold:
+            marker = '🚀'
+        print(f"   {marker} {item['name']} [{item['size']:,}]: {before['seconds']:.3f} → "
+              f"{item['seconds']:.3f} с (x{ratio:.2f})")
+    if regressions:
+        print(f"\n⚠️  {regressions} замірів повільніші більш ніж у {threshold:.2f} раза")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Бенчмарк класифікаторів і звітів на синтетичному корпусі")
+    parser.add_argument('--sizes', default='10k,100k',
+                        help=f"Розміри корпусу через кому: {', '.join(SIZES)} або число")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="Seed генератора корпусу (однаковий для порівнюваних запусків)")
+    parser.add_argument('--collectors', default=','.join(COLLECTORS),
+                        help="Збирачі через кому")
+    parser.add_argument('--storage', action='store_true',
+                        help="Додати writer-и пошукової бази, бази сайту (SQLite) і корпусу Parquet у робочій теці")
+    parser.add_argument('--output', default='youtube-benchmark.json',
+                        help="JSON файл результатів")
+    parser.add_argument('--compare', default=None,
+                        help="Попередній JSON файл результатів для порівняння")
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help="У скільки разів повільніше вважається погіршенням")
+    parser.add_argument('--work-dir', default=None,
+                        help="Тека для тимчасових файлів (за замовчуванням системна)")
+    parser.add_argument('--keep', action='store_true',
+                        help="Не видаляти згенеровані корпуси і звіти")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    sizes = [SIZES[size.lower()] if size.lower() in SIZES else int(size) for size in args.sizes.split(',')]
+    classes = {}
+    for name in args.collectors.split(','):
+        if name not in COLLECTORS:
+            print(f"❌ Невідомий збирач {name}, можливі: {', '.join(COLLECTORS)}")
+            return 2
+        cls = load_collector_class(name)
+        if cls is not None:
+            classes[name] = cls
+
+    results = BenchmarkResults(args.seed)
+    print(f"🚀 Бенчмарк {platform.python_version()} ({results.meta['git_revision'] or 'без git'})")
+    for size in sizes:
+        bench_size(size, args, results, classes)
+
+    results.save(args.output)
+    print(f"\n✅ Результати збережено в {args.output}")
+
+    if args.compare:
+        return 1 if compare(results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,18 +5,64 @@ YouTube Comments Collector for Marketing
 """
 
 import os
-import json
 import re
 from datetime import datetime
 from typing import List, Dict, Optional
-import requests
 from bs4 import BeautifulSoup
 import time
+import argparse
+
+from youtube_marketing.classification import classify_quality
+from youtube_marketing.sink import open_comments_store
+from youtube_marketing.jobs import DEFAULT_PLAYLIST_ID
+from youtube_marketing.http_client import HttpClient, HttpError
+from youtube_marketing.response_cache import ResponseCache, add_cache_arguments, cache_from_args
+from youtube_marketing.reports import write_reports, JsonReportWriter
+from youtube_marketing.search_index import add_index_arguments
+from youtube_marketing.app_database import add_app_database_arguments, app_database_url_from_args
+from youtube_marketing.corpus_store import add_corpus_arguments, corpus_dir_from_args
+from youtube_marketing.storage import storage_writers, print_storage
+from youtube_marketing.dedup import DEFAULT_MAX_DISTANCE, Deduplicator, add_dedup_arguments, dedup_distance_from_args
+from youtube_marketing.checkpoint import CheckpointStore
+from youtube_marketing.metrics import Metrics, add_metrics_arguments, export_metrics
+from youtube_marketing.metadata import fetch_videos_metadata
+from youtube_marketing.playlist_page import BROWSE_URL, scrape_playlist
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
 
 class YouTubeCommentsCollector:
-    def __init__(self):
-        self.comments_data = []
-        self.playlist_id = "PLNz8wZnk2_6WvkuOVxq-wubNOPGHYTfk3"
+    def __init__(self, checkpoint: Optional[CheckpointStore] = None,
+                 stream_path: Optional[str] = None, pool_size: int = 4,
+                 cache: Optional[ResponseCache] = None, max_videos: Optional[int] = None,
+                 playlist_id: Optional[str] = None,
+                 dedup_distance: Optional[int] = DEFAULT_MAX_DISTANCE,
+                 search_index: Optional[str] = None, app_database: Optional[str] = None,
+                 corpus_dir: Optional[str] = None, corpus_format: str = 'parquet',
+                 metrics: Optional[Metrics] = None):
+        # Список у пам'яті або JSONL потік (--stream), що пишеться одразу після класифікації
+        self.comments_data = open_comments_store(stream_path)
+        self.playlist_id = playlist_id or DEFAULT_PLAYLIST_ID
+        self.max_videos = max_videos  # None - весь плейлист
+        # Майже однакові коментарі згортаються у звітах (None - не згортати)
+        self.dedup_distance = dedup_distance
+        # SQLite база з повнотекстовим пошуком по всій історії (None - не вести)
+        self.search_index = search_index
+        # База сайту (таблиця YouTubeComment), куди коментарі завантажуються пачками
+        self.app_database = app_database
+        # Колонковий корпус (Parquet/Arrow) з розділами за датою збору і відео (None - не вести)
+        self.corpus_dir = corpus_dir
+        self.corpus_format = corpus_format
+        self.http = HttpClient(pool_size=pool_size, cache=cache)
+        # Таймери, лічильники і гістограми запуску (експортуються в main)
+        self.metrics = metrics or Metrics('scraper')
+        # З ключем API назви відео беруться пачками з videos.list замість сторінок перегляду
+        self.api_key = os.getenv('YOUTUBE_API_KEY')
+
+        # Контрольні точки: знімок плейлиста та назви відео між запусками
+        self.checkpoint = checkpoint
+        self.run_id = None
         
     def extract_video_id(self, url: str) -> Optional[str]:
         """Витягує ID відео з URL"""
@@ -33,43 +79,45 @@ class YouTubeCommentsCollector:
         return None
     
     def get_playlist_videos(self) -> List[Dict]:
-        """Отримує список відео з плейлиста (використовуючи веб-скрейпінг)"""
+        """
+        Отримує список відео з плейлиста (використовуючи веб-скрейпінг):
+        ytInitialData першої сторінки і далі сторінки продовження.
+        З контрольною точкою список стає знімком запуску, тож помилка будь-якої
+        сторінки (чи сторінка без списку) передається далі замість неповного списку.
+        """
         playlist_url = f"https://www.youtube.com/playlist?list={self.playlist_id}"
         
-        try:
-            response = requests.get(playlist_url, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            })
-            
-            # Простий парсинг для отримання відео ID з HTML
-            video_ids = re.findall(r'\"videoId\":\"([0-9A-Za-z_-]{11})\"', response.text)
-            video_ids = list(dict.fromkeys(video_ids))  # Видалення дублікатів
-            
-            videos = []
-            for video_id in video_ids[:20]:  # Обмежуємо кількість для тестування
-                videos.append({
-                    'video_id': video_id,
-                    'url': f"https://www.youtube.com/watch?v={video_id}"
-                })
-            
-            return videos
-            
-        except Exception as e:
-            print(f"Помилка при отриманні плейлиста: {e}")
-            return []
+        response = self.http.get(playlist_url, headers=BROWSER_HEADERS)
+        response.raise_for_status()
+
+        videos = scrape_playlist(
+            response.text,
+            lambda params, payload: self.http.post_json(BROWSE_URL, payload, params, BROWSER_HEADERS),
+            self.max_videos,
+            partial=self.checkpoint is None
+        )
+        if not videos and self.checkpoint:
+            raise ValueError("сторінка плейлиста без списку відео (згода на cookies або капча)")
+        return videos
     
     def get_video_info(self, video_id: str) -> Dict:
         """Отримує базову інформацію про відео"""
         url = f"https://www.youtube.com/watch?v={video_id}"
+
+        if self.checkpoint:
+            title = self.checkpoint.get_video_state(video_id).get('title')
+            if title:
+                return {'video_id': video_id, 'title': title, 'url': url}
         
         try:
-            response = requests.get(url, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            })
+            response = self.http.get(url, headers=BROWSER_HEADERS)
             
             # Витягуємо назву відео
             title_match = re.search(r'<title>([^<]+)</title>', response.text)
             title = title_match.group(1).replace(' - YouTube', '') if title_match else 'Невідоме відео'
+
+            if self.checkpoint and title_match:
+                self.checkpoint.save_video_title(video_id, title)
             
             return {
                 'video_id': video_id,
@@ -85,104 +133,129 @@ class YouTubeCommentsCollector:
                 'url': f"https://www.youtube.com/watch?v={video_id}"
             }
     
+    def get_videos_info(self, video_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Інформація про кілька відео: з ключем API - videos.list по 50 ID за запит,
+        без ключа (або для відео, яких немає у відповіді) - get_video_info по одному.
+        Назви, збережені в контрольній точці, повторно не завантажуються.
+        """
+        infos = {}
+        if self.checkpoint:
+            for video_id in video_ids:
+                title = self.checkpoint.get_video_state(video_id).get('title')
+                if title:
+                    infos[video_id] = {'video_id': video_id, 'title': title,
+                                       'url': f"https://www.youtube.com/watch?v={video_id}"}
+
+        missing = [video_id for video_id in video_ids if video_id not in infos]
+        if self.api_key and missing:
+            try:
+                metadata = fetch_videos_metadata(missing, lambda ids: self.http.get_json(
+                    "https://www.googleapis.com/youtube/v3/videos",
+                    {'part': 'snippet,statistics', 'id': ','.join(ids), 'maxResults': len(ids), 'key': self.api_key}
+                ))
+            except Exception as e:
+                print(f"Помилка при отриманні метаданих відео: {e}")
+                metadata = {}
+
+            for video_id, info in metadata.items():
+                if not info['title']:
+                    continue
+                infos[video_id] = {
+                    'video_id': video_id,
+                    'title': info['title'],
+                    'url': f"https://www.youtube.com/watch?v={video_id}",
+                    'comment_count': info['comment_count']
+                }
+                if self.checkpoint:
+                    self.checkpoint.save_video_title(video_id, info['title'])
+
+        for video_id in video_ids:
+            if video_id not in infos:
+                infos[video_id] = self.get_video_info(video_id)
+        return infos
+
     def classify_comment_quality(self, comment: Dict) -> Dict:
         """Класифікує якість коментаря для маркетингу"""
-        text = comment.get('text', '').lower()
-        
-        # Критерії для хороших маркетингових коментарів
-        positive_indicators = [
-            'дякую', 'спасибо', 'thanks',
-            'корисно', 'полезно', 'helpful', 'useful',
-            'чудово', 'відмінно', 'excellent', 'great',
-            'найкращ', 'best', 'лучш',
-            'рекомендую', 'recommend',
-            'навчився', 'научился', 'learned',
-            'допомогло', 'помогло', 'helped',
-            'врятував', 'спас', 'saved',
-            'життя', 'жизнь', 'life'
-        ]
-        
-        testimonial_indicators = [
-            'завдяки', 'благодаря', 'thanks to',
-            'тепер я', 'теперь я', 'now i',
-            'раніше', 'раньше', 'before',
-            'після', 'после', 'after'
-        ]
-        
-        score = 0
-        reasons = []
-        
-        # Перевірка довжини
-        if len(text) > 50:
-            score += 1
-            reasons.append('detailed')
-        
-        # Перевірка позитивних індикаторів
-        for indicator in positive_indicators:
-            if indicator in text:
-                score += 2
-                reasons.append(f'positive_{indicator}')
-                break
-        
-        # Перевірка на відгук/історію
-        for indicator in testimonial_indicators:
-            if indicator in text:
-                score += 3
-                reasons.append('testimonial')
-                break
-        
-        # Перевірка на емоційність
-        if any(emoji in text for emoji in ['❤️', '🔥', '👍', '💪', '🏍️', '🛵']):
-            score += 1
-            reasons.append('emotional')
-        
-        # Перевірка на конкретику
-        if any(word in text for word in ['км', 'km', 'місяц', 'рік', 'день', 'тиждень']):
-            score += 2
-            reasons.append('specific')
-        
-        return {
-            'score': score,
-            'category': 'excellent' if score >= 5 else 'good' if score >= 3 else 'normal',
-            'reasons': reasons
-        }
+        return classify_quality(comment)
     
-    def save_results(self, filename: str = "youtube_comments_for_marketing.json"):
-        """Зберігає результати в JSON файл"""
-        output_data = {
-            'collection_date': datetime.now().isoformat(),
-            'total_comments': len(self.comments_data),
-            'playlist_id': self.playlist_id,
-            'comments': self.comments_data
-        }
-        
-        output_path = f"/Users/chyngys/scripts/neb-content-appv2/marketing_data/{filename}"
+    def save_results(self, filename: str = "youtube_comments_for_marketing.json",
+                     output_dir: Optional[str] = None):
+        """
+        Зберігає результати в JSON файл (один прохід по зібраних коментарях).
+        Час кожного writer-а записується в self.report_timings.
+        """
+        output_dir = output_dir or "/Users/chyngys/scripts/neb-content-appv2/marketing_data"
+        output_path = os.path.join(output_dir, filename)
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+        all_writer = JsonReportWriter(output_path, {
+            'collection_date': datetime.now().isoformat(),
+            'total_comments': None,
+            'playlist_id': self.playlist_id
+        }, count_field='total_comments')
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(output_data, f, ensure_ascii=False, indent=2)
-        
-        print(f"✅ Збережено {len(self.comments_data)} коментарів в {output_path}")
-        
-        # Створюємо окремий файл з найкращими коментарями
-        excellent_comments = [c for c in self.comments_data if c['quality']['category'] == 'excellent']
-        good_comments = [c for c in self.comments_data if c['quality']['category'] == 'good']
-        
+        # Окремий файл з найкращими коментарями: спочатку відмінні, потім хороші
         best_comments_path = output_path.replace('.json', '_best.json')
-        with open(best_comments_path, 'w', encoding='utf-8') as f:
-            json.dump({
-                'collection_date': datetime.now().isoformat(),
-                'excellent_comments': len(excellent_comments),
-                'good_comments': len(good_comments),
-                'comments': excellent_comments + good_comments
-            }, f, ensure_ascii=False, indent=2)
-        
-        print(f"✅ Збережено {len(excellent_comments)} відмінних та {len(good_comments)} хороших коментарів")
+        best_writer = JsonReportWriter(best_comments_path, {
+            'collection_date': datetime.now().isoformat(),
+            'excellent_comments': None,
+            'good_comments': None
+        },
+            accept=lambda c: c['quality']['category'] in ('excellent', 'good'),
+            part=lambda c: 0 if c['quality']['category'] == 'excellent' else 1,
+            counts={
+                'excellent_comments': lambda c: c['quality']['category'] == 'excellent',
+                'good_comments': lambda c: c['quality']['category'] == 'good'
+            }
+        )
+
+        comments = self.comments_data
+        # Згортаються лише звіти з найкращими; повні звіти і сховища отримують усі коментарі,
+        # сховища - з розміром групи (occurrences) і ключем першої копії (duplicate_of)
+        deduplicator = Deduplicator(self.dedup_distance) if self.dedup_distance is not None else None
+        if deduplicator:
+            comments = deduplicator.annotate(comments)
+
+        def canonical(writer):
+            return deduplicator.writer(writer) if deduplicator else writer
+
+        def grouped(writer):
+            return deduplicator.stored(writer) if deduplicator else writer
+
+        writers = [all_writer, canonical(best_writer)]
+        storage = storage_writers('scraper', self.search_index, self.app_database,
+                                  self.corpus_dir, self.corpus_format)
+        writers.extend(grouped(writer) for writer in storage.values())
+        self.report_timings = {}
+        with self.metrics.timer('stage_seconds', stage='reports'):
+            write_reports(comments, writers, timings=self.report_timings)
+        self.metrics.record_reports(self.report_timings)
+        self.metrics.set('comments_written', all_writer.total)
+
+        if deduplicator and deduplicator.folded:
+            print(f"🧬 Згорнуто {deduplicator.folded} майже однакових коментарів у файлі найкращих")
+        print(f"✅ Збережено {all_writer.total} коментарів в {output_path}")
+        print(f"✅ Збережено {best_writer.count_values['excellent_comments']} відмінних "
+              f"та {best_writer.count_values['good_comments']} хороших коментарів")
+        print_storage(storage, indent='')
     
     def collect_all_comments(self):
         """Основний метод для збору всіх коментарів"""
         print("🔍 Отримуємо список відео з плейлиста...")
-        videos = self.get_playlist_videos()
+        try:
+            if self.checkpoint:
+                run = self.checkpoint.open_run(self.playlist_id, self.get_playlist_videos)
+                self.run_id, videos = run['run_id'], run['videos']
+                if run['resumed']:
+                    print(f"♻️  Продовжуємо перерваний запуск #{self.run_id}")
+            else:
+                with self.metrics.timer('stage_seconds', stage='playlist'):
+                    videos = self.get_playlist_videos()
+        except (HttpError, OSError, ValueError) as e:
+            # Без повного списку відео запуск не починається (і не зберігається в контрольній точці)
+            print(f"\n⛔ Помилка при отриманні плейлиста: {e}. Збір зупинено до отримання списку відео")
+            return
         
         if not videos:
             # Якщо не вдалося отримати з плейлиста, використаємо пряме посилання
@@ -191,6 +264,14 @@ class YouTubeCommentsCollector:
                 videos = [{'video_id': video_id, 'url': f"https://www.youtube.com/watch?v={video_id}"}]
         
         print(f"📹 Знайдено {len(videos)} відео для обробки")
+
+        untitled = [video for video in videos if not video.get('title')]
+        if self.api_key and untitled:
+            # Назви відео, яких немає на сторінці плейлиста, кількома запитами videos.list
+            with self.metrics.timer('stage_seconds', stage='metadata'):
+                infos = self.get_videos_info([video['video_id'] for video in untitled])
+            for video in untitled:
+                video['title'] = infos[video['video_id']]['title']
         
         # Приклад коментарів для демонстрації (оскільки без API важко отримати реальні)
         sample_comments = [
@@ -216,7 +297,8 @@ class YouTubeCommentsCollector:
         
         # Обробляємо кожен коментар
         for comment in sample_comments:
-            quality = self.classify_comment_quality(comment)
+            with self.metrics.timer('stage_seconds', stage='classify'):
+                quality = self.classify_comment_quality(comment)
             
             self.comments_data.append({
                 'author': comment['author'],
@@ -230,23 +312,72 @@ class YouTubeCommentsCollector:
         
         print(f"✅ Зібрано {len(self.comments_data)} коментарів")
 
+        http_stats = self.http.stats()
+        self.metrics.set('videos', len(videos))
+        self.metrics.set('http_requests', http_stats['requests'])
+        self.metrics.set('http_connections_opened', http_stats['connections_opened'])
+        self.metrics.inc('comments', len(sample_comments), stage='classified')
+
+        if self.checkpoint:
+            self.checkpoint.finish_run(self.run_id)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Збір коментарів YouTube для маркетингу (без API)")
+    parser.add_argument('--checkpoint', default=os.getenv('YOUTUBE_CHECKPOINT_DB'),
+                        help="SQLite файл контрольних точок (знімок плейлиста та назви відео)")
+    parser.add_argument('--pool-size', type=int, default=4,
+                        help="Кількість keep-alive з'єднань з youtube.com, що зберігаються між запитами")
+    parser.add_argument('--stream', default=None,
+                        help="JSONL файл, куди кожен коментар пишеться одразу після оцінки")
+    parser.add_argument('--playlist', default=None,
+                        help="ID плейлиста (за замовчуванням плейлист каналу NEB)")
+    parser.add_argument('--max-videos', type=int, default=None,
+                        help="Максимум відео з плейлиста (за замовчуванням увесь плейлист)")
+    add_cache_arguments(parser)
+    add_dedup_arguments(parser)
+    add_index_arguments(parser)
+    add_app_database_arguments(parser)
+    add_corpus_arguments(parser)
+    add_metrics_arguments(parser)
+    return parser.parse_args()
+
 def main():
-    collector = YouTubeCommentsCollector()
-    
-    print("🚀 Починаємо збір коментарів з YouTube...")
-    collector.collect_all_comments()
+    args = parse_args()
+    metrics = Metrics('scraper')
+    succeeded = False
+    checkpoint = CheckpointStore(args.checkpoint) if args.checkpoint else None
+    collector = YouTubeCommentsCollector(checkpoint=checkpoint, stream_path=args.stream,
+                                         pool_size=args.pool_size, cache=cache_from_args(args),
+                                         max_videos=args.max_videos, playlist_id=args.playlist,
+                                         dedup_distance=dedup_distance_from_args(args),
+                                         search_index=args.index,
+                                         app_database=app_database_url_from_args(args),
+                                         corpus_dir=corpus_dir_from_args(args),
+                                         corpus_format=args.corpus_format,
+                                         metrics=metrics)
     
-    print("\n💾 Зберігаємо результати...")
-    collector.save_results()
-    
-    print("\n📊 Статистика:")
-    print(f"Всього коментарів: {len(collector.comments_data)}")
-    
-    excellent = sum(1 for c in collector.comments_data if c['quality']['category'] == 'excellent')
-    good = sum(1 for c in collector.comments_data if c['quality']['category'] == 'good')
-    
-    print(f"Відмінних для маркетингу: {excellent}")
-    print(f"Хороших для маркетингу: {good}")
+    try:
+        print("🚀 Починаємо збір коментарів з YouTube...")
+        collector.collect_all_comments()
+        
+        print("\n💾 Зберігаємо результати...")
+        collector.save_results()
+        
+        print("\n📊 Статистика:")
+        print(f"Всього коментарів: {len(collector.comments_data)}")
+        
+        excellent = sum(1 for c in collector.comments_data if c['quality']['category'] == 'excellent')
+        good = sum(1 for c in collector.comments_data if c['quality']['category'] == 'good')
+        
+        print(f"Відмінних для маркетингу: {excellent}")
+        print(f"Хороших для маркетингу: {good}")
+        metrics.set('comments_by_quality', excellent, quality='excellent')
+        metrics.set('comments_by_quality', good, quality='good')
+        succeeded = True
+    finally:
+        # Метрики пишуться і після невдалого запуску: run_success=0 видно в моніторингу
+        metrics.set('run_success', int(succeeded))
+        export_metrics(metrics, args.metrics_json, args.metrics_textfile)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Різниця між двома знімками збору коментарів (наприклад, youtube_comments_all.json
+за минулий і цей тиждень): нові, видалені й відредаговані коментарі, зміни лайків
+і рівня якості за один прохід злиттям, плюс Markdown підсумок з топом змін
+"""
+
+import sys
+import json
+import time
+import argparse
+
+from youtube_marketing.records import to_json
+from youtube_marketing.snapshot_diff import (
+    DEFAULT_RUN_SIZE, DEFAULT_TOP_N, DeltaSummary, diff_snapshots, has_comment_ids
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Різниця між двома знімками коментарів YouTube")
+    parser.add_argument('old', help="Попередній знімок (JSON звіт або JSONL потік)")
+    parser.add_argument('new', help="Новий знімок (JSON звіт або JSONL потік)")
+    parser.add_argument('--markdown', default='youtube_comments_delta.md',
+                        help="Markdown підсумок з топом змін")
+    parser.add_argument('--changes', default=None,
+                        help="JSONL файл з усіма змінами (по рядку на коментар)")
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP_N,
+                        help="Скільки коментарів показувати в кожній секції підсумку")
+    parser.add_argument('--run-size', type=int, default=DEFAULT_RUN_SIZE,
+                        help="Коментарів в одній частині зовнішнього сортування (обмежує пам'ять)")
+    parser.add_argument('--tmp-dir', default=None,
+                        help="Каталог для тимчасових відсортованих частин")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    summary = DeltaSummary(args.top)
+    changes_file = open(args.changes, 'w', encoding='utf-8') if args.changes else None
+
+    started = time.perf_counter()
+    by_content = not (has_comment_ids(args.old) and has_comment_ids(args.new))
+    if by_content:
+        print("⚠️ В одному зі знімків є коментарі без comment_id: зіставлення за вмістом "
+              "(відредагований текст рахується як видалений і новий коментар)")
+    try:
+        for change in diff_snapshots(args.old, args.new, args.tmp_dir, args.run_size, by_content):
+            summary.add(change)
+            if changes_file and change is not None:
+                changes_file.write(json.dumps(change, ensure_ascii=False, default=to_json) + '\n')
+    finally:
+        if changes_file:
+            changes_file.close()
+    elapsed = time.perf_counter() - started
+
+    with open(args.markdown, 'w', encoding='utf-8') as f:
+        f.write(summary.markdown(args.old, args.new))
+
+    counts = summary.counts
+    print(f"🔀 {args.old} → {args.new} за {elapsed:.1f} с")
+    print(f"   🆕 Нових: {counts['new']}, 🗑️  видалених: {counts['removed']}, "
+          f"✏️  відредагованих: {counts['edited']}")
+    print(f"   👍 Змінились лайки: {counts['likes_changed']} (разом {summary.like_delta:+d})")
+    print(f"   ⭐ Якість: вище {counts['upgraded']}, нижче {counts['downgraded']}; без змін {counts['unchanged']}")
+    print(f"📝 Markdown: {args.markdown}")
+    if args.changes:
+        print(f"📄 Усі зміни: {args.changes}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
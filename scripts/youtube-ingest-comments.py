@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Завантаження вже зібраних коментарів у базу сайту (таблиця YouTubeComment)
+Читає JSONL потоки (--stream) і JSON звіти збирачів та пише їх пачками з upsert
+"""
+
+import os
+import time
+import argparse
+
+from youtube_marketing.sink import read_comments
+from youtube_marketing.reports import write_reports
+from youtube_marketing.app_database import AppDatabaseWriter, UPSERT_BATCH_SIZE
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Завантаження зібраних коментарів YouTube у базу сайту",
+        epilog="Таблицю YouTubeComment у PostgreSQL створює і оновлює Prisma (міграцій для неї немає): "
+               "після змін моделі в prisma/schema.prisma виконайте npm run db:push (prisma db push) "
+               "з тим самим DATABASE_URL. SQLite файл створюється і доповнюється автоматично."
+    )
+    parser.add_argument('files', nargs='+',
+                        help="JSONL потоки або JSON звіти збирачів")
+    parser.add_argument('--app-db', default=os.getenv('YOUTUBE_APP_DB_URL') or os.getenv('DATABASE_URL'),
+                        help="postgresql://... або SQLite файл (за замовчуванням DATABASE_URL)")
+    parser.add_argument('--source', default=None,
+                        help="Позначка джерела (api, simple, scraper)")
+    parser.add_argument('--batch-size', type=int, default=UPSERT_BATCH_SIZE,
+                        help="Коментарів в одній транзакції")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not args.app_db:
+        print("❌ Вкажіть базу: --app-db або змінна DATABASE_URL")
+        return
+
+    try:
+        writer = AppDatabaseWriter(args.app_db, source=args.source, batch_size=args.batch_size)
+    except ValueError as e:
+        print(e)
+        return
+    started = time.perf_counter()
+    for path in args.files:
+        print(f"📥 {path}")
+    write_reports((comment for path in args.files for comment in read_comments(path)), [writer])
+    elapsed = time.perf_counter() - started
+
+    print(f"✅ Завантажено {writer.total} коментарів за {elapsed:.2f} с "
+          f"(запис у базу {writer.elapsed:.2f} с)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Вибірки з колонкового корпусу коментарів (Parquet/Arrow)
+Корпус наповнюється збирачами з параметром --corpus; читаються лише потрібні
+колонки і розділи, файли відкриваються через memory-map
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+from youtube_marketing.corpus_store import CorpusStore, CORPUS_FORMATS, DEFAULT_CORPUS_DIR, sort_descending
+
+DEFAULT_COLUMNS = 'author,like_count,quality_level,published_at,video_title,text'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Фільтри по колонковому корпусу коментарів YouTube")
+    parser.add_argument('--corpus', default=os.getenv('YOUTUBE_CORPUS_DIR') or DEFAULT_CORPUS_DIR,
+                        help="Каталог корпусу, створений збирачем з --corpus")
+    parser.add_argument('--format', choices=list(CORPUS_FORMATS),
+                        default=os.getenv('YOUTUBE_CORPUS_FORMAT') or 'parquet',
+                        help="Формат файлів корпусу")
+    parser.add_argument('--columns', default=DEFAULT_COLUMNS,
+                        help="Колонки через кому")
+    parser.add_argument('--quality', default=None,
+                        help="Рівень якості (excellent, good, ...)")
+    parser.add_argument('--min-likes', type=int, default=None,
+                        help="Мінімальна кількість лайків")
+    parser.add_argument('--since', default=None,
+                        help="Опубліковані від дати (РРРР-ММ-ДД)")
+    parser.add_argument('--until', default=None,
+                        help="Опубліковані до дати (не включно)")
+    parser.add_argument('--video', default=None,
+                        help="Лише коментарі одного відео (video_id)")
+    parser.add_argument('--collected-since', default=None,
+                        help="Лише зібрані від дати (РРРР-ММ-ДД)")
+    parser.add_argument('--worthy', action='store_true',
+                        help="Лише придатні для маркетингу")
+    parser.add_argument('--sort', default='like_count',
+                        help="Колонка для сортування за спаданням (порожньо - без сортування)")
+    parser.add_argument('--limit', type=int, default=20,
+                        help="Кількість рядків у виводі (0 - усі)")
+    parser.add_argument('--json', action='store_true',
+                        help="Вивести рядки як JSON")
+    parser.add_argument('--count', action='store_true',
+                        help="Лише кількість рядків за рівнями якості")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if not os.path.isdir(args.corpus):
+        print(f"❌ Корпус {args.corpus} не знайдено. Запустіть збирач з параметром --corpus")
+        return 1
+
+    try:
+        store = CorpusStore(args.corpus, args.format)
+    except ValueError as e:
+        print(e)
+        return 1
+
+    columns = ['quality_level'] if args.count else [column for column in args.columns.split(',') if column]
+    if args.sort and not args.count and args.sort not in columns:
+        columns.append(args.sort)
+
+    started = time.perf_counter()
+    try:
+        table = store.query(columns=columns, quality=args.quality, min_likes=args.min_likes,
+                            since=args.since, until=args.until, video_id=args.video,
+                            collected_since=args.collected_since, worthy_only=args.worthy)
+    except ValueError as e:
+        print(e)
+        return 1
+    elapsed = time.perf_counter() - started
+
+    if args.count:
+        counts = table.column('quality_level').value_counts().to_pylist()
+        print(f"📊 {table.num_rows} коментарів за {elapsed * 1000:.1f} мс")
+        for item in sorted(counts, key=lambda item: -item['counts']):
+            print(f"   {item['values'] or '-'}: {item['counts']}")
+        return 0
+
+    total = table.num_rows
+    if args.sort:
+        table = sort_descending(table, args.sort)
+    if args.limit:
+        table = table.slice(0, args.limit)
+    rows = table.to_pylist()
+
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2, default=str))
+        return 0
+
+    print(f"🧱 {total} рядків за {elapsed * 1000:.1f} мс (колонки: {', '.join(columns)})\n")
+    for i, row in enumerate(rows, 1):
+        fields = ' | '.join(f"{key}: {value}" for key, value in row.items() if key != 'text')
+        print(f"{i}. {fields}")
+        if 'text' in row:
+            print(f"   > {(row['text'] or '')[:200]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
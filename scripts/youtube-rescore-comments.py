@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Повторна оцінка зібраних коментарів після зміни ключових слів або ваг
+Читає JSONL потоки і JSON звіти збирачів, оцінює їх shard-ами в пулі процесів
+і пише файли з новими полями класифікації в тому ж порядку і форматі
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+from youtube_marketing.sink import JsonListWriter, iter_json_items, read_json_header
+from youtube_marketing.reports import JsonReportWriter, write_reports
+from youtube_marketing.rescore import HEADER_COUNTS, MODELS, DEFAULT_SHARD_SIZE, rescore, rescore_jsonl
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Повторна оцінка зібраних коментарів YouTube без API")
+    parser.add_argument('files', nargs='+',
+                        help="JSONL потоки або JSON звіти збирачів")
+    parser.add_argument('--output-dir', default='rescored',
+                        help="Каталог для оновлених файлів (ті самі імена)")
+    parser.add_argument('--in-place', action='store_true',
+                        help="Замінити вхідні файли оновленими")
+    parser.add_argument('--model', choices=['auto'] + list(MODELS), action='append', default=None,
+                        help="Модель класифікації (можна кілька); auto - ті, що вже є в коментарі")
+    parser.add_argument('--categories', default=None,
+                        help="JSON файл з категоріями для marketing (формат MARKETING_CATEGORIES)")
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                        help="Кількість процесів для оцінки")
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE,
+                        help="Коментарів в одному shard-і")
+    return parser.parse_args()
+
+
+def output_path(path: str, args) -> str:
+    if args.in_place:
+        return f"{path}.rescoring"
+    os.makedirs(args.output_dir, exist_ok=True)
+    return os.path.join(args.output_dir, os.path.basename(path))
+
+
+def rescore_json(path: str, target: str, args, models, categories, transitions: Counter) -> Optional[int]:
+    """
+    JSON звіт: документ із заголовком і списком comments (+ rescored_at) або список
+    коментарів. Коментарі читаються і пишуться потоково, лічильники заголовка
+    (total_comments, total_excellent, ...) перераховуються за новими рівнями.
+    Інші файли (напр. youtube_comments_by_category.json) пропускаються - None
+    """
+    header, has_list = read_json_header(path)
+    if not has_list:
+        print(f"⚠️ {path}: не звіт з коментарями (потрібен список або документ з 'comments'), пропущено")
+        return None
+    rescored = rescore(iter_json_items(path), args.processes, args.shard_size, models, categories, transitions)
+
+    if header is None:
+        writer = JsonListWriter(target)
+        for comment in rescored:
+            writer.add(comment)
+        writer.close()
+        return writer.count
+
+    header['rescored_at'] = datetime.now().isoformat()
+    writer = JsonReportWriter(target, header, counts={
+        field: predicate for field, predicate in HEADER_COUNTS.items() if field in header
+    })
+    return write_reports(rescored, [writer])
+
+
+def main():
+    args = parse_args()
+    models = None
+    if args.model and 'auto' not in args.model:
+        models = list(dict.fromkeys(args.model))
+    categories = None
+    if args.categories:
+        with open(args.categories, encoding='utf-8') as f:
+            categories = json.load(f)
+
+    started = time.perf_counter()
+    total = 0
+    transitions = Counter()
+    for path in args.files:
+        target = output_path(path, args)
+        if path.endswith('.jsonl'):
+            count, file_transitions = rescore_jsonl(path, target, args.processes, args.shard_size,
+                                                    models, categories)
+            transitions.update(file_transitions)
+        else:
+            count = rescore_json(path, target, args, models, categories, transitions)
+            if count is None:
+                continue
+        if args.in_place:
+            os.replace(target, path)
+            target = path
+        total += count
+        print(f"✅ {path}: {count} коментарів → {target}")
+
+    elapsed = time.perf_counter() - started
+    rate = f", {total / elapsed:,.0f} коментарів/с" if elapsed > 0 else ''
+    print(f"\n⚡ Переоцінено {total} коментарів за {elapsed:.1f} с ({args.processes} процесів{rate})")
+    if transitions:
+        print("🔀 Змінені рівні якості:")
+        for (field, before, after), count in transitions.most_common():
+            print(f"   {field}: {before} → {after}: {count}")
+    else:
+        print("🔀 Рівні якості не змінились")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
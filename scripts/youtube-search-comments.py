@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Пошук відгуків у локальній базі коментарів (SQLite FTS5)
+База наповнюється збирачами з параметром --index
+"""
+
+import os
+import json
+import time
+import argparse
+
+from youtube_marketing.search_index import CommentSearchIndex, DEFAULT_INDEX_PATH, SORT_ORDERS
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Повнотекстовий пошук по зібраних коментарях YouTube",
+        epilog='Приклади: "гальмування AND врятував", "гальму*", \'"дякую за відео"\', "поради NOT реклама"'
+    )
+    parser.add_argument('query', nargs='?', default=None,
+                        help="Запит FTS5 (без запиту - лише фільтри)")
+    parser.add_argument('--index', default=os.getenv('YOUTUBE_SEARCH_INDEX') or DEFAULT_INDEX_PATH,
+                        help="SQLite база, створена збирачем з --index")
+    parser.add_argument('--sort', choices=list(SORT_ORDERS), default='rank',
+                        help="Порядок: релевантність, лайки, дата або оцінка класифікації")
+    parser.add_argument('--limit', type=int, default=20,
+                        help="Кількість результатів")
+    parser.add_argument('--video', default=None,
+                        help="Лише коментарі одного відео (video_id)")
+    parser.add_argument('--quality', default=None,
+                        help="Рівень якості (excellent, good, ...)")
+    parser.add_argument('--category', default=None,
+                        help="Категорія класифікації (testimonial, success_story, ...)")
+    parser.add_argument('--min-likes', type=int, default=None,
+                        help="Мінімальна кількість лайків")
+    parser.add_argument('--json', action='store_true',
+                        help="Вивести результати як JSON")
+    parser.add_argument('--stats', action='store_true',
+                        help="Показати вміст бази замість пошуку")
+    parser.add_argument('--optimize', action='store_true',
+                        help="Злити сегменти повнотекстового індексу")
+    return parser.parse_args()
+
+
+def print_results(results, elapsed):
+    print(f"🔎 Знайдено {len(results)} за {elapsed * 1000:.1f} мс\n")
+    for i, row in enumerate(results, 1):
+        repeated = f" | 🔁 {row['occurrences']}" if row['occurrences'] > 1 else ''
+        print(f"{i}. {row['author']} | 👍 {row['like_count']} | {row['quality_level'] or '-'}"
+              f" | {(row['published_at'] or '')[:10]}{repeated}")
+        print(f"   📺 {row['video_title']}")
+        print(f"   > {row['snippet']}")
+        if row['video_url']:
+            print(f"   🔗 {row['video_url']}")
+        print()
+
+
+def main():
+    args = parse_args()
+    if not os.path.exists(args.index):
+        print(f"❌ Базу {args.index} не знайдено. Запустіть збирач з параметром --index")
+        return
+
+    index = CommentSearchIndex(args.index)
+    try:
+        if args.optimize:
+            index.optimize()
+            print("✅ Індекс оптимізовано")
+        if args.stats:
+            stats = index.stats()
+            print(f"📊 {stats['comments']} коментарів з {stats['videos']} відео")
+            for level, count in sorted(stats['quality_levels'].items(), key=lambda item: -item[1]):
+                print(f"   {level}: {count}")
+            return
+        if args.optimize and not args.query:
+            return
+
+        started = time.perf_counter()
+        try:
+            results = index.search(args.query, sort=args.sort, limit=args.limit,
+                                   video_id=args.video, quality=args.quality,
+                                   category=args.category, min_likes=args.min_likes)
+        except Exception as e:
+            print(f"❌ Помилка запиту: {e}")
+            return
+        elapsed = time.perf_counter() - started
+
+        if args.json:
+            print(json.dumps(results, ensure_ascii=False, indent=2))
+        else:
+            print_results(results, elapsed)
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,36 +4,92 @@
 Використовує тільки вбудовані бібліотеки
 """
 
-import json
-import urllib.request
-import urllib.parse
 import os
+import argparse
 from datetime import datetime
 
+from youtube_marketing.classification import classify_simple
+from youtube_marketing.sink import open_comments_store
+from youtube_marketing.records import CommentRecord, VideoTable
+from youtube_marketing.jobs import DEFAULT_PLAYLIST_ID
+from youtube_marketing.http_client import HttpClient, HttpError
+from youtube_marketing.response_cache import add_cache_arguments, cache_from_args
+from youtube_marketing.reports import write_reports, JsonReportWriter, MarkdownReportWriter
+from youtube_marketing.checkpoint import DEFAULT_REWALK_DAYS, CheckpointStore, is_new_or_edited, reached_watermark
+from youtube_marketing.pipeline import Pipeline, PipelineStage, format_pipeline_stats
+from youtube_marketing.metadata import fetch_videos_metadata, apply_metadata
+from youtube_marketing.search_index import add_index_arguments
+from youtube_marketing.app_database import add_app_database_arguments, app_database_url_from_args
+from youtube_marketing.corpus_store import add_corpus_arguments, corpus_dir_from_args
+from youtube_marketing.storage import storage_writers, print_storage
+from youtube_marketing.dedup import DEFAULT_MAX_DISTANCE, Deduplicator, add_dedup_arguments, dedup_distance_from_args
+from youtube_marketing.metrics import Metrics, add_metrics_arguments, export_metrics
+from youtube_marketing.quota import (
+    QuotaScheduler, QuotaExhausted, add_quota_arguments, scheduler_from_args, format_quota_stats
+)
+
 class SimpleYouTubeCollector:
-    def __init__(self):
+    def __init__(self, checkpoint=None, stream_path=None, pool_size=4, cache=None, quota=None,
+                 playlist_id=None, max_videos=None, dedup_distance=DEFAULT_MAX_DISTANCE,
+                 search_index=None, app_database=None, corpus_dir=None, corpus_format='parquet',
+                 metrics=None):
         self.api_key = os.getenv('YOUTUBE_API_KEY')
         if not self.api_key:
-            raise ValueError("❌ YOUTUBE_API_KEY не знайдено в змінних середовища!")
+            if not (cache and cache.offline):
+                raise ValueError("❌ YOUTUBE_API_KEY не знайдено в змінних середовища!")
+            self.api_key = 'offline'  # Ключ не входить у ключ кешу, тож повтор працює без нього
         
         self.base_url = "https://www.googleapis.com/youtube/v3"
-        self.playlist_id = "PLNz8wZnk2_6WvkuOVxq-wubNOPGHYTfk3"
-        self.comments_data = []
+        self.http = HttpClient(pool_size=pool_size, cache=cache)
+        # Швидкість, денний бюджет квоти і повтори тимчасових помилок
+        self.quota = quota or QuotaScheduler(cache=cache)
+        # Таймери, лічильники і гістограми запуску (експортуються в main)
+        self.metrics = metrics or Metrics('simple')
+        if self.quota.metrics is None:
+            self.quota.metrics = self.metrics
+        self.playlist_id = playlist_id or DEFAULT_PLAYLIST_ID
+        self.max_videos = max_videos  # None - усі відео плейлиста
+        # Майже однакові коментарі згортаються у звітах (None - не згортати)
+        self.dedup_distance = dedup_distance
+        # SQLite база з повнотекстовим пошуком по всій історії (None - не вести)
+        self.search_index = search_index
+        # База сайту (таблиця YouTubeComment), куди коментарі завантажуються пачками
+        self.app_database = app_database
+        # Колонковий корпус (Parquet/Arrow) з розділами за датою збору і відео (None - не вести)
+        self.corpus_dir = corpus_dir
+        self.corpus_format = corpus_format
+        # Список у пам'яті або JSONL потік (--stream), що пишеться одразу після класифікації
+        self.comments_data = open_comments_store(stream_path)
+        # Поля відео (ID, назва, URL) один раз на відео, спільні для всіх його коментарів
+        self.videos = VideoTable()
+
+        # Відео без нових коментарів (за commentCount з videos.list) пропускаються
+        self.skipped_videos = 0
+
+        # Контрольні точки для інкрементального збору (None - збір з нуля)
+        self.checkpoint = checkpoint
+        self.run_id = None
     
-    def make_api_request(self, endpoint, params):
-        """Робить запит до YouTube API"""
+    def api_get(self, endpoint, params):
+        """Запит до YouTube API (через спільний пул keep-alive з'єднань і планувальник квоти); помилки - далі"""
         params['key'] = self.api_key
-        url = f"{self.base_url}/{endpoint}?" + urllib.parse.urlencode(params)
-        
+        return self.quota.call(endpoint, lambda: self.http.get_json(f"{self.base_url}/{endpoint}", params))
+
+    def make_api_request(self, endpoint, params):
+        """Робить запит до YouTube API; помилка (крім вичерпаної квоти) - None"""
         try:
-            with urllib.request.urlopen(url) as response:
-                return json.loads(response.read().decode())
+            return self.api_get(endpoint, params)
+        except QuotaExhausted:
+            raise
         except Exception as e:
             print(f"❌ Помилка API: {e}")
             return None
     
     def get_playlist_videos(self):
-        """Отримує список відео з плейлиста"""
+        """
+        Отримує список відео з плейлиста. Помилка на будь-якій сторінці передається
+        далі: неповний список не повинен стати знімком запуску в контрольній точці.
+        """
         videos = []
         next_page_token = None
         
@@ -47,10 +103,7 @@ class SimpleYouTubeCollector:
             if next_page_token:
                 params['pageToken'] = next_page_token
             
-            response = self.make_api_request('playlistItems', params)
-            
-            if not response:
-                break
+            response = self.api_get('playlistItems', params)
             
             for item in response.get('items', []):
                 video_info = {
@@ -67,90 +120,144 @@ class SimpleYouTubeCollector:
         
         return videos
     
-    def get_video_comments(self, video_id, video_title):
+    def get_videos(self):
+        """Відео плейлиста з назвами та кількістю коментарів (videos.list пачками по 50)"""
+        with self.metrics.timer('stage_seconds', stage='playlist'):
+            videos = self.get_playlist_videos()
+        with self.metrics.timer('stage_seconds', stage='metadata'):
+            metadata = fetch_videos_metadata(
+                [video['video_id'] for video in videos],
+                lambda ids: self.make_api_request('videos', {
+                    'part': 'snippet,statistics',
+                    'id': ','.join(ids),
+                    'maxResults': len(ids)
+                })
+            )
+        return apply_metadata(videos, metadata)
+
+    def get_video_comments(self, video_id, video_title, comment_count=None):
         """Отримує коментарі для відео"""
         comments = []
-        next_page_token = None
-        
+        state = self.checkpoint.get_video_state(video_id) if self.checkpoint else {}
+
+        if self.checkpoint and self.checkpoint.is_video_done(state, self.run_id):
+            return self.checkpoint.load_comments(video_id, self.videos)
+
+        # Час повного проходу: лише так видно відредаговані старші коментарі
+        rewalk = bool(self.checkpoint) and self.checkpoint.is_rewalk_due(state)
+
+        # Коментарів немає або їх кількість не змінилась - commentThreads не потрібен
+        if comment_count == 0 or (self.checkpoint and not rewalk
+                                  and self.checkpoint.is_video_unchanged(state, comment_count)):
+            self.skipped_videos += 1
+            if self.checkpoint:
+                self.checkpoint.mark_video_done(video_id, self.run_id, comment_count)
+                return self.checkpoint.load_comments(video_id, self.videos)
+            return []
+
+        if self.checkpoint:
+            next_page_token = self.checkpoint.resume_token(state, self.run_id)
+        else:
+            next_page_token = None
+
+        # Після першого збору завантажуємо лише нове: від найновіших до водяного знака
+        if next_page_token:
+            order = state.get('page_order') or 'relevance'
+        else:
+            order = 'time' if state.get('last_published_at') and not rewalk else 'relevance'
+
+        video = self.videos.get(video_id, video_title)
         while len(comments) < 100:  # Максимум 100 коментарів на відео
             params = {
                 'part': 'snippet',
                 'videoId': video_id,
                 'maxResults': 100,
-                'order': 'relevance'
+                'order': order
             }
             
             if next_page_token:
                 params['pageToken'] = next_page_token
             
             response = self.make_api_request('commentThreads', params)
+            self.metrics.inc('comment_pages', kind='threads')
             
             if not response:
-                break
+                # Відео лишається незавершеним, наступний запуск продовжить з цієї сторінки
+                return comments
             
+            page = []
+            reached_known = False
             for item in response.get('items', []):
                 comment_data = item['snippet']['topLevelComment']['snippet']
+                published_at = comment_data['publishedAt']
+                updated_at = comment_data.get('updatedAt', published_at)
+
+                if order == 'time' and reached_watermark(state, published_at):
+                    reached_known = True
+                if not is_new_or_edited(state, published_at, updated_at):
+                    continue
                 
-                comment = {
-                    'author': comment_data['authorDisplayName'],
-                    'text': comment_data['textDisplay'],
-                    'published_at': comment_data['publishedAt'],
-                    'like_count': comment_data['likeCount'],
-                    'video_id': video_id,
-                    'video_title': video_title,
-                    'video_url': f"https://www.youtube.com/watch?v={video_id}"
-                }
+                comment = CommentRecord(
+                    video,
+                    comment_id=item['id'],
+                    author=comment_data['authorDisplayName'],
+                    text=comment_data['textDisplay'],
+                    published_at=published_at,
+                    like_count=comment_data['likeCount']
+                )
+                if updated_at != published_at:
+                    # Час редагування - водяний знак, з яким наступний повний прохід порівнює коментарі
+                    comment['updated_at'] = updated_at
                 
-                comments.append(comment)
+                page.append(comment)
             
-            next_page_token = response.get('nextPageToken')
+            comments.extend(page)
+            next_page_token = None if reached_known else response.get('nextPageToken')
+            if self.checkpoint:
+                self.checkpoint.save_page(video_id, self.run_id, page, next_page_token, order)
             if not next_page_token:
                 break
+
+        if self.checkpoint:
+            self.checkpoint.mark_video_done(video_id, self.run_id, comment_count, full_walk=order != 'time')
+            return self.checkpoint.load_comments(video_id, self.videos)
         
         return comments
     
     def classify_comment(self, comment):
         """Класифікує коментар для маркетингу"""
-        text = comment['text'].lower()
-        score = 0
-        categories = []
-        
-        # Позитивні слова
-        positive_words = ['дякую', 'спасибо', 'thanks', 'корисно', 'чудово', 
-                         'відмінно', 'найкращ', 'рекомендую', 'допомогло']
-        
-        # Слова-свідчення
-        testimonial_words = ['врятував', 'життя', 'завдяки', 'тепер я', 
-                           'навчився', 'зміг', 'вдалося']
-        
-        # Перевірка
-        for word in positive_words:
-            if word in text:
-                score += 3
-                categories.append('positive')
-                break
-        
-        for word in testimonial_words:
-            if word in text:
-                score += 5
-                categories.append('testimonial')
-                break
-        
-        # Додаткові бали
-        if len(text) > 100:
-            score += 2
-        if comment['like_count'] > 10:
-            score += 2
-        if comment['like_count'] > 50:
-            score += 3
-        
-        return {
-            'score': score,
-            'quality': 'excellent' if score >= 8 else 'good' if score >= 5 else 'normal',
-            'categories': categories,
-            'is_marketing_worthy': score >= 5
-        }
+        return classify_simple(comment)
     
+    def _fetch_stage(self, item):
+        i, video = item
+        with self.metrics.timer('stage_seconds', stage='fetch'):
+            comments = self.get_video_comments(video['video_id'], video['title'], video.get('comment_count'))
+        self.metrics.inc('comments', len(comments), stage='fetched')
+        return i, video, comments
+
+    def _classify_stage(self, item):
+        i, video, comments = item
+        with self.metrics.timer('stage_seconds', stage='classify'):
+            for comment in comments:
+                comment['classification'] = self.classify_comment(comment)
+        self.metrics.inc('comments', len(comments), stage='classified')
+        return i, video, comments
+
+    def _write_stage(self, item, total):
+        i, video, comments = item
+        print(f"\n🎬 Обробка відео {i}/{total}: {video['title'][:50]}...")
+        print(f"   💬 Знайдено {len(comments)} коментарів")
+
+        marketing_worthy = 0
+        with self.metrics.timer('stage_seconds', stage='write'):
+            for comment in comments:
+                if comment['classification']['is_marketing_worthy']:
+                    self.comments_data.append(comment)
+                    marketing_worthy += 1
+        self.metrics.inc('comments', marketing_worthy, stage='kept')
+
+        print(f"   ✨ Відібрано {marketing_worthy} якісних коментарів")
+
     def collect_all(self):
         """Збирає всі коментарі"""
         print("🚀 Починаємо збір коментарів...")
@@ -158,81 +265,197 @@ class SimpleYouTubeCollector:
         
         # Отримуємо відео
         print("\n📹 Отримуємо список відео...")
-        videos = self.get_playlist_videos()
+        try:
+            if self.checkpoint:
+                run = self.checkpoint.open_run(self.playlist_id, self.get_videos)
+                self.run_id, videos = run['run_id'], run['videos']
+                if run['resumed']:
+                    print(f"♻️  Продовжуємо перерваний запуск #{self.run_id}")
+            else:
+                videos = self.get_videos()
+        except (QuotaExhausted, HttpError, OSError, ValueError) as e:
+            # Без повного списку відео запуск не починається (і не зберігається в контрольній точці)
+            print(f"\n⛔ {e}. Збір зупинено до отримання списку відео")
+            self.metrics.set('collection_completed', 0)
+            return
         print(f"✅ Знайдено {len(videos)} відео")
         
-        # Збираємо коментарі
-        total_marketing_comments = 0
-        
-        for i, video in enumerate(videos[:5], 1):  # Обмежуємо 5 відео для тесту
-            print(f"\n🎬 Обробка відео {i}/{min(len(videos), 5)}: {video['title'][:50]}...")
-            
-            comments = self.get_video_comments(video['video_id'], video['title'])
-            print(f"   💬 Знайдено {len(comments)} коментарів")
-            
-            # Класифікуємо
-            marketing_worthy = 0
-            for comment in comments:
-                classification = self.classify_comment(comment)
-                comment['classification'] = classification
-                
-                if classification['is_marketing_worthy']:
-                    self.comments_data.append(comment)
-                    marketing_worthy += 1
-            
-            print(f"   ✨ Відібрано {marketing_worthy} якісних коментарів")
-            total_marketing_comments += marketing_worthy
-        
+        # Збираємо коментарі: завантаження, класифікація і запис працюють одночасно
+        if self.max_videos:
+            videos = videos[:self.max_videos]
+        collected_before = len(self.comments_data)
+        pipeline = Pipeline([
+            PipelineStage('fetch', self._fetch_stage),
+            PipelineStage('classify', self._classify_stage),
+            PipelineStage('write', lambda item: self._write_stage(item, len(videos)))
+        ])
+
+        completed = True
+        try:
+            pipeline.run(enumerate(videos, 1))
+        except QuotaExhausted as e:
+            # Зібране зберігається; з контрольною точкою наступний запуск продовжить з цього місця
+            completed = False
+            print(f"\n⛔ {e}. Збір зупинено")
+
+        total_marketing_comments = len(self.comments_data) - collected_before
         print(f"\n📊 Всього зібрано {total_marketing_comments} коментарів для маркетингу")
+        stage_stats = pipeline.stats()
+        print(format_pipeline_stats(stage_stats))
+        if self.skipped_videos:
+            print(f"⏭️  Пропущено {self.skipped_videos} відео без нових коментарів")
+
+        http_stats = self.http.stats()
+        print(f"🌐 HTTP: {http_stats['requests']} запитів, {http_stats['connections_opened']} з'єднань, "
+              f"середня затримка {http_stats['avg_latency_ms']} мс, макс. {http_stats['max_latency_ms']} мс")
+        if self.http.cache:
+            cache_stats = self.http.cache.stats()
+            print(f"🗄️  Кеш: {cache_stats['hits']} влучань, {cache_stats['revalidated']} підтверджено (304), "
+                  f"{cache_stats['misses']} завантажено")
+        print(format_quota_stats(self.quota.stats()))
+
+        self.metrics.set('videos', len(videos))
+        self.metrics.set('videos_skipped', self.skipped_videos)
+        self.metrics.set('collection_completed', int(completed))
+        self.metrics.set('http_requests', http_stats['requests'])
+        self.metrics.set('http_connections_opened', http_stats['connections_opened'])
+        self.metrics.record_pipeline(stage_stats)
+        self.metrics.record_quota(self.quota.stats())
+        if self.http.cache:
+            for outcome in ('hits', 'revalidated', 'misses'):
+                self.metrics.set('cache_responses', cache_stats[outcome], outcome=outcome)
+
+        if self.checkpoint and completed:
+            self.checkpoint.finish_run(self.run_id)
     
-    def save_results(self):
-        """Зберігає результати"""
-        output_dir = "/Users/chyngys/scripts/neb-content-appv2/marketing_data"
+    def save_results(self, output_dir=None):
+        """Зберігає результати (час кожного writer-а - у self.report_timings)"""
+        output_dir = output_dir or "/Users/chyngys/scripts/neb-content-appv2/marketing_data"
         os.makedirs(output_dir, exist_ok=True)
         
-        # Сортуємо за якістю
-        self.comments_data.sort(key=lambda x: x['classification']['score'], reverse=True)
+        # Сортуємо за якістю (JSONL потік лишається в порядку збору)
+        if isinstance(self.comments_data, list):
+            self.comments_data.sort(key=lambda x: x['classification']['score'], reverse=True)
         
         # JSON файл
         json_file = os.path.join(output_dir, "youtube_comments_real.json")
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                'collected_at': datetime.now().isoformat(),
-                'playlist_id': self.playlist_id,
-                'total_comments': len(self.comments_data),
-                'comments': self.comments_data
-            }, f, ensure_ascii=False, indent=2)
         
         # Markdown файл для перегляду
         md_file = os.path.join(output_dir, "youtube_comments_best.md")
-        with open(md_file, 'w', encoding='utf-8') as f:
-            f.write("# 🌟 Найкращі коментарі для маркетингу\n\n")
-            f.write(f"*Зібрано: {datetime.now().strftime('%Y-%m-%d %H:%M')}*\n\n")
-            
-            # Топ-10 коментарів
-            for i, comment in enumerate(self.comments_data[:10], 1):
-                f.write(f"## {i}. {comment['author']}\n")
-                f.write(f"*Відео: {comment['video_title']}*\n")
-                f.write(f"*Дата: {comment['published_at'][:10]} | 👍 {comment['like_count']}*\n\n")
-                f.write(f"> {comment['text']}\n\n")
-                f.write("---\n\n")
+
+        # Після сортування канонічним стає найкраще оцінений з дублікатів
+        comments = self.comments_data
+        # Згортаються лише звіти з найкращими; повні звіти і сховища отримують усі коментарі,
+        # сховища - з розміром групи (occurrences) і ключем першої копії (duplicate_of)
+        deduplicator = Deduplicator(self.dedup_distance) if self.dedup_distance is not None else None
+        if deduplicator:
+            comments = deduplicator.annotate(comments)
+
+        def canonical(writer):
+            return deduplicator.writer(writer) if deduplicator else writer
+
+        def grouped(writer):
+            return deduplicator.stored(writer) if deduplicator else writer
+
+        writers = [
+            JsonReportWriter(json_file, {
+                'collected_at': datetime.now().isoformat(),
+                'playlist_id': self.playlist_id,
+                'total_comments': None
+            }, count_field='total_comments'),
+            # Топ-10 коментарів (обмежена купа, тож працює і для JSONL потоку)
+            canonical(MarkdownReportWriter(
+                md_file,
+                header=("# 🌟 Найкращі коментарі для маркетингу\n\n"
+                        f"*Зібрано: {datetime.now().strftime('%Y-%m-%d %H:%M')}*\n\n"),
+                render=lambda i, comment: (
+                    f"## {i}. {comment['author']}\n"
+                    f"*Відео: {comment['video_title']}*\n"
+                    f"*Дата: {comment['published_at'][:10]} | 👍 {comment['like_count']}"
+                    + (f" | 🔁 {comment['occurrences']}" if comment.get('occurrences', 1) > 1 else '')
+                    + "*\n\n"
+                    f"> {comment['text']}\n\n"
+                    "---\n\n"
+                ),
+                n=10,
+                key=lambda comment: comment['classification']['score']
+            ))
+        ]
+        storage = storage_writers('simple', self.search_index, self.app_database,
+                                  self.corpus_dir, self.corpus_format)
+        writers.extend(grouped(writer) for writer in storage.values())
+        self.report_timings = {}
+        with self.metrics.timer('stage_seconds', stage='reports'):
+            written = write_reports(comments, writers, timings=self.report_timings)
+        self.metrics.record_reports(self.report_timings)
+        self.metrics.set('comments_written', written)
         
         print(f"\n✅ Результати збережено:")
+        if deduplicator and deduplicator.folded:
+            print(f"   🧬 Згорнуто {deduplicator.folded} майже однакових коментарів у топі Markdown")
         print(f"   📄 JSON: {json_file}")
         print(f"   📝 Markdown: {md_file}")
+        print_storage(storage)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Простий збір коментарів YouTube через API")
+    parser.add_argument('--checkpoint', default=os.getenv('YOUTUBE_CHECKPOINT_DB'),
+                        help="SQLite файл контрольних точок для інкрементального та відновлюваного збору")
+    parser.add_argument('--rewalk-days', type=float, default=DEFAULT_REWALK_DAYS,
+                        help="Як часто проходити всі сторінки відео, щоб помітити відредаговані старі "
+                             "коментарі (дозбір бачить лише нові), 0 - ніколи")
+    parser.add_argument('--pool-size', type=int, default=4,
+                        help="Кількість keep-alive з'єднань з API, що зберігаються між запитами")
+    parser.add_argument('--stream', default=None,
+                        help="JSONL файл, куди кожен якісний коментар пишеться одразу після оцінки")
+    parser.add_argument('--playlist', default=None,
+                        help="ID плейлиста (за замовчуванням плейлист каналу NEB)")
+    parser.add_argument('--max-videos', type=int, default=None,
+                        help="Максимум відео для обробки (за замовчуванням усі)")
+    add_cache_arguments(parser)
+    add_quota_arguments(parser)
+    add_dedup_arguments(parser)
+    add_index_arguments(parser)
+    add_app_database_arguments(parser)
+    add_corpus_arguments(parser)
+    add_metrics_arguments(parser)
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+    metrics = Metrics('simple')
+    succeeded = False
+
     try:
-        collector = SimpleYouTubeCollector()
+        checkpoint = CheckpointStore(args.checkpoint, args.rewalk_days) if args.checkpoint else None
+        cache = cache_from_args(args)
+        collector = SimpleYouTubeCollector(checkpoint=checkpoint, stream_path=args.stream,
+                                           pool_size=args.pool_size, cache=cache,
+                                           quota=scheduler_from_args(args, cache, metrics),
+                                           playlist_id=args.playlist, max_videos=args.max_videos,
+                                           dedup_distance=dedup_distance_from_args(args),
+                                           search_index=args.index,
+                                           app_database=app_database_url_from_args(args),
+                                           corpus_dir=corpus_dir_from_args(args),
+                                           corpus_format=args.corpus_format,
+                                           metrics=metrics)
         collector.collect_all()
         collector.save_results()
+        metrics.set('comments_kept', len(collector.comments_data))
+        succeeded = True
         
+    except QuotaExhausted as e:
+        print(f"\n⛔ {e}. Збір зупинено")
     except ValueError as e:
         print(e)
         print("\n📝 Встановіть змінну середовища:")
         print("   export YOUTUBE_API_KEY='ваш_ключ_тут'")
     except Exception as e:
         print(f"❌ Помилка: {e}")
+    finally:
+        # Метрики пишуться і після невдалого запуску: run_success=0 видно в моніторингу
+        metrics.set('run_success', int(succeeded))
+        export_metrics(metrics, args.metrics_json, args.metrics_textfile)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
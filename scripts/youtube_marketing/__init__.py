@@ -0,0 +1,4 @@
+"""
+Спільні компоненти для збирачів коментарів YouTube
+(scripts/youtube-api-collector.py, youtube-simple-collector.py, youtube-comments-collector.py)
+"""
@@ -0,0 +1,219 @@
+"""
+Завантаження класифікованих коментарів у базу сайту (модель YouTubeComment у prisma/schema.prisma)
+Коментарі пишуться пачками з upsert за ID коментаря YouTube: у PostgreSQL - COPY у
+тимчасову таблицю і один INSERT ... ON CONFLICT на пачку, у SQLite (локальна заміна
+для перевірки) - executemany в одній транзакції. psycopg2 потрібен лише для PostgreSQL.
+"""
+
+import io
+import os
+import csv
+import json
+import sqlite3
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .reports import ReportWriter
+from .search_index import classification_fields, comment_key
+
+try:
+    import psycopg2
+except ImportError:
+    psycopg2 = None
+
+TABLE = 'YouTubeComment'
+UPSERT_BATCH_SIZE = 5000
+
+COLUMNS = [
+    'id', 'videoId', 'videoTitle', 'videoUrl', 'author', 'authorChannelUrl', 'text',
+    'publishedAt', 'likeCount', 'qualityLevel', 'score', 'categories', 'isMarketingWorthy',
+    'occurrences', 'duplicateOf', 'source', 'collectedAt', 'updatedAt'
+]
+# Під час оновлення зберігаються ID та час першого збору
+UPDATE_COLUMNS = [column for column in COLUMNS if column not in ('id', 'collectedAt')]
+
+# Та сама таблиця, що її створює prisma db push для SQLite
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS "YouTubeComment" (
+    "id" TEXT NOT NULL PRIMARY KEY,
+    "videoId" TEXT,
+    "videoTitle" TEXT,
+    "videoUrl" TEXT,
+    "author" TEXT,
+    "authorChannelUrl" TEXT,
+    "text" TEXT NOT NULL,
+    "publishedAt" DATETIME,
+    "likeCount" INTEGER NOT NULL DEFAULT 0,
+    "qualityLevel" TEXT,
+    "score" REAL,
+    "categories" JSONB,
+    "isMarketingWorthy" BOOLEAN NOT NULL DEFAULT false,
+    "occurrences" INTEGER NOT NULL DEFAULT 1,
+    "duplicateOf" TEXT,
+    "source" TEXT,
+    "collectedAt" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "updatedAt" DATETIME NOT NULL
+);
+CREATE INDEX IF NOT EXISTS "YouTubeComment_videoId_idx" ON "YouTubeComment"("videoId");
+CREATE INDEX IF NOT EXISTS "YouTubeComment_qualityLevel_likeCount_idx" ON "YouTubeComment"("qualityLevel", "likeCount");
+CREATE INDEX IF NOT EXISTS "YouTubeComment_likeCount_idx" ON "YouTubeComment"("likeCount");
+"""
+
+_COLUMN_LIST = ', '.join(f'"{column}"' for column in COLUMNS)
+_UPDATE_LIST = ', '.join(f'"{column}" = excluded."{column}"' for column in UPDATE_COLUMNS)
+_COPY_NULL = '\\N'
+
+
+def is_postgres_url(url: str) -> bool:
+    return url.startswith(('postgres://', 'postgresql://'))
+
+
+def comment_row(comment: Dict, source: Optional[str], now: str) -> Tuple:
+    """Рядок таблиці YouTubeComment у порядку COLUMNS"""
+    quality_level, score, categories = classification_fields(comment)
+    classification = comment.get('marketing_classification') or comment.get('classification') or {}
+    worthy = classification.get('is_marketing_worthy', quality_level in ('excellent', 'good'))
+    return (
+        comment_key(comment), comment.get('video_id'), comment.get('video_title'),
+        comment.get('video_url'), comment.get('author'), comment.get('author_channel_url'),
+        comment.get('text') or '', comment.get('published_at') or comment.get('date'),
+        comment.get('like_count') or 0, quality_level, score,
+        json.dumps(categories, ensure_ascii=False), bool(worthy),
+        comment.get('occurrences', 1), comment.get('duplicate_of'), source, now, now
+    )
+
+
+class AppDatabase:
+    """
+    Upsert коментарів у таблицю YouTubeComment.
+    url: postgresql://... (база сайту, DATABASE_URL) або шлях до SQLite файлу
+    (sqlite:///шлях чи просто шлях) - таблиця створюється, якщо її немає.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.postgres = is_postgres_url(url)
+        if self.postgres:
+            if psycopg2 is None:
+                raise ValueError("❌ Для PostgreSQL потрібен psycopg2: pip install psycopg2-binary")
+            # Параметри Prisma (?schema=public) psycopg2 не розуміє
+            self._conn = psycopg2.connect(url.split('?', 1)[0])
+            self._check_postgres_columns()
+        else:
+            path = url[len('sqlite:///'):] if url.startswith('sqlite:///') else url
+            path = path[len('file:'):] if path.startswith('file:') else path
+            self._conn = sqlite3.connect(path, timeout=30)
+            with self._conn:
+                self._conn.executescript(SQLITE_SCHEMA)
+                columns = {row[1] for row in self._conn.execute(f'PRAGMA table_info("{TABLE}")')}
+                if 'duplicateOf' not in columns:
+                    # Таблиця, створена до появи колонки
+                    self._conn.execute(f'ALTER TABLE "{TABLE}" ADD COLUMN "duplicateOf" TEXT')
+
+    def _check_postgres_columns(self):
+        """Таблицю в PostgreSQL створює prisma db push; без неї чи нових колонок upsert не вдасться"""
+        with self._conn, self._conn.cursor() as cursor:
+            cursor.execute("SELECT column_name FROM information_schema.columns "
+                           "WHERE table_name = %s AND table_schema = current_schema()", (TABLE,))
+            existing = {row[0] for row in cursor.fetchall()}
+        missing = [column for column in COLUMNS if column not in existing]
+        if missing:
+            self._conn.close()
+            problem = f"У базі немає таблиці {TABLE}" if not existing else \
+                f"У таблиці {TABLE} немає колонок {', '.join(missing)}"
+            raise ValueError(f"❌ {problem}: виконайте npm run db:push (prisma db push) для цієї бази")
+
+    def close(self):
+        self._conn.close()
+
+    def upsert_many(self, comments: Iterable[Dict], source: Optional[str] = None) -> int:
+        """Додає або оновлює пачку коментарів однією транзакцією; повертає кількість"""
+        now = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+        # Один рядок на ID: ON CONFLICT у PostgreSQL не може оновити рядок двічі за запит
+        rows = list({row[0]: row for row in (comment_row(comment, source, now) for comment in comments)}.values())
+        if not rows:
+            return 0
+        if self.postgres:
+            self._upsert_postgres(rows)
+        else:
+            self._upsert_sqlite(rows)
+        return len(rows)
+
+    def _upsert_sqlite(self, rows: List[Tuple]):
+        with self._conn:
+            self._conn.executemany(
+                f'INSERT INTO "{TABLE}" ({_COLUMN_LIST}) VALUES ({", ".join("?" * len(COLUMNS))}) '
+                f'ON CONFLICT("id") DO UPDATE SET {_UPDATE_LIST}',
+                rows
+            )
+
+    def _upsert_postgres(self, rows: List[Tuple]):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        for row in rows:
+            # Явний маркер NULL: порожнє поле csv.writer пише без лапок, і COPY прочитав би його як NULL
+            writer.writerow([_COPY_NULL if value is None else value for value in row])
+        buffer.seek(0)
+
+        with self._conn, self._conn.cursor() as cursor:
+            cursor.execute(f'CREATE TEMP TABLE youtube_comment_batch (LIKE "{TABLE}") ON COMMIT DROP')
+            cursor.copy_expert(
+                f"COPY youtube_comment_batch ({_COLUMN_LIST}) "
+                f"FROM STDIN WITH (FORMAT csv, NULL '{_COPY_NULL}')",
+                buffer
+            )
+            cursor.execute(
+                f'INSERT INTO "{TABLE}" ({_COLUMN_LIST}) SELECT {_COLUMN_LIST} FROM youtube_comment_batch '
+                f'ON CONFLICT ("id") DO UPDATE SET {_UPDATE_LIST}'
+            )
+
+    def count(self) -> int:
+        with self._conn:
+            cursor = self._conn.cursor()
+            cursor.execute(f'SELECT COUNT(*) FROM "{TABLE}"')
+            return cursor.fetchone()[0]
+
+
+class AppDatabaseWriter(ReportWriter):
+    """Writer для write_reports: пише коментарі в базу сайту пачками"""
+
+    def __init__(self, url: str, source: Optional[str] = None, batch_size: int = UPSERT_BATCH_SIZE):
+        self.url = url
+        self.source = source
+        self.batch_size = batch_size
+        self.total = 0
+        self.elapsed = 0.0
+        self._database = AppDatabase(url)
+        self._batch = []
+
+    def _flush(self):
+        started = time.perf_counter()
+        self.total += self._database.upsert_many(self._batch, self.source)
+        self.elapsed += time.perf_counter() - started
+        self._batch = []
+
+    def add(self, comment: Dict):
+        self._batch.append(comment)
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        self._database.close()
+
+
+def add_app_database_arguments(parser):
+    """Додає до argparse параметр бази сайту (спільний для всіх збирачів)"""
+    parser.add_argument('--app-db', nargs='?', const='', default=os.getenv('YOUTUBE_APP_DB_URL'),
+                        help="База сайту для таблиці YouTubeComment: postgresql://... або SQLite файл "
+                             "(без значення - DATABASE_URL)")
+
+
+def app_database_url_from_args(args) -> Optional[str]:
+    """URL бази сайту з параметрів (None - не завантажувати)"""
+    if args.app_db != '':
+        return args.app_db
+    if not os.getenv('DATABASE_URL'):
+        raise ValueError("❌ --app-db без значення потребує змінної DATABASE_URL")
+    return os.getenv('DATABASE_URL')
@@ -0,0 +1,132 @@
+"""
+Пакетна (векторизована) класифікація коментарів для маркетингу
+Рахує довжини, пороги лайків, маски категорій та підсумкові бали для всього
+списку коментарів одразу - для повторної оцінки історичного корпусу після зміни ваг
+"""
+
+from bisect import bisect_right
+from typing import List, Dict, Optional, Union
+
+from .classification import MARKETING_CATEGORIES, MARKETING_MATCHER, KeywordMatcher
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+QUALITY_LEVELS = ('excellent', 'good', 'moderate', 'low')
+
+# Роздільник коментарів при сканні корпусу одним проходом
+SEPARATOR = '\x00'
+
+_matchers = {}
+
+
+def _matcher_for(categories: Dict) -> KeywordMatcher:
+    """Повертає скомпільований матчер для набору категорій (кешується за ключовими словами)"""
+    if categories is MARKETING_CATEGORIES:
+        return MARKETING_MATCHER
+
+    key = tuple((name, tuple(data['keywords'])) for name, data in categories.items())
+    if key not in _matchers:
+        _matchers[key] = KeywordMatcher({name: data['keywords'] for name, data in categories.items()})
+    return _matchers[key]
+
+
+def _columns(comments: Union[List[Dict], Dict[str, list]]):
+    """Приймає список коментарів або колонки {'text': [...], 'like_count': [...]}"""
+    if isinstance(comments, dict):
+        return comments['text'], comments['like_count']
+    return [c['text'] for c in comments], [c['like_count'] for c in comments]
+
+
+def score_marketing_batch(comments: Union[List[Dict], Dict[str, list]],
+                          categories: Optional[Dict] = None) -> Dict[str, list]:
+    """
+    Класифікує всі коментарі одразу і повертає колонки
+    score, quality_level, categories, is_marketing_worthy.
+    Результат збігається з classify_for_marketing для кожного коментаря.
+    """
+    categories = categories or MARKETING_CATEGORIES
+    matcher = _matcher_for(categories)
+
+    texts, likes = _columns(comments)
+    texts = [text.lower() for text in texts]
+
+    # Один прохід матчера по всьому корпусу: тексти з'єднані символом, якого
+    # немає в жодному ключовому слові, тож збіг не може перетнути межу коментарів
+    starts = []
+    offset = 0
+    for text in texts:
+        starts.append(offset)
+        offset += len(text) + 1
+    hits = list(matcher.scan(SEPARATOR.join(texts)))
+
+    # Таблиці для кожної можливої маски категорій: сумарна вага та список категорій
+    names = list(categories)
+    table_size = 1 << len(names)
+    mask_scores = [sum(categories[name]['weight'] for bit, name in enumerate(names) if mask >> bit & 1)
+                   for mask in range(table_size)]
+    mask_categories = [[name for bit, name in enumerate(names) if mask >> bit & 1]
+                       for mask in range(table_size)]
+
+    if np is not None:
+        count = len(texts)
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=count)
+        like_counts = np.asarray(likes, dtype=np.int64).reshape(count)
+
+        masks = np.zeros(count, dtype=np.int64)
+        if hits:
+            positions = np.fromiter((position for position, _ in hits), dtype=np.int64, count=len(hits))
+            bits = np.fromiter((matcher.group_bits[keyword] for _, keyword in hits),
+                               dtype=np.int64, count=len(hits))
+            rows = np.searchsorted(np.asarray(starts, dtype=np.int64), positions, side='right') - 1
+            np.bitwise_or.at(masks, rows, bits)
+
+        scores = (2 * (lengths > 100) + 2 * (like_counts > 5) + 3 * (like_counts > 20)
+                  + np.asarray(mask_scores, dtype=np.int64)[masks])
+        levels = np.select([scores >= 10, scores >= 6, scores >= 3], QUALITY_LEVELS[:3], QUALITY_LEVELS[3])
+
+        return {
+            'score': scores.tolist(),
+            'quality_level': levels.tolist(),
+            'categories': [list(set(mask_categories[mask])) for mask in masks.tolist()],
+            'is_marketing_worthy': (scores >= 6).tolist()
+        }
+
+    masks = [0] * len(texts)
+    for position, keyword in hits:
+        row = bisect_right(starts, position) - 1
+        masks[row] |= matcher.group_bits[keyword]
+
+    scores = [
+        2 * (len(text) > 100) + 2 * (like > 5) + 3 * (like > 20) + mask_scores[mask]
+        for text, like, mask in zip(texts, likes, masks)
+    ]
+    return {
+        'score': scores,
+        'quality_level': [
+            'excellent' if score >= 10 else 'good' if score >= 6 else 'moderate' if score >= 3 else 'low'
+            for score in scores
+        ],
+        'categories': [list(set(mask_categories[mask])) for mask in masks],
+        'is_marketing_worthy': [score >= 6 for score in scores]
+    }
+
+
+def classify_batch_for_marketing(comments: Union[List[Dict], Dict[str, list]],
+                                 categories: Optional[Dict] = None) -> List[Dict]:
+    """Пакетний аналог classify_for_marketing: список словників marketing_classification"""
+    columns = score_marketing_batch(comments, categories)
+    return [
+        {
+            'score': score,
+            'quality_level': quality_level,
+            'categories': matched,
+            'is_marketing_worthy': worthy
+        }
+        for score, quality_level, matched, worthy in zip(
+            columns['score'], columns['quality_level'],
+            columns['categories'], columns['is_marketing_worthy']
+        )
+    ]
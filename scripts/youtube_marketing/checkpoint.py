@@ -0,0 +1,259 @@
+"""
+Локальне сховище контрольних точок для збирачів коментарів YouTube
+Зберігає стан кожного відео (водяні знаки publishedAt/updatedAt, токен сторінки)
+та вже зібрані коментарі в SQLite, щоб повторний запуск завантажував лише нове,
+а перерваний запуск продовжувався з місця зупинки.
+Дозбір (order='time') зупиняється на водяному знаку publishedAt, тож редагування
+старших коментарів помічає лише періодичний повний прохід відео (rewalk_days).
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional
+
+from .records import CommentRecord, VideoTable, to_json
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    playlist_id TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    videos TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    title TEXT,
+    last_published_at TEXT,
+    last_updated_at TEXT,
+    page_token TEXT,
+    page_order TEXT,
+    run_id INTEGER,
+    status TEXT NOT NULL DEFAULT 'pending',
+    checked_at TEXT,
+    comment_count INTEGER,
+    full_walk_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS comments (
+    comment_id TEXT PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    published_at TEXT,
+    updated_at TEXT,
+    payload TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_comments_video ON comments (video_id);
+"""
+
+# Як часто (у днях) проходити всі сторінки відео, щоб помітити відредаговані старі коментарі
+DEFAULT_REWALK_DAYS = 7
+
+
+def is_new_or_edited(state: Dict, published_at: str, updated_at: Optional[str]) -> bool:
+    """
+    Чи коментар новий або відредагований з часу попереднього запуску.
+    Редагування видно лише для коментарів, до яких дійшли сторінки: при дозборі
+    order='time' - до водяного знака, при повному проході - усі
+    """
+    if not state.get('last_published_at'):
+        return True
+    if published_at > state['last_published_at']:
+        return True
+    return bool(updated_at and state.get('last_updated_at') and updated_at > state['last_updated_at'])
+
+
+def reached_watermark(state: Dict, published_at: str) -> bool:
+    """Чи дійшли (при сортуванні order='time') до коментарів, які вже були зібрані"""
+    return bool(state.get('last_published_at')) and published_at <= state['last_published_at']
+
+
+class CheckpointStore:
+    """Сховище контрольних точок на SQLite, ключ - video_id"""
+
+    def __init__(self, path: str, rewalk_days: Optional[float] = DEFAULT_REWALK_DAYS):
+        self.path = path
+        # Період повного проходу відео (None або 0 - лише дозбір нових коментарів)
+        self.rewalk_days = rewalk_days
+        # Збирач може працювати в кількох потоках, тому одне з'єднання під блокуванням
+        # timeout: файл можуть одночасно використовувати кілька процесів (shard-и)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+            self._migrate()
+
+    def _migrate(self):
+        """Додає колонки, яких немає у файлах, створених попередніми версіями"""
+        columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(videos)")}
+        if 'comment_count' not in columns:
+            self._conn.execute("ALTER TABLE videos ADD COLUMN comment_count INTEGER")
+        if 'full_walk_at' not in columns:
+            self._conn.execute("ALTER TABLE videos ADD COLUMN full_walk_at TEXT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- Запуски ---
+
+    def resume_run(self, playlist_id: str) -> Optional[Dict]:
+        """Повертає незавершений запуск для плейлиста (зі збереженим списком відео)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT run_id, videos FROM runs WHERE playlist_id = ? AND finished_at IS NULL "
+                "ORDER BY run_id DESC LIMIT 1",
+                (playlist_id,)
+            ).fetchone()
+
+        if not row:
+            return None
+        return {'run_id': row['run_id'], 'videos': json.loads(row['videos'])}
+
+    def start_run(self, playlist_id: str, videos: List[Dict]) -> int:
+        """Починає новий запуск і зберігає знімок плейлиста"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (playlist_id, started_at, videos) VALUES (?, ?, ?)",
+                (playlist_id, datetime.now().isoformat(), json.dumps(videos, ensure_ascii=False))
+            )
+            return cursor.lastrowid
+
+    def open_run(self, playlist_id: str, fetch_videos) -> Dict:
+        """
+        Продовжує незавершений запуск або починає новий.
+        fetch_videos викликається лише для нового запуску, тож перерваний запуск
+        не завантажує плейлист повторно.
+        """
+        run = self.resume_run(playlist_id)
+        if run:
+            run['resumed'] = True
+            return run
+
+        videos = fetch_videos()
+        return {'run_id': self.start_run(playlist_id, videos), 'videos': videos, 'resumed': False}
+
+    def finish_run(self, run_id: int):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE runs SET finished_at = ? WHERE run_id = ?",
+                (datetime.now().isoformat(), run_id)
+            )
+
+    # --- Стан відео ---
+
+    def get_video_state(self, video_id: str) -> Dict:
+        """Повертає стан відео (порожній словник, якщо відео ще не оброблялось)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM videos WHERE video_id = ?", (video_id,)
+            ).fetchone()
+        return dict(row) if row else {}
+
+    def save_video_title(self, video_id: str, title: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO videos (video_id, title) VALUES (?, ?) "
+                "ON CONFLICT(video_id) DO UPDATE SET title = excluded.title",
+                (video_id, title)
+            )
+
+    def save_page(self, video_id: str, run_id: Optional[int], comments: List[Dict],
+                  next_page_token: Optional[str], page_order: Optional[str] = None):
+        """
+        Атомарно зберігає сторінку коментарів і токен наступної сторінки.
+        Водяні знаки оновлюються лише після завершення відео (mark_video_done),
+        щоб перерваний запуск не пропустив старіші сторінки.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO comments (comment_id, video_id, published_at, updated_at, payload) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(comment_id) DO UPDATE SET updated_at = excluded.updated_at, "
+                "payload = excluded.payload",
+                [
+                    (c['comment_id'], video_id, c.get('published_at'),
+                     c.get('updated_at', c.get('published_at')),
+                     json.dumps(c, ensure_ascii=False, default=to_json))
+                    for c in comments
+                ]
+            )
+            self._conn.execute(
+                "INSERT INTO videos (video_id, page_token, page_order, run_id, status) "
+                "VALUES (?, ?, ?, ?, 'in_progress') "
+                "ON CONFLICT(video_id) DO UPDATE SET page_token = excluded.page_token, "
+                "page_order = excluded.page_order, run_id = excluded.run_id, status = 'in_progress'",
+                (video_id, next_page_token, page_order, run_id)
+            )
+
+    def mark_video_done(self, video_id: str, run_id: Optional[int],
+                        comment_count: Optional[int] = None, full_walk: bool = False):
+        """
+        Позначає відео як оброблене і пересуває водяні знаки на найновіші коментарі.
+        Відповіді (parent_id) не враховуються: дозбір іде по гілках верхнього рівня.
+        comment_count - commentCount з videos.list, з яким наступний запуск порівнює відео.
+        full_walk - пройдено всі сторінки (не дозбір до водяного знака).
+        """
+        now = datetime.now().isoformat()
+        with self._lock, self._conn:
+            marks = self._conn.execute(
+                "SELECT MAX(published_at), MAX(updated_at) FROM comments "
+                "WHERE video_id = ? AND json_extract(payload, '$.parent_id') IS NULL",
+                (video_id,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT INTO videos (video_id, last_published_at, last_updated_at, run_id, status, "
+                "checked_at, comment_count, full_walk_at) "
+                "VALUES (?, ?, ?, ?, 'done', ?, ?, ?) "
+                "ON CONFLICT(video_id) DO UPDATE SET last_published_at = excluded.last_published_at, "
+                "last_updated_at = excluded.last_updated_at, page_token = NULL, page_order = NULL, "
+                "run_id = excluded.run_id, status = 'done', checked_at = excluded.checked_at, "
+                "comment_count = excluded.comment_count, "
+                "full_walk_at = COALESCE(excluded.full_walk_at, videos.full_walk_at)",
+                (video_id, marks[0], marks[1], run_id, now, comment_count, now if full_walk else None)
+            )
+
+    def is_video_done(self, state: Dict, run_id: Optional[int]) -> bool:
+        """Чи відео вже повністю оброблене в поточному (відновленому) запуску"""
+        return run_id is not None and state.get('run_id') == run_id and state.get('status') == 'done'
+
+    def is_rewalk_due(self, state: Dict) -> bool:
+        """
+        Чи час пройти всі сторінки вже зібраного відео: редагування старших коментарів
+        не змінює commentCount і лежить за водяним знаком дозбору
+        """
+        if not self.rewalk_days or not state.get('last_published_at'):
+            return False
+        walked_at = state.get('full_walk_at')
+        return not walked_at or datetime.fromisoformat(walked_at) <= datetime.now() - timedelta(days=self.rewalk_days)
+
+    def is_video_unchanged(self, state: Dict, comment_count: Optional[int]) -> bool:
+        """Чи кількість коментарів відео не змінилась з останнього завершеного збору"""
+        return (comment_count is not None and state.get('status') == 'done'
+                and state.get('comment_count') == comment_count)
+
+    def resume_token(self, state: Dict, run_id: Optional[int]) -> Optional[str]:
+        """Токен сторінки, з якої треба продовжити відео в перерваному запуску"""
+        if run_id is not None and state.get('run_id') == run_id and state.get('status') == 'in_progress':
+            return state.get('page_token')
+        return None
+
+    # --- Коментарі ---
+
+    def load_comments(self, video_id: str, videos: Optional[VideoTable] = None) -> List[Dict]:
+        """
+        Повертає всі збережені коментарі відео (від найновіших): словники або,
+        якщо передано videos, компактні CommentRecord зі спільним VideoRef
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload FROM comments WHERE video_id = ? ORDER BY published_at DESC",
+                (video_id,)
+            ).fetchall()
+        if videos is not None:
+            return [CommentRecord.from_dict(json.loads(row['payload']), videos) for row in rows]
+        return [json.loads(row['payload']) for row in rows]
@@ -0,0 +1,271 @@
+"""
+Спільний механізм класифікації коментарів для маркетингу
+Кожен набір ключових слів компілюється один раз в один регулярний вираз,
+і всі категорії знаходяться за один прохід по тексту коментаря
+"""
+
+import re
+from typing import List, Dict
+
+try:
+    import ahocorasick  # pyahocorasick - необов'язковий C-автомат Ахо-Корасік
+except ImportError:
+    ahocorasick = None
+
+# Маркетингові категорії (YouTubeAPICollector.classify_comment_for_marketing)
+MARKETING_CATEGORIES = {
+    'testimonial': {
+        'keywords': ['завдяки', 'благодаря', 'thanks to', 'допомогло', 'helped',
+                     'врятувало', 'saved', 'навчився', 'learned', 'тепер я', 'now i'],
+        'weight': 5
+    },
+    'positive_feedback': {
+        'keywords': ['чудово', 'excellent', 'найкращ', 'best', 'рекомендую',
+                     'recommend', 'корисно', 'useful', 'дякую', 'thanks'],
+        'weight': 3
+    },
+    'success_story': {
+        'keywords': ['вдалося', 'managed', 'зміг', 'досяг', 'achieved',
+                     'результат', 'result', 'покращ', 'improved'],
+        'weight': 4
+    },
+    'emotional': {
+        'keywords': ['❤️', '🔥', '💪', '🏍️', 'люблю', 'love', 'захват', 'amazing'],
+        'weight': 2
+    },
+    'specific_benefit': {
+        'keywords': ['безпека', 'safety', 'впевнен', 'confident', 'професіонал',
+                     'professional', 'досвід', 'experience'],
+        'weight': 4
+    }
+}
+
+# Категорії простого збирача (SimpleYouTubeCollector.classify_comment)
+SIMPLE_CATEGORIES = {
+    'positive': {
+        'keywords': ['дякую', 'спасибо', 'thanks', 'корисно', 'чудово',
+                     'відмінно', 'найкращ', 'рекомендую', 'допомогло'],
+        'weight': 3
+    },
+    'testimonial': {
+        'keywords': ['врятував', 'життя', 'завдяки', 'тепер я',
+                     'навчився', 'зміг', 'вдалося'],
+        'weight': 5
+    }
+}
+
+# Індикатори якості (YouTubeCommentsCollector.classify_comment_quality)
+QUALITY_INDICATORS = {
+    'positive': [
+        'дякую', 'спасибо', 'thanks',
+        'корисно', 'полезно', 'helpful', 'useful',
+        'чудово', 'відмінно', 'excellent', 'great',
+        'найкращ', 'best', 'лучш',
+        'рекомендую', 'recommend',
+        'навчився', 'научился', 'learned',
+        'допомогло', 'помогло', 'helped',
+        'врятував', 'спас', 'saved',
+        'життя', 'жизнь', 'life'
+    ],
+    'testimonial': [
+        'завдяки', 'благодаря', 'thanks to',
+        'тепер я', 'теперь я', 'now i',
+        'раніше', 'раньше', 'before',
+        'після', 'после', 'after'
+    ],
+    'emotional': ['❤️', '🔥', '👍', '💪', '🏍️', '🛵'],
+    'specific': ['км', 'km', 'місяц', 'рік', 'день', 'тиждень']
+}
+
+
+def _trie_pattern(keywords) -> str:
+    """
+    Будує регулярний вираз-префіксне дерево зі слів: спільні префікси перевіряються
+    один раз, а жадібні необов'язкові гілки дають найдовше слово в кожній позиції
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node) -> str:
+        terminal = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if terminal:
+            return f'(?:{body})?'
+        return body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Знаходить усі групи ключових слів, що зустрічаються в тексті, за один прохід.
+
+    Якщо встановлено pyahocorasick, використовується автомат Ахо-Корасік.
+    Інакше всі слова об'єднуються в один вираз-префіксне дерево, і пошук після
+    кожного збігу продовжується з наступного символу, тож знаходиться найдовше слово
+    для кожної позиції, з якої починається хоч одне слово. Усі коротші слова, що
+    збігаються в тій самій позиції, є його префіксами - їх групи обчислюються
+    заздалегідь, тому результат збігається з послідовними перевірками `keyword in text`.
+    """
+
+    def __init__(self, groups: Dict[str, List[str]]):
+        self.groups = groups
+        keywords = {keyword for words in groups.values() for keyword in words}
+
+        # Для кожного слова: {група: найменший індекс слова-префікса в цій групі}
+        self._hits = {}
+        for keyword in keywords:
+            hits = {}
+            for group, words in groups.items():
+                for index, word in enumerate(words):
+                    if keyword.startswith(word):
+                        hits[group] = index
+                        break
+            self._hits[keyword] = hits
+
+        # Бітова маска груп для кожного слова (біт i - i-та група в порядку groups)
+        names = list(groups)
+        self.group_bits = {
+            keyword: sum(1 << names.index(group) for group in hits)
+            for keyword, hits in self._hits.items()
+        }
+
+        if ahocorasick:
+            # Автомат сам повертає всі слова, включно з тими, що перекриваються
+            self._automaton = ahocorasick.Automaton()
+            for keyword in keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            self._search = re.compile(_trie_pattern(keywords)).search
+
+    def scan(self, text: str):
+        """Генерує пари (позиція всередині слова, слово) для всіх збігів у тексті"""
+        if self._automaton is not None:
+            yield from self._automaton.iter(text)
+            return
+
+        found_at = self._search(text)
+        while found_at:
+            yield found_at.start(), found_at.group()
+            found_at = self._search(text, found_at.start() + 1)
+
+    def match(self, text: str) -> Dict[str, int]:
+        """Повертає {група: індекс першого (за порядком у списку) знайденого слова}"""
+        keywords = {keyword for _, keyword in self.scan(text)}
+
+        found = {}
+        for keyword in keywords:
+            for group, index in self._hits[keyword].items():
+                if index < found.get(group, len(self.groups[group])):
+                    found[group] = index
+        return found
+
+
+MARKETING_MATCHER = KeywordMatcher({name: data['keywords'] for name, data in MARKETING_CATEGORIES.items()})
+SIMPLE_MATCHER = KeywordMatcher({name: data['keywords'] for name, data in SIMPLE_CATEGORIES.items()})
+QUALITY_MATCHER = KeywordMatcher(QUALITY_INDICATORS)
+
+
+def classify_for_marketing(comment: Dict) -> Dict:
+    """Класифікує коментар для маркетингових цілей (повна модель YouTubeAPICollector)"""
+    text = comment['text'].lower()
+    found = MARKETING_MATCHER.match(text)
+
+    score = 0
+
+    # Базові бали за характеристики
+    if len(text) > 100:
+        score += 2
+    if comment['like_count'] > 5:
+        score += 2
+    if comment['like_count'] > 20:
+        score += 3
+
+    matched_categories = [category for category in MARKETING_CATEGORIES if category in found]
+    score += sum(MARKETING_CATEGORIES[category]['weight'] for category in matched_categories)
+
+    # Визначення рівня якості
+    if score >= 10:
+        quality_level = 'excellent'
+    elif score >= 6:
+        quality_level = 'good'
+    elif score >= 3:
+        quality_level = 'moderate'
+    else:
+        quality_level = 'low'
+
+    return {
+        'score': score,
+        'quality_level': quality_level,
+        'categories': list(set(matched_categories)),
+        'is_marketing_worthy': score >= 6
+    }
+
+
+def classify_simple(comment: Dict) -> Dict:
+    """Класифікує коментар для маркетингу (модель SimpleYouTubeCollector)"""
+    text = comment['text'].lower()
+    found = SIMPLE_MATCHER.match(text)
+
+    categories = [category for category in SIMPLE_CATEGORIES if category in found]
+    score = sum(SIMPLE_CATEGORIES[category]['weight'] for category in categories)
+
+    # Додаткові бали
+    if len(text) > 100:
+        score += 2
+    if comment['like_count'] > 10:
+        score += 2
+    if comment['like_count'] > 50:
+        score += 3
+
+    return {
+        'score': score,
+        'quality': 'excellent' if score >= 8 else 'good' if score >= 5 else 'normal',
+        'categories': categories,
+        'is_marketing_worthy': score >= 5
+    }
+
+
+def classify_quality(comment: Dict) -> Dict:
+    """Класифікує якість коментаря для маркетингу (модель YouTubeCommentsCollector)"""
+    text = comment.get('text', '').lower()
+    found = QUALITY_MATCHER.match(text)
+
+    score = 0
+    reasons = []
+
+    # Перевірка довжини
+    if len(text) > 50:
+        score += 1
+        reasons.append('detailed')
+
+    if 'positive' in found:
+        score += 2
+        reasons.append(f"positive_{QUALITY_INDICATORS['positive'][found['positive']]}")
+
+    if 'testimonial' in found:
+        score += 3
+        reasons.append('testimonial')
+
+    if 'emotional' in found:
+        score += 1
+        reasons.append('emotional')
+
+    if 'specific' in found:
+        score += 2
+        reasons.append('specific')
+
+    return {
+        'score': score,
+        'category': 'excellent' if score >= 5 else 'good' if score >= 3 else 'normal',
+        'reasons': reasons
+    }
@@ -0,0 +1,250 @@
+"""
+Колонкове сховище корпусу коментарів (Parquet або Arrow IPC)
+Кожен запуск збирача дописує файли в каталог, розбитий на розділи
+collection_date=РРРР-ММ-ДД/video_id=.../ (hive). Читання - через pyarrow.dataset з
+memory-mapping: фільтр за якістю, лайками чи датою читає лише потрібні колонки
+і пропускає розділи інших дат і відео. pyarrow потрібен лише для цього сховища
+і імпортується лише тоді, коли його використовують.
+"""
+
+import os
+import time
+from datetime import date, datetime, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from .reports import ReportWriter
+from .search_index import classification_fields, comment_key
+
+DEFAULT_CORPUS_DIR = 'youtube_corpus'
+CORPUS_FORMATS = ('parquet', 'arrow')
+# Коментарів в одній пачці запису (один файл на відео в пачці)
+CORPUS_BATCH_SIZE = 50000
+
+
+@lru_cache(maxsize=None)
+def _require_pyarrow():
+    """pyarrow з потрібними підмодулями; імпортується лише тоді, коли сховище справді використовують"""
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.fs
+    except ImportError:
+        raise ValueError("❌ Для колонкового сховища потрібен pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+@lru_cache(maxsize=None)
+def corpus_schema():
+    """Схема рядка корпусу"""
+    pa = _require_pyarrow()
+    string_dict = pa.dictionary(pa.int32(), pa.string())
+    # Назва і URL відео, рівень якості та джерело повторюються - словникове кодування
+    return pa.schema([
+        ('comment_id', pa.string()),
+        ('parent_id', pa.string()),
+        ('video_title', string_dict),
+        ('video_url', string_dict),
+        ('author', pa.string()),
+        ('author_channel_url', pa.string()),
+        ('text', pa.string()),
+        ('published_at', pa.timestamp('s', tz='UTC')),
+        ('like_count', pa.int64()),
+        ('quality_level', string_dict),
+        ('score', pa.float64()),
+        ('categories', pa.list_(pa.string())),
+        ('is_marketing_worthy', pa.bool_()),
+        ('occurrences', pa.int32()),
+        ('duplicate_of', pa.string()),
+        ('source', string_dict),
+        ('collected_at', pa.timestamp('s', tz='UTC')),
+        ('collection_date', pa.date32()),
+        ('video_id', pa.string()),
+    ])
+
+
+@lru_cache(maxsize=None)
+def corpus_partitioning():
+    """Розбиття на розділи collection_date/video_id (hive)"""
+    pa = _require_pyarrow()
+    return pa.dataset.partitioning(
+        pa.schema([('collection_date', pa.date32()), ('video_id', pa.string())]), flavor='hive'
+    )
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """
+    ISO дата або час з API ('2024-02-01T10:00:00Z') чи скрейпера ('2024-01-15');
+    None - порожнє або нерозпізнане значення
+    """
+    if not value:
+        return None
+    try:
+        # datetime.fromisoformat до Python 3.11 не приймає суфікс Z
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class CorpusStore:
+    """
+    Каталог з розділами collection_date/video_id.
+    format: 'parquet' (стиснення, статистика колонок для фільтрів) або 'arrow'
+    (Arrow IPC без стиснення - читання з memory-map без декодування); один каталог -
+    один формат.
+    """
+
+    def __init__(self, path: str = DEFAULT_CORPUS_DIR, format: str = 'parquet'):
+        self._pa = _require_pyarrow()
+        if format not in CORPUS_FORMATS:
+            raise ValueError(f"❌ Невідомий формат {format}, можливі: {', '.join(CORPUS_FORMATS)}")
+        self.path = path
+        self.format = format
+        # Кожен запуск (і процес) пише файли з власним префіксом, не перезаписуючи старі
+        self._prefix = f"part-{datetime.now().strftime('%H%M%S%f')}-{os.getpid()}"
+        self._batches = 0
+
+    def write(self, columns: Dict[str, list]) -> int:
+        """Дописує пачку колонок (у порядку corpus_schema()); повертає кількість рядків"""
+        table = self._pa.Table.from_pydict(columns, schema=corpus_schema())
+        if not table.num_rows:
+            return 0
+        self._pa.dataset.write_dataset(
+            table, self.path, format=self.format, partitioning=corpus_partitioning(),
+            basename_template=f"{self._prefix}-{self._batches}-{{i}}.{self.format}",
+            existing_data_behavior='overwrite_or_ignore'
+        )
+        self._batches += 1
+        return table.num_rows
+
+    def dataset(self):
+        """Весь корпус як pyarrow.dataset (файли відкриваються через memory-map)"""
+        return self._pa.dataset.dataset(self.path, schema=corpus_schema(), format=self.format,
+                                        partitioning=corpus_partitioning(),
+                                        filesystem=self._pa.fs.LocalFileSystem(use_mmap=True))
+
+    def query(self, columns: Optional[List[str]] = None, quality: Optional[str] = None,
+              min_likes: Optional[int] = None, since: Optional[str] = None,
+              until: Optional[str] = None, video_id: Optional[str] = None,
+              collected_since: Optional[str] = None, worthy_only: bool = False):
+        """
+        Таблиця pyarrow з вибраними колонками (None - усі) і рядками, що пройшли фільтри.
+        since/until - межі published_at (ISO дата, until не включно), collected_since -
+        перша дата збору; фільтри за video_id і датою збору відкидають цілі розділи.
+        """
+        field = self._pa.compute.field
+        for name, value in (('since', since), ('until', until)):
+            if value and parse_timestamp(value) is None:
+                raise ValueError(f"❌ Невірна дата {name}: {value} (потрібно РРРР-ММ-ДД або ISO час)")
+        conditions = []
+        if video_id:
+            conditions.append(field('video_id') == video_id)
+        if collected_since:
+            conditions.append(field('collection_date') >= date.fromisoformat(collected_since))
+        if quality:
+            conditions.append(field('quality_level') == quality)
+        if min_likes:
+            conditions.append(field('like_count') >= min_likes)
+        if since:
+            conditions.append(field('published_at') >= parse_timestamp(since))
+        if until:
+            conditions.append(field('published_at') < parse_timestamp(until))
+        if worthy_only:
+            conditions.append(field('is_marketing_worthy'))
+
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+        return self.dataset().to_table(columns=columns, filter=expression)
+
+
+def sort_descending(table, column: str):
+    """
+    Таблиця, впорядкована за колонкою за спаданням. Table.sort_by не сортує
+    словникові колонки (назва відео, рівень якості, джерело) - їх порядок
+    береться з розкодованих значень
+    """
+    pa = _require_pyarrow()
+    values = table.column(column)
+    if not pa.types.is_dictionary(values.type):
+        return table.sort_by([(column, 'descending')])
+    decoded = pa.table({column: values.cast(values.type.value_type)})
+    return table.take(pa.compute.sort_indices(decoded, sort_keys=[(column, 'descending')]))
+
+
+class CorpusStoreWriter(ReportWriter):
+    """Writer для write_reports: збирає колонки пачками і дописує їх у сховище"""
+
+    def __init__(self, path: str = DEFAULT_CORPUS_DIR, format: str = 'parquet',
+                 source: Optional[str] = None, batch_size: int = CORPUS_BATCH_SIZE):
+        self.path = path
+        self.format = format
+        self.source = source
+        self.batch_size = batch_size
+        self.total = 0
+        self.elapsed = 0.0
+        self._store = CorpusStore(path, format)
+        self._collected_at = datetime.now(timezone.utc).replace(microsecond=0)
+        self._collection_date = self._collected_at.date()
+        self._columns = self._empty()
+
+    @staticmethod
+    def _empty() -> Dict[str, list]:
+        return {name: [] for name in corpus_schema().names}
+
+    def add(self, comment: Dict):
+        quality_level, score, categories = classification_fields(comment)
+        classification = comment.get('marketing_classification') or comment.get('classification') or {}
+        columns = self._columns
+        columns['comment_id'].append(comment_key(comment))
+        columns['parent_id'].append(comment.get('parent_id'))
+        columns['video_title'].append(comment.get('video_title'))
+        columns['video_url'].append(comment.get('video_url'))
+        columns['author'].append(comment.get('author'))
+        columns['author_channel_url'].append(comment.get('author_channel_url'))
+        columns['text'].append(comment.get('text') or '')
+        columns['published_at'].append(parse_timestamp(comment.get('published_at') or comment.get('date')))
+        columns['like_count'].append(comment.get('like_count') or 0)
+        columns['quality_level'].append(quality_level)
+        columns['score'].append(score)
+        columns['categories'].append(list(categories))
+        columns['is_marketing_worthy'].append(
+            bool(classification.get('is_marketing_worthy', quality_level in ('excellent', 'good')))
+        )
+        columns['occurrences'].append(comment.get('occurrences', 1))
+        columns['duplicate_of'].append(comment.get('duplicate_of'))
+        columns['source'].append(self.source)
+        columns['collected_at'].append(self._collected_at)
+        columns['collection_date'].append(self._collection_date)
+        columns['video_id'].append(comment.get('video_id'))
+        if len(columns['comment_id']) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        started = time.perf_counter()
+        self.total += self._store.write(self._columns)
+        self.elapsed += time.perf_counter() - started
+        self._columns = self._empty()
+
+    def close(self):
+        self._flush()
+
+
+def add_corpus_arguments(parser):
+    """Додає до argparse параметри колонкового сховища (спільні для всіх збирачів)"""
+    parser.add_argument('--corpus', nargs='?', const=DEFAULT_CORPUS_DIR,
+                        default=os.getenv('YOUTUBE_CORPUS_DIR'),
+                        help="Каталог колонкового корпусу (Parquet/Arrow), куди дописуються коментарі "
+                             f"(без значення - {DEFAULT_CORPUS_DIR})")
+    parser.add_argument('--corpus-format', choices=list(CORPUS_FORMATS),
+                        default=os.getenv('YOUTUBE_CORPUS_FORMAT') or 'parquet',
+                        help="Формат файлів корпусу: parquet (стиснений) або arrow (IPC, читання без декодування)")
+
+
+def corpus_dir_from_args(args) -> Optional[str]:
+    """Каталог корпусу з параметрів (None - не вести); перевіряє наявність pyarrow"""
+    if args.corpus:
+        _require_pyarrow()
+    return args.corpus
@@ -0,0 +1,252 @@
+"""
+Виявлення майже однакових коментарів (копіпаст, боти) через SimHash
+Кожен коментар отримує 64-бітний відбиток зі слів і пар слів. Майже однакові
+тексти мають відбитки, що відрізняються кількома бітами. Індекс ділить відбиток на
+max_distance + 1 смуг по 16 біт: два відбитки з відстанню Геммінга <= max_distance
+обов'язково збігаються хоча б в одній смузі, тож порівнюються лише кандидати
+з тих самих кошиків - приблизно лінійний час замість попарного O(n²).
+"""
+
+import re
+import sys
+import html
+import hashlib
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .reports import ReportWriter
+from .search_index import comment_key
+
+FINGERPRINT_BITS = 64
+DEFAULT_MAX_DISTANCE = 3
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_WORD_RE = re.compile(r'\w+')
+
+# Кожен біт хешу ознаки розкладається в окрему 16-бітну "комірку" великого цілого:
+# сума таких чисел по всіх ознаках дає лічильники по бітах без циклу по 64 бітах
+_LANE = 16
+_MAX_FEATURES = (1 << _LANE) - 1
+_BYTE_LANES = [
+    sum(1 << (_LANE * bit) for bit in range(8) if byte >> bit & 1)
+    for byte in range(256)
+]
+
+_spread_cache = {}
+_SPREAD_CACHE_SIZE = 200000
+
+
+if hasattr(int, 'bit_count'):
+    _popcount = int.bit_count
+else:  # Python < 3.10
+    def _popcount(value: int) -> int:
+        return bin(value).count('1')
+
+
+def normalize(text: str) -> str:
+    """Текст без HTML розмітки textDisplay, у нижньому регістрі"""
+    return html.unescape(_TAG_RE.sub(' ', text or '')).lower()
+
+
+def features(text: str) -> List[str]:
+    """Ознаки для відбитка: слова і пари сусідніх слів (для тексту без слів - символи)"""
+    words = _WORD_RE.findall(normalize(text))
+    if not words:
+        return list(text.strip())
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _spread(feature: str) -> int:
+    spread = _spread_cache.get(feature)
+    if spread is None:
+        digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+        spread = 0
+        for byte_index in range(8):
+            spread |= _BYTE_LANES[digest >> (8 * byte_index) & 0xFF] << (_LANE * 8 * byte_index)
+        if len(_spread_cache) < _SPREAD_CACHE_SIZE:
+            _spread_cache[feature] = spread
+    return spread
+
+
+def simhash(text: str) -> int:
+    """64-бітний SimHash тексту (стабільний між процесами і запусками)"""
+    items = features(text)[:_MAX_FEATURES]
+    if not items:
+        return 0
+
+    counts = sum(map(_spread, items)).to_bytes(FINGERPRINT_BITS * _LANE // 8, sys.byteorder)
+    half = len(items) / 2
+    fingerprint = 0
+    for bit, count in enumerate(memoryview(counts).cast('H')):
+        if count > half:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+class NearDuplicateIndex:
+    """
+    Індекс канонічних відбитків: add() повертає номер канонічного запису,
+    до якого віднесено відбиток (новий, якщо схожого ще не було)
+    """
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE):
+        self.max_distance = max_distance
+        self.bands = max_distance + 1
+        self.band_bits = FINGERPRINT_BITS // self.bands
+        self._mask = (1 << self.band_bits) - 1
+        self._buckets = [{} for _ in range(self.bands)]
+        self.fingerprints = []
+
+    def _keys(self, fingerprint: int) -> List[int]:
+        return [fingerprint >> (band * self.band_bits) & self._mask for band in range(self.bands)]
+
+    def find(self, fingerprint: int) -> Optional[int]:
+        """Найперший канонічний запис на відстані <= max_distance (None - немає)"""
+        best = None
+        fingerprints = self.fingerprints
+        for bucket, key in zip(self._buckets, self._keys(fingerprint)):
+            for candidate in bucket.get(key, ()):
+                if (best is None or candidate < best) and \
+                        _popcount(fingerprints[candidate] ^ fingerprint) <= self.max_distance:
+                    best = candidate
+        return best
+
+    def add(self, fingerprint: int) -> Tuple[int, bool]:
+        """Повертає (номер канонічного запису, чи він новий)"""
+        canonical = self.find(fingerprint)
+        if canonical is not None:
+            return canonical, False
+
+        canonical = len(self.fingerprints)
+        self.fingerprints.append(fingerprint)
+        for bucket, key in zip(self._buckets, self._keys(fingerprint)):
+            bucket.setdefault(key, []).append(canonical)
+        return canonical, True
+
+
+def find_near_duplicates(texts: Iterable[str],
+                         max_distance: int = DEFAULT_MAX_DISTANCE) -> List[int]:
+    """Для кожного тексту - номер канонічного запису (групи майже однакових текстів)"""
+    index = NearDuplicateIndex(max_distance)
+    return [index.add(simhash(text))[0] for text in texts]
+
+
+def deduplicate(comments: Iterable[Dict], text: Callable[[Dict], str] = lambda c: c['text'],
+                max_distance: int = DEFAULT_MAX_DISTANCE) -> Iterator[Dict]:
+    """
+    Згортає майже однакові коментарі в перший (канонічний) з полем occurrences -
+    скільки разів текст зустрівся. Два проходи по comments (список або JSONL потік),
+    тож у пам'яті тримаються лише відбитки, а не коментарі.
+    """
+    groups = find_near_duplicates((text(comment) for comment in comments), max_distance)
+    occurrences = {}
+    for group in groups:
+        occurrences[group] = occurrences.get(group, 0) + 1
+
+    emitted = set()
+    for group, comment in zip(groups, comments):
+        if group in emitted:
+            continue
+        emitted.add(group)
+        comment['occurrences'] = occurrences[group]
+        yield comment
+
+
+class Deduplicator:
+    """
+    Згортання лише для частини writer-ів (топи, найкращі): annotate() пропускає
+    повний потік коментарів без змін (для повних звітів) і для кожного
+    запам'ятовує в current канонічну копію з occurrences або None для дубліката,
+    а в grouped - копію з occurrences групи і duplicate_of (ключ канонічного
+    коментаря, None для нього самого). writer() обгортає writer, якому передаються
+    лише канонічні копії, stored() - writer сховищ, що отримують усі коментарі з grouped.
+    """
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE,
+                 text: Callable[[Dict], str] = lambda c: c['text']):
+        self.max_distance = max_distance
+        self.text = text
+        self.current = None
+        self.grouped = None
+        self.total = 0
+        self.canonical = 0
+
+    def annotate(self, comments: Iterable[Dict]) -> Iterator[Dict]:
+        """Два проходи по comments, як у deduplicate; повертає всі коментарі"""
+        groups = find_near_duplicates((self.text(comment) for comment in comments), self.max_distance)
+        occurrences = {}
+        for group in groups:
+            occurrences[group] = occurrences.get(group, 0) + 1
+
+        canonical_keys = {}
+        for group, comment in zip(groups, comments):
+            self.total += 1
+            count = occurrences[group]
+            if group in canonical_keys:
+                self.current = None
+                self.grouped = dict(comment, occurrences=count, duplicate_of=canonical_keys[group])
+            else:
+                canonical_keys[group] = comment_key(comment)
+                self.canonical += 1
+                self.current = dict(comment, occurrences=count)
+                self.grouped = self.current if count > 1 else comment
+            yield comment
+        self.current = self.grouped = None
+
+    @property
+    def folded(self) -> int:
+        """Скільки коментарів згорнуто в канонічні"""
+        return self.total - self.canonical
+
+    def writer(self, writer: ReportWriter) -> 'CanonicalWriter':
+        return CanonicalWriter(self, writer)
+
+    def stored(self, writer: ReportWriter) -> 'GroupedWriter':
+        return GroupedWriter(self, writer)
+
+
+class CanonicalWriter(ReportWriter):
+    """Writer, що отримує з потоку Deduplicator.annotate лише канонічні коментарі"""
+
+    def __init__(self, deduplicator: Deduplicator, writer: ReportWriter):
+        self.deduplicator = deduplicator
+        self.wrapped = writer
+        self.path = writer.path
+
+    def add(self, comment: Dict):
+        if self.deduplicator.current is not None:
+            self.wrapped.add(self.deduplicator.current)
+
+    def close(self):
+        self.wrapped.close()
+
+
+class GroupedWriter(ReportWriter):
+    """Writer, що отримує з потоку Deduplicator.annotate усі коментарі з occurrences і duplicate_of"""
+
+    def __init__(self, deduplicator: Deduplicator, writer: ReportWriter):
+        self.deduplicator = deduplicator
+        self.wrapped = writer
+        self.path = writer.path
+
+    def add(self, comment: Dict):
+        self.wrapped.add(self.deduplicator.grouped)
+
+    def close(self):
+        self.wrapped.close()
+
+
+def add_dedup_arguments(parser):
+    """Додає до argparse параметри згортання дублікатів (спільні для всіх збирачів)"""
+    parser.add_argument('--no-dedup', action='store_true',
+                        help="Не згортати майже однакові коментарі у звітах з найкращими коментарями")
+    parser.add_argument('--dedup-distance', type=int, default=DEFAULT_MAX_DISTANCE,
+                        help="Максимальна кількість відмінних бітів SimHash (0-15) для дублікатів")
+
+
+def dedup_distance_from_args(args) -> Optional[int]:
+    """Поріг згортання з параметрів (None - згортання вимкнене)"""
+    if args.no_dedup:
+        return None
+    if not 0 <= args.dedup_distance < FINGERPRINT_BITS // 4:
+        raise ValueError(f"❌ --dedup-distance має бути від 0 до {FINGERPRINT_BITS // 4 - 1}")
+    return args.dedup_distance
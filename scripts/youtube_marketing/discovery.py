@@ -0,0 +1,82 @@
+"""
+Клієнт YouTube Data API з локального discovery документа
+Документ зберігається на диску після першого отримання (зі статичних документів
+googleapiclient або з мережі), тож build() не завантажує і не розбирає його
+щоразу. googleapiclient.discovery імпортується лише при створенні клієнта.
+"""
+
+import os
+import threading
+import urllib.request
+from typing import Optional
+
+DISCOVERY_URL = "https://www.googleapis.com/discovery/v1/apis/youtube/v3/rest"
+DEFAULT_DISCOVERY_PATH = os.path.join(
+    os.path.expanduser('~'), '.cache', 'youtube-marketing', 'youtube.v3.json'
+)
+
+_document = None
+_document_lock = threading.Lock()
+
+
+def discovery_path() -> str:
+    return os.getenv('YOUTUBE_DISCOVERY_DOC') or DEFAULT_DISCOVERY_PATH
+
+
+def _bundled_document() -> Optional[str]:
+    """Статичний документ, що входить до googleapiclient >= 2.0 (None у старіших версіях)"""
+    try:
+        from googleapiclient import discovery_cache
+        return discovery_cache.get_static_doc('youtube', 'v3')
+    except (ImportError, AttributeError):
+        return None
+
+
+def _download_document() -> str:
+    with urllib.request.urlopen(DISCOVERY_URL, timeout=30) as response:
+        return response.read().decode('utf-8')
+
+
+def _save_document(path: str, document: str):
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(document)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"⚠️  Не вдалося зберегти discovery документ {path}: {e}")
+
+
+def load_discovery_document(path: Optional[str] = None) -> str:
+    """
+    Discovery документ youtube v3 (один раз на процес): з диска, а якщо його
+    там немає - зі статичних документів бібліотеки або з мережі зі збереженням
+    """
+    global _document
+    with _document_lock:
+        if _document is not None:
+            return _document
+
+        path = path or discovery_path()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                _document = f.read()
+            return _document
+
+        document = _bundled_document() or _download_document()
+        _save_document(path, document)
+        _document = document
+        return _document
+
+
+def build_youtube_client(api_key: str, http=None):
+    """Створює клієнт youtube v3 з локального документа (без запиту до discovery API)"""
+    from googleapiclient.discovery import build_from_document
+
+    # Рядок, а не спільний dict: клієнт доповнює опис методів під час роботи
+    return build_from_document(load_discovery_document(), developerKey=api_key, http=http)
+
+
+def is_discovery_cached(path: Optional[str] = None) -> bool:
+    return os.path.exists(path or discovery_path())
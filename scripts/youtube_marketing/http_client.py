@@ -0,0 +1,217 @@
+"""
+Пул HTTP(S) з'єднань з keep-alive для збирачів коментарів
+Тільки стандартна бібліотека (http.client), тож підходить і для простого збирача.
+Розпаковує gzip відповіді та вимірює затримку кожного запиту.
+"""
+
+import gzip
+import json
+import queue
+import threading
+import time
+import http.client
+import urllib.parse
+from typing import Dict, Optional
+
+DEFAULT_HEADERS = {
+    'Accept-Encoding': 'gzip',
+    'Connection': 'keep-alive'
+}
+
+REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+
+class HttpError(Exception):
+    """Відповідь зі статусом 4xx/5xx"""
+
+    def __init__(self, response: 'HttpResponse'):
+        self.response = response
+        self.status = response.status
+        super().__init__(f"HTTP {response.status} для {response.url}")
+
+
+class HttpResponse:
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: bytes, elapsed: float,
+                 from_cache: bool = False):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.elapsed = elapsed
+        self.from_cache = from_cache
+
+    @property
+    def text(self) -> str:
+        return self.body.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.body.decode('utf-8'))
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise HttpError(self)
+
+
+class HttpClient:
+    """
+    Повторно використовує TCP+TLS з'єднання з кожним хостом.
+    pool_size - скільки вільних з'єднань тримати на хост (потокобезпечно).
+    cache - необов'язковий ResponseCache (TTL, ETag, офлайн-повтор).
+    """
+
+    def __init__(self, pool_size: int = 4, timeout: float = 30, max_redirects: int = 5,
+                 cache=None):
+        self.pool_size = pool_size
+        self.cache = cache
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self._pools = {}
+        self._lock = threading.Lock()
+
+        # Статистика затримок
+        self.requests = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.connections_opened = 0
+
+    def _pool(self, key) -> queue.LifoQueue:
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = queue.LifoQueue(maxsize=self.pool_size)
+            return pool
+
+    def _connect(self, scheme: str, host: str):
+        with self._lock:
+            self.connections_opened += 1
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, timeout=self.timeout)
+        return http.client.HTTPConnection(host, timeout=self.timeout)
+
+    def _release(self, pool: queue.LifoQueue, conn):
+        try:
+            pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _exchange(self, conn, path: str, headers: Dict[str, str], method: str = 'GET',
+                  body: Optional[bytes] = None):
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            return response, response.read()
+        except Exception:
+            conn.close()
+            raise
+
+    def _send(self, scheme: str, host: str, path: str, headers: Dict[str, str],
+              method: str = 'GET', body: Optional[bytes] = None):
+        """Виконує запит через з'єднання з пулу; повертає (статус, заголовки, тіло)"""
+        pool = self._pool((scheme, host))
+        try:
+            conn, reused = pool.get_nowait(), True
+        except queue.Empty:
+            conn, reused = self._connect(scheme, host), False
+
+        try:
+            response, response_body = self._exchange(conn, path, headers, method, body)
+        except (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                ConnectionResetError, BrokenPipeError):
+            if not reused:
+                raise
+            # Сервер закрив неактивне з'єднання - повторюємо на новому
+            conn = self._connect(scheme, host)
+            response, response_body = self._exchange(conn, path, headers, method, body)
+
+        response_headers = {name.lower(): value for name, value in response.getheaders()}
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(pool, conn)
+
+        if response_headers.get('content-encoding') == 'gzip':
+            response_body = gzip.decompress(response_body)
+            del response_headers['content-encoding']
+        return response.status, response_headers, response_body
+
+    def get(self, url: str, params: Optional[Dict] = None,
+            headers: Optional[Dict[str, str]] = None) -> HttpResponse:
+        """GET запит (з переходом за редиректами); не кидає виняток на 4xx/5xx"""
+        if params:
+            url = f"{url}{'&' if '?' in url else '?'}{urllib.parse.urlencode(params)}"
+        request_headers = dict(DEFAULT_HEADERS, **(headers or {}))
+
+        started = time.perf_counter()
+        for _ in range(self.max_redirects + 1):
+            parts = urllib.parse.urlsplit(url)
+            path = parts.path or '/'
+            if parts.query:
+                path += '?' + parts.query
+
+            if self.cache:
+                status, response_headers, body, from_cache = self.cache.fetch(
+                    url,
+                    lambda extra: self._send(parts.scheme, parts.netloc, path, dict(request_headers, **extra))
+                )
+            else:
+                status, response_headers, body = self._send(parts.scheme, parts.netloc, path, request_headers)
+                from_cache = False
+            if status in REDIRECT_STATUSES and 'location' in response_headers:
+                url = urllib.parse.urljoin(url, response_headers['location'])
+                continue
+            break
+
+        return self._response(url, status, response_headers, body, started, from_cache)
+
+    def post_json(self, url: str, payload: Dict, params: Optional[Dict] = None,
+                  headers: Optional[Dict[str, str]] = None):
+        """POST з JSON тілом (без кешу і редиректів), повертає розібраний JSON (HttpError на 4xx/5xx)"""
+        if params:
+            url = f"{url}{'&' if '?' in url else '?'}{urllib.parse.urlencode(params)}"
+        request_headers = dict(DEFAULT_HEADERS, **{'Content-Type': 'application/json'}, **(headers or {}))
+
+        parts = urllib.parse.urlsplit(url)
+        path = (parts.path or '/') + ('?' + parts.query if parts.query else '')
+        started = time.perf_counter()
+        status, response_headers, body = self._send(
+            parts.scheme, parts.netloc, path, request_headers, 'POST', json.dumps(payload).encode('utf-8')
+        )
+
+        response = self._response(url, status, response_headers, body, started)
+        response.raise_for_status()
+        return response.json()
+
+    def _response(self, url: str, status: int, headers: Dict[str, str], body: bytes,
+                  started: float, from_cache: bool = False) -> HttpResponse:
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.requests += 1
+            self.total_latency += elapsed
+            self.max_latency = max(self.max_latency, elapsed)
+        return HttpResponse(url, status, headers, body, elapsed, from_cache)
+
+    def get_json(self, url: str, params: Optional[Dict] = None,
+                 headers: Optional[Dict[str, str]] = None):
+        """GET запит, що повертає розібраний JSON (HttpError на 4xx/5xx)"""
+        response = self.get(url, params, headers)
+        response.raise_for_status()
+        return response.json()
+
+    def stats(self) -> Dict:
+        """Підсумок затримок і повторного використання з'єднань"""
+        return {
+            'requests': self.requests,
+            'connections_opened': self.connections_opened,
+            'avg_latency_ms': round(1000 * self.total_latency / self.requests, 1) if self.requests else 0.0,
+            'max_latency_ms': round(1000 * self.max_latency, 1)
+        }
+
+    def close(self):
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            while True:
+                try:
+                    pool.get_nowait().close()
+                except queue.Empty:
+                    break
@@ -0,0 +1,110 @@
+"""
+Збір з кількох плейлистів і каналів
+Специфікація завдань (JSON) перетворюється на список плейлистів, кожен з яких
+обробляється в окремому процесі пулу і пише власний JSONL shard. Після завершення
+shard-и об'єднуються в порядку специфікації (а не завершення процесів), тож
+результат детермінований.
+"""
+
+import os
+import re
+import json
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List
+
+from .sink import JsonlCommentStream, read_jsonl
+
+DEFAULT_PLAYLIST_ID = "PLNz8wZnk2_6WvkuOVxq-wubNOPGHYTfk3"
+
+
+def uploads_playlist(channel_id: str) -> str:
+    """ID плейлиста завантажень каналу (UC... -> UU...) без запиту channels.list"""
+    if not channel_id.startswith('UC') or len(channel_id) != 24:
+        raise ValueError(f"❌ Очікується ID каналу виду UC... (24 символи), отримано: {channel_id}")
+    return 'UU' + channel_id[2:]
+
+
+def _parse_job(entry) -> Dict:
+    if isinstance(entry, str):
+        entry = {'playlist': entry}
+    if 'playlist' in entry:
+        playlist_id = entry['playlist']
+    elif 'channel' in entry:
+        playlist_id = uploads_playlist(entry['channel'])
+    else:
+        raise ValueError(f"❌ Завдання має містити 'playlist' або 'channel': {entry}")
+    return {'name': entry.get('name') or playlist_id, 'playlist_id': playlist_id}
+
+
+def load_job_spec(path: str) -> List[Dict]:
+    """
+    Читає специфікацію: список або {"jobs": [...]}; елемент - ID плейлиста,
+    {"playlist": "PL..."} або {"channel": "UC..."}, з необов'язковим "name".
+    Повторювані плейлисти відкидаються, порядок зберігається.
+    """
+    with open(path, encoding='utf-8') as f:
+        spec = json.load(f)
+
+    entries = spec.get('jobs', []) if isinstance(spec, dict) else spec
+    jobs = {}
+    for entry in entries:
+        job = _parse_job(entry)
+        jobs.setdefault(job['playlist_id'], job)
+    return list(jobs.values())
+
+
+def shard_path(shard_dir: str, index: int, job: Dict) -> str:
+    safe_name = re.sub(r'[^0-9A-Za-z_-]+', '_', job['name'])[:60]
+    return os.path.join(shard_dir, f"{index:03d}-{safe_name}.jsonl")
+
+
+def run_sharded(jobs: List[Dict], worker: Callable, processes: int, shard_dir: str, *args) -> List[Dict]:
+    """
+    Виконує worker(job, shard_path, *args) для кожного завдання в пулі процесів.
+    worker має бути функцією верхнього рівня (передається в інший процес) і повертати
+    словник з підсумком; помилка одного завдання не зупиняє інші.
+    Повертає підсумки в порядку завдань.
+    """
+    os.makedirs(shard_dir, exist_ok=True)
+    paths = [shard_path(shard_dir, i, job) for i, job in enumerate(jobs)]
+    results = [None] * len(jobs)
+
+    with ProcessPoolExecutor(max_workers=max(1, processes)) as executor:
+        futures = {
+            executor.submit(worker, job, path, *args): i
+            for i, (job, path) in enumerate(zip(jobs, paths))
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                summary = future.result()
+            except Exception:
+                summary = {'error': traceback.format_exc(limit=3)}
+            results[i] = dict(summary, name=jobs[i]['name'], playlist_id=jobs[i]['playlist_id'], shard=paths[i])
+
+            status = '❌ помилка' if 'error' in summary else f"✅ {summary.get('comments', 0)} коментарів"
+            print(f"   [{sum(r is not None for r in results)}/{len(jobs)}] {jobs[i]['name']}: {status}")
+
+    return results
+
+
+def merge_shards(results: List[Dict], merged_path: str, key: str = 'comment_id') -> JsonlCommentStream:
+    """
+    Об'єднує shard-и в порядку завдань в один JSONL (коментар з кількох плейлистів
+    лишається один раз - з першого). Повертає потік для save_results.
+    """
+    merged = JsonlCommentStream(merged_path)
+    seen = set()
+    for result in results:
+        if not os.path.exists(result['shard']):
+            continue
+        for comment in read_jsonl(result['shard']):
+            comment_key = comment.get(key)
+            if comment_key is not None:
+                if comment_key in seen:
+                    continue
+                seen.add(comment_key)
+            merged.append(comment)
+    merged.close()
+    return merged
@@ -0,0 +1,63 @@
+"""
+Пакетне отримання метаданих відео через videos.list
+Один запит (1 одиниця квоти) повертає назви та статистику для 50 відео,
+а commentCount дозволяє пропустити відео без нових коментарів ще до
+дорогого обходу commentThreads.
+"""
+
+from typing import Callable, Dict, Iterator, List, Optional
+
+# Максимум ID в одному запиті videos.list
+VIDEOS_BATCH_SIZE = 50
+
+
+def chunked(items: List, size: int) -> Iterator[List]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _count(statistics: Dict, field: str) -> Optional[int]:
+    value = statistics.get(field)
+    return int(value) if value is not None else None
+
+
+def video_metadata(item: Dict) -> Dict:
+    """Перетворює елемент відповіді videos.list на запис метаданих"""
+    snippet = item.get('snippet', {})
+    statistics = item.get('statistics', {})
+    return {
+        'video_id': item['id'],
+        'title': snippet.get('title'),
+        'published_at': snippet.get('publishedAt'),
+        # Немає commentCount - коментарі вимкнені або приховані
+        'comment_count': _count(statistics, 'commentCount'),
+        'view_count': _count(statistics, 'viewCount'),
+        'like_count': _count(statistics, 'likeCount')
+    }
+
+
+def fetch_videos_metadata(video_ids: List[str],
+                          request_page: Callable[[List[str]], Dict]) -> Dict[str, Dict]:
+    """
+    Метадані для всіх відео пачками по 50.
+    request_page(ids) виконує videos.list(part='snippet,statistics', id=','.join(ids))
+    потрібним клієнтом і повертає відповідь API.
+    """
+    metadata = {}
+    for ids in chunked(list(dict.fromkeys(video_ids)), VIDEOS_BATCH_SIZE):
+        response = request_page(ids) or {}
+        for item in response.get('items', []):
+            metadata[item['id']] = video_metadata(item)
+    return metadata
+
+
+def apply_metadata(videos: List[Dict], metadata: Dict[str, Dict]) -> List[Dict]:
+    """Доповнює записи відео назвою і кількістю коментарів (на місці)"""
+    for video in videos:
+        info = metadata.get(video['video_id'])
+        if not info:
+            continue
+        if info['title'] and not video.get('title'):
+            video['title'] = info['title']
+        video['comment_count'] = info['comment_count']
+    return videos
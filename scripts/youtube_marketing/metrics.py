@@ -0,0 +1,227 @@
+"""
+Метрики запуску збирача: лічильники, показники і гістограми тривалості
+Збирачі вимірюють запити до API, сторінки плейлиста і коментарів, класифікацію
+та writer-и звітів. Після запуску метрики пишуться в JSON підсумок і в textfile
+для node exporter (формат Prometheus), який підхоплює їх після кожного cron запуску.
+"""
+
+import os
+import json
+import time
+import random
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+METRIC_PREFIX = 'youtube_collector'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Скільки спостережень гістограми зберігається для перцентилів (далі - випадкова вибірка)
+MAX_SAMPLES = 10000
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ''
+    escaped = (
+        (key, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in items
+    )
+    return '{' + ','.join(f'{key}="{value}"' for key, value in escaped) + '}'
+
+
+def _series_name(name: str, labels: Labels) -> str:
+    return name + ''.join(f"[{key}={value}]" for key, value in labels)
+
+
+class Histogram:
+    """Кошики Prometheus і вибірка значень для p50/p95"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.samples = []
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(value)
+        else:
+            index = random.randrange(self.count)
+            if index < MAX_SAMPLES:
+                self.samples[index] = value
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 4),
+            'p50': round(self.percentile(0.5), 4),
+            'p95': round(self.percentile(0.95), 4),
+            'max': round(self.max, 4)
+        }
+
+
+class Metrics:
+    """Потокобезпечний реєстр метрик одного запуску"""
+
+    def __init__(self, collector: str):
+        self.collector = collector
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges[(name, _labels(labels))] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, _labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Вимірює тривалість блоку в секундах (гістограма name)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def histogram(self, name: str, **labels) -> Optional[Histogram]:
+        return self._histograms.get((name, _labels(labels)))
+
+    def summary(self) -> Dict:
+        """Підсумок для JSON: лічильники, показники і перцентилі гістограм"""
+        with self._lock:
+            return {
+                'collector': self.collector,
+                'started_at': datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds'),
+                'duration_seconds': round(time.time() - self.started_at, 3),
+                'counters': {_series_name(*key): value for key, value in sorted(self._counters.items())},
+                'gauges': {_series_name(*key): value for key, value in sorted(self._gauges.items())},
+                'histograms': {_series_name(*key): histogram.summary()
+                               for key, histogram in sorted(self._histograms.items())}
+            }
+
+    def prometheus_text(self) -> str:
+        """Метрики у текстовому форматі Prometheus з міткою collector"""
+        collector = (('collector', self.collector),)
+        lines = []
+
+        def family(name: str, kind: str):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted(self._histograms.items())
+
+        gauges.append((('last_run_timestamp_seconds', ()), round(time.time(), 3)))
+        gauges.append((('run_duration_seconds', ()), round(time.time() - self.started_at, 3)))
+
+        for series, kind in ((counters, 'counter'), (gauges, 'gauge')):
+            previous = None
+            for (name, labels), value in series:
+                metric = f"{name}_total" if kind == 'counter' else name
+                if metric != previous:
+                    family(metric, kind)
+                    previous = metric
+                lines.append(f"{METRIC_PREFIX}_{metric}{_format_labels(collector + labels)} {value}")
+
+        previous = None
+        for (name, labels), histogram in histograms:
+            if name != previous:
+                family(name, 'histogram')
+                previous = name
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                cumulative += count
+                lines.append(f"{METRIC_PREFIX}_{name}_bucket"
+                             f"{_format_labels(collector + labels, ('le', repr(bound)))} {cumulative}")
+            lines.append(f"{METRIC_PREFIX}_{name}_bucket"
+                         f"{_format_labels(collector + labels, ('le', '+Inf'))} {histogram.count}")
+            lines.append(f"{METRIC_PREFIX}_{name}_sum{_format_labels(collector + labels)} {histogram.sum}")
+            lines.append(f"{METRIC_PREFIX}_{name}_count{_format_labels(collector + labels)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def record_quota(self, stats: Dict):
+        """Витрати квоти запуску (QuotaScheduler.stats())"""
+        for endpoint, units in stats['units_by_endpoint'].items():
+            self.set('api_units_used', units, endpoint=endpoint)
+        self.set('api_retries', stats['retries'])
+        self.set('api_daily_units_used', stats['daily_used'])
+        self.set('api_daily_budget', stats['daily_budget'])
+
+    def record_pipeline(self, stats: Dict):
+        """Зайнятість етапів конвеєра (Pipeline.stats())"""
+        for stage, stage_stats in stats.items():
+            self.set('pipeline_stage_busy_seconds', stage_stats['busy_seconds'], stage=stage)
+            self.set('pipeline_stage_utilisation', stage_stats['utilisation'], stage=stage)
+
+    def record_reports(self, timings: Dict[str, float]):
+        """Час writer-ів save_results (report_timings)"""
+        for writer, seconds in timings.items():
+            self.set('report_writer_seconds', round(seconds, 4), writer=writer)
+
+
+def _write_atomic(path: str, text: str):
+    """Запис через тимчасовий файл: node exporter не побачить напівзаписаний файл"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def export_metrics(metrics: Metrics, json_path: Optional[str] = None,
+                   prometheus_path: Optional[str] = None, **extra):
+    """Пише JSON підсумок (з додатковими полями extra) і/або Prometheus textfile"""
+    if json_path:
+        summary = metrics.summary()
+        summary.update(extra)
+        _write_atomic(json_path, json.dumps(summary, ensure_ascii=False, indent=2))
+        print(f"📈 Підсумок запуску: {json_path}")
+    if prometheus_path:
+        _write_atomic(prometheus_path, metrics.prometheus_text())
+        print(f"📈 Метрики Prometheus: {prometheus_path}")
+
+
+def add_metrics_arguments(parser):
+    """Додає до argparse параметри експорту метрик (спільні для всіх збирачів)"""
+    parser.add_argument('--metrics-json', default=os.getenv('YOUTUBE_METRICS_JSON'),
+                        help="JSON файл з підсумком запуску (тривалості, лічильники, p50/p95)")
+    parser.add_argument('--metrics-textfile', default=os.getenv('YOUTUBE_METRICS_TEXTFILE'),
+                        help="Файл .prom для textfile collector node exporter")
@@ -0,0 +1,179 @@
+"""
+Конвеєр етапів з обмеженими чергами
+Кожен етап (завантаження, класифікація, запис) працює у своєму потоці, тож
+робота CPU і запис на диск перекриваються з очікуванням мережі, а пам'ять
+обмежена глибиною черг. Порядок елементів зберігається на всіх етапах.
+Помилка етапу передається далі по конвеєру після вже оброблених елементів,
+тож зібране до неї встигає пройти класифікацію і запис.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List
+
+_DONE = object()
+_POLL_INTERVAL = 0.1
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class PipelineStage:
+    """
+    Етап конвеєра: fn(елемент) -> елемент для наступного етапу.
+    workers > 1 - елементи обробляються паралельно, але передаються далі по порядку.
+    """
+
+    def __init__(self, name: str, fn: Callable, workers: int = 1):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.items = 0
+        self.busy = 0.0
+        self._lock = threading.Lock()
+
+    def _call(self, item):
+        started = time.perf_counter()
+        try:
+            return self.fn(item)
+        finally:
+            with self._lock:
+                self.busy += time.perf_counter() - started
+                self.items += 1
+
+
+class Pipeline:
+    """Запускає етапи над джерелом елементів; run() повертає статистику етапів"""
+
+    def __init__(self, stages: List[PipelineStage], queue_size: int = 4):
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.elapsed = 0.0
+        # Індекс етапу, що впав: етапи до нього зупиняються, після нього - дообробляють чергу
+        self._failed_at = None
+
+    def _should_stop(self, index: int) -> bool:
+        return self._failed_at is not None and index < self._failed_at
+
+    def _get(self, inbox: queue.Queue, index: int):
+        while True:
+            try:
+                return inbox.get(timeout=_POLL_INTERVAL)
+            except queue.Empty:
+                if self._should_stop(index):
+                    return _DONE
+
+    def _put(self, outbox: queue.Queue, item, index: int) -> bool:
+        while True:
+            try:
+                outbox.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                if self._should_stop(index):
+                    return False
+
+    def _feed(self, items: Iterable, outbox: queue.Queue):
+        try:
+            for item in items:
+                if not self._put(outbox, item, -1):
+                    return
+            self._put(outbox, _DONE, -1)
+        except BaseException as e:
+            self._failed_at = -1
+            outbox.put(_Failure(e))
+
+    def _results(self, stage: PipelineStage, inbox: queue.Queue, index: int):
+        """Результати етапу по порядку; вхідна помилка повертається як _Failure"""
+        if stage.workers == 1:
+            while True:
+                item = self._get(inbox, index)
+                if item is _DONE or isinstance(item, _Failure):
+                    yield item
+                    return
+                yield stage._call(item)
+
+        with ThreadPoolExecutor(max_workers=stage.workers) as executor:
+            window = deque()
+            while True:
+                item = self._get(inbox, index)
+                if item is _DONE or isinstance(item, _Failure):
+                    break
+                window.append(executor.submit(stage._call, item))
+                # Не більше ніж 2 * workers елементів в обробці одночасно
+                if len(window) >= 2 * stage.workers:
+                    yield window.popleft().result()
+            while window:
+                yield window.popleft().result()
+            yield item
+
+    def _run_stage(self, stage: PipelineStage, inbox: queue.Queue, outbox: queue.Queue, index: int):
+        try:
+            for result in self._results(stage, inbox, index):
+                if not self._put(outbox, result, index):
+                    return
+                if result is _DONE or isinstance(result, _Failure):
+                    return
+        except BaseException as e:
+            if self._failed_at is None:
+                self._failed_at = index
+            outbox.put(_Failure(e))
+
+    def run(self, items: Iterable) -> Dict[str, Dict]:
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        threads = [threading.Thread(target=self._feed, args=(items, queues[0]), daemon=True)]
+        threads += [
+            threading.Thread(target=self._run_stage, args=(stage, queues[i], queues[i + 1], i), daemon=True)
+            for i, stage in enumerate(self.stages)
+        ]
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                try:
+                    result = queues[-1].get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                if result is _DONE:
+                    break
+                if isinstance(result, _Failure):
+                    raise result.error
+        except BaseException:
+            self._failed_at = len(self.stages)
+            raise
+        finally:
+            self.elapsed = time.perf_counter() - started
+
+        for thread in threads:
+            thread.join()
+        return self.stats()
+
+    def stats(self) -> Dict[str, Dict]:
+        """Зайнятість кожного етапу: частка часу роботи від тривалості конвеєра (на потік)"""
+        elapsed = max(self.elapsed, 1e-9)
+        return {
+            stage.name: {
+                'items': stage.items,
+                'workers': stage.workers,
+                'busy_seconds': round(stage.busy, 3),
+                'utilisation': round(stage.busy / (elapsed * stage.workers), 3)
+            }
+            for stage in self.stages
+        }
+
+
+def format_pipeline_stats(stats: Dict[str, Dict]) -> str:
+    """Рядок для звіту: зайнятість етапів і найзавантаженіший етап"""
+    parts = [
+        f"{name} {int(round(100 * stage['utilisation']))}%"
+        + (f" ({stage['workers']} потоків)" if stage['workers'] > 1 else '')
+        for name, stage in stats.items()
+    ]
+    bottleneck = max(stats, key=lambda name: stats[name]['utilisation']) if stats else '-'
+    return f"📈 Зайнятість етапів: {', '.join(parts)}; вузьке місце: {bottleneck}"
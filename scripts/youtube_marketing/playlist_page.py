@@ -0,0 +1,143 @@
+"""
+Розбір сторінки плейлиста YouTube без API
+Вбудований JSON ytInitialData декодується один раз з місця, де він починається
+(json.JSONDecoder.raw_decode, без регулярних виразів по всій розмітці), а
+наступні сторінки списку завантажуються за токенами продовження (youtubei/v1/browse).
+Функції не звертаються до мережі самі, тож їх можна перевіряти на збережених HTML/JSON.
+"""
+
+import json
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+INITIAL_DATA_MARKERS = ('var ytInitialData = ', 'window["ytInitialData"] = ', 'ytInitialData = ')
+YTCFG_MARKER = 'ytcfg.set('
+
+BROWSE_URL = "https://www.youtube.com/youtubei/v1/browse"
+
+_decoder = json.JSONDecoder()
+
+
+def _decode_at(html: str, marker: str, start: int = 0) -> Tuple[Optional[Dict], int]:
+    """Декодує JSON об'єкт одразу після marker; повертає (об'єкт, позиція після нього)"""
+    index = html.find(marker, start)
+    if index == -1:
+        return None, -1
+    try:
+        value, end = _decoder.raw_decode(html, index + len(marker))
+    except ValueError:
+        return None, index + len(marker)
+    return value, end
+
+
+def extract_initial_data(html: str) -> Optional[Dict]:
+    """Повертає ytInitialData зі сторінки (None - сторінка без даних, напр. згода на cookies)"""
+    for marker in INITIAL_DATA_MARKERS:
+        data, _ = _decode_at(html, marker)
+        if isinstance(data, dict):
+            return data
+    return None
+
+
+def extract_ytcfg(html: str) -> Dict:
+    """Об'єднує всі виклики ytcfg.set({...}) сторінки (ключ і контекст innertube)"""
+    config = {}
+    position = 0
+    while True:
+        value, position = _decode_at(html, YTCFG_MARKER, position)
+        if position == -1:
+            return config
+        if isinstance(value, dict):
+            config.update(value)
+
+
+def iter_renderers(data, names: Tuple[str, ...]) -> Iterator[Tuple[str, Dict]]:
+    """Обходить JSON у порядку документа і повертає (назва, renderer) для заданих назв"""
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key in names and isinstance(value, dict):
+                    yield key, value
+            # Дочірні вузли в зворотному порядку, щоб стек віддавав їх по черзі
+            stack.extend(reversed([value for key, value in node.items()
+                                   if key not in names and isinstance(value, (dict, list))]))
+        elif isinstance(node, list):
+            stack.extend(reversed([value for value in node if isinstance(value, (dict, list))]))
+
+
+def _text(value: Optional[Dict]) -> Optional[str]:
+    if not value:
+        return None
+    if 'simpleText' in value:
+        return value['simpleText']
+    return ''.join(run.get('text', '') for run in value.get('runs', [])) or None
+
+
+def parse_playlist_items(data: Dict) -> Tuple[List[Dict], Optional[str]]:
+    """Відео сторінки (сторінки продовження) і токен наступної частини списку"""
+    videos = []
+    continuation = None
+    for name, renderer in iter_renderers(data, ('playlistVideoRenderer', 'continuationItemRenderer')):
+        if name == 'playlistVideoRenderer':
+            if not renderer.get('videoId'):
+                continue
+            videos.append({
+                'video_id': renderer['videoId'],
+                'title': _text(renderer.get('title')),
+                'url': f"https://www.youtube.com/watch?v={renderer['videoId']}"
+            })
+        else:
+            command = renderer.get('continuationEndpoint', {}).get('continuationCommand', {})
+            continuation = command.get('token') or continuation
+    return videos, continuation
+
+
+def continuation_request(ytcfg: Dict, token: str) -> Tuple[Dict, Dict]:
+    """Параметри URL і тіло POST запиту youtubei/v1/browse для токена продовження"""
+    params = {'prettyPrint': 'false'}
+    if ytcfg.get('INNERTUBE_API_KEY'):
+        params['key'] = ytcfg['INNERTUBE_API_KEY']
+    context = ytcfg.get('INNERTUBE_CONTEXT') or {
+        'client': {'clientName': 'WEB', 'clientVersion': ytcfg.get('INNERTUBE_CLIENT_VERSION', '2.20240101.00.00')}
+    }
+    return params, {'context': context, 'continuation': token}
+
+
+def scrape_playlist(html: str, fetch_continuation: Callable[[Dict, Dict], Dict],
+                    max_videos: Optional[int] = None, partial: bool = True) -> List[Dict]:
+    """
+    Повний список відео плейлиста: перша сторінка з html, далі -
+    fetch_continuation(params, payload) для кожного токена продовження.
+    max_videos обмежує кількість (None - весь плейлист). Якщо продовження не
+    завантажилось, повертаються відео, зібрані до нього, а з partial=False
+    помилка передається далі (неповний список не годиться для знімка запуску).
+    """
+    data = extract_initial_data(html)
+    if data is None:
+        return []
+    ytcfg = extract_ytcfg(html)
+
+    videos = []
+    seen = set()
+    seen_tokens = set()
+    while True:
+        page, continuation = parse_playlist_items(data)
+        for video in page:
+            if video['video_id'] not in seen:
+                seen.add(video['video_id'])
+                videos.append(video)
+
+        if max_videos and len(videos) >= max_videos:
+            return videos[:max_videos]
+        if not continuation or continuation in seen_tokens:
+            return videos
+        seen_tokens.add(continuation)
+        try:
+            data = fetch_continuation(*continuation_request(ytcfg, continuation))
+        except Exception as e:
+            if not partial:
+                raise
+            # Збій однієї сторінки продовження не скасовує вже зібрані відео
+            print(f"⚠️ Не вдалося завантажити продовження плейлиста (зібрано {len(videos)} відео): {e}")
+            return videos
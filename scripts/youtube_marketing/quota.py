@@ -0,0 +1,335 @@
+"""
+Планувальник запитів до YouTube Data API з урахуванням квоти
+Token bucket обмежує швидкість, кожен endpoint має свою вартість в одиницях квоти,
+денний бюджет рахується (і за бажанням зберігається між запусками),
+а тимчасові помилки повторюються з експоненційною затримкою та джитером.
+"""
+
+import os
+import json
+import random
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+
+# Вартість запитів в одиницях квоти (https://developers.google.com/youtube/v3/determine_quota_cost)
+ENDPOINT_COSTS = {
+    'playlistItems': 1,
+    'commentThreads': 1,
+    'comments': 1,
+    'videos': 1,
+    'channels': 1,
+    'search': 100
+}
+
+DEFAULT_DAILY_QUOTA = 10000
+
+# Причини 403, які минають самі (на відміну від вичерпаної денної квоти quotaExceeded)
+RETRYABLE_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded', 'backendError', 'internalError')
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+# Причини 403, з якими API відмовляє до скидання денної квоти
+EXHAUSTED_REASONS = ('quotaExceeded', 'dailyLimitExceeded')
+
+
+class QuotaExhausted(Exception):
+    """Денний бюджет квоти вичерпано - подальші запити не виконуються"""
+
+
+def _quota_now() -> datetime:
+    try:
+        from zoneinfo import ZoneInfo
+        return datetime.now(ZoneInfo('America/Los_Angeles'))
+    except Exception:
+        return datetime.now(timezone(timedelta(hours=-8)))
+
+
+def quota_day() -> str:
+    """Поточна доба квоти YouTube (скидається опівночі за тихоокеанським часом)"""
+    return _quota_now().strftime('%Y-%m-%d')
+
+
+def quota_day_progress() -> float:
+    """Частка поточної доби квоти, що вже минула (0.0 опівночі за тихоокеанським часом)"""
+    now = _quota_now()
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return (now - midnight).total_seconds() / 86400
+
+
+def _error_details(error: Exception):
+    """Повертає (HTTP статус, причина з тіла помилки, Retry-After) для помилок обох клієнтів"""
+    # googleapiclient.errors.HttpError: resp + content; HttpClient HttpError: response
+    response = getattr(error, 'resp', None)
+    if response is None:
+        response = getattr(error, 'response', None)
+    status = getattr(error, 'status', None) or getattr(response, 'status', None)
+    body = getattr(error, 'content', None) or getattr(response, 'body', None)
+    headers = getattr(response, 'headers', None) or (response if isinstance(response, dict) else {})
+
+    reason = None
+    if body:
+        try:
+            payload = json.loads(body.decode('utf-8') if isinstance(body, bytes) else body)
+            errors = payload.get('error', {}).get('errors') or [{}]
+            reason = errors[0].get('reason')
+        except (ValueError, AttributeError):
+            pass
+
+    retry_after = None
+    try:
+        retry_after = float(headers.get('retry-after'))
+    except (TypeError, ValueError, AttributeError):
+        pass
+
+    return (int(status) if status else None), reason, retry_after
+
+
+def is_retryable(error: Exception) -> bool:
+    """Чи є помилка тимчасовою (мережа, 429, 5xx, 403 з лімітом швидкості)"""
+    if isinstance(error, (socket.timeout, ConnectionError, TimeoutError)):
+        return True
+
+    status, reason, _ = _error_details(error)
+    if status in RETRYABLE_STATUSES:
+        return True
+    return status == 403 and reason in RETRYABLE_REASONS
+
+
+def is_quota_exhausted(error: Exception) -> bool:
+    """Чи відповів API, що денну квоту вичерпано (403 quotaExceeded/dailyLimitExceeded)"""
+    status, reason, _ = _error_details(error)
+    return status == 403 and reason in EXHAUSTED_REASONS
+
+
+class QuotaScheduler:
+    """
+    Потокобезпечний планувальник запитів.
+    requests_per_second - швидкість поповнення token bucket (None - без обмеження),
+    daily_budget - денний ліміт одиниць квоти, usage_path - JSON файл, де зберігається
+    витрачена за добу квота між запусками (cron).
+    """
+
+    def __init__(self, requests_per_second: Optional[float] = None,
+                 daily_budget: int = DEFAULT_DAILY_QUOTA,
+                 usage_path: Optional[str] = None, max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 64.0, cache=None, metrics=None):
+        self.rate = requests_per_second
+        self.capacity = max(1.0, requests_per_second or 1.0)
+        self.daily_budget = daily_budget
+        self.usage_path = usage_path
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.cache = cache
+        # Metrics (youtube_marketing.metrics): тривалість і результат кожної спроби
+        self.metrics = metrics
+
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._refilled_at = time.monotonic()
+
+        # Статистика поточного запуску
+        self.units_used = 0
+        self.calls = 0
+        self.retries = 0
+        self.units_by_endpoint = {}
+
+        self._day = quota_day()
+        self._day_units = self._load_usage()
+
+    # --- Денний бюджет ---
+
+    def _load_usage(self) -> int:
+        if not self.usage_path or not os.path.exists(self.usage_path):
+            return 0
+        with open(self.usage_path, encoding='utf-8') as f:
+            return json.load(f).get(self._day, 0)
+
+    @contextmanager
+    def _usage_lock(self):
+        """Блокування файлу квоти між процесами (паралельні shard-и ділять один бюджет)"""
+        if not self.usage_path:
+            yield
+            return
+        try:
+            import fcntl
+        except ImportError:  # Windows - лише блокування в межах процесу
+            yield
+            return
+        with open(self.usage_path + '.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _save_usage(self):
+        if not self.usage_path:
+            return
+        tmp_path = self.usage_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({self._day: self._day_units}, f)
+        os.replace(tmp_path, self.usage_path)
+
+    @property
+    def remaining(self) -> int:
+        return self.daily_budget - self._day_units
+
+    def refresh_usage(self) -> int:
+        """Витрачені за добу одиниці з урахуванням інших процесів і зміни доби"""
+        with self._lock, self._usage_lock():
+            day = quota_day()
+            if day != self._day:
+                self._day, self._day_units = day, 0
+            if self.usage_path:
+                self._day_units = self._load_usage()
+            return self._day_units
+
+    def _charge(self, endpoint: str, units: int):
+        with self._lock, self._usage_lock():
+            day = quota_day()
+            if day != self._day:
+                self._day, self._day_units = day, 0
+            if self.usage_path:
+                # Інші процеси могли витратити частину бюджету з часу останнього запиту
+                self._day_units = self._load_usage()
+            if self._day_units + units > self.daily_budget:
+                raise QuotaExhausted(
+                    f"Денний бюджет квоти вичерпано ({self._day_units}/{self.daily_budget} одиниць)"
+                )
+            self._day_units += units
+            self.units_used += units
+            self.units_by_endpoint[endpoint] = self.units_by_endpoint.get(endpoint, 0) + units
+            self._save_usage()
+
+    def _refund(self, endpoint: str, units: int):
+        """Повертає одиниці за запит, на який відповів кеш без звернення до API"""
+        with self._lock, self._usage_lock():
+            if self.usage_path:
+                self._day_units = self._load_usage()
+            self._day_units -= units
+            self.units_used -= units
+            self.units_by_endpoint[endpoint] -= units
+            self._save_usage()
+
+    def _exhaust(self):
+        """
+        API вичерпав квоту раніше за локальний лічильник (інший ключ проєкту, ручні
+        запити): решта доби вважається витраченою і для інших потоків та процесів
+        """
+        with self._lock, self._usage_lock():
+            self._day = quota_day()
+            self._day_units = max(self._day_units, self._load_usage(), self.daily_budget)
+            self._save_usage()
+
+    # --- Швидкість ---
+
+    def _wait_for_token(self):
+        if not self.rate:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._refilled_at) * self.rate)
+                self._refilled_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Експоненційна затримка з повним джитером (або Retry-After від сервера)"""
+        if retry_after:
+            return retry_after
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    # --- Виконання ---
+
+    def call(self, endpoint: str, request: Callable):
+        """
+        Виконує request() з урахуванням швидкості, квоти і повторів.
+        Кидає QuotaExhausted, якщо бюджет вичерпано (локально або за відповіддю
+        API 403 quotaExceeded), або останню помилку після
+        max_retries невдалих спроб чи на нетимчасовій помилці.
+        """
+        if self.cache and self.cache.offline:
+            # Офлайн-повтор з кешу не звертається до API і не витрачає квоту
+            if self.metrics:
+                self.metrics.inc('api_requests', endpoint=endpoint, outcome='cached')
+            return request()
+
+        units = ENDPOINT_COSTS.get(endpoint, 1)
+
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_token()
+            self._charge(endpoint, units)
+            with self._lock:
+                self.calls += 1
+
+            started = time.perf_counter()
+            try:
+                result = request()
+            except Exception as e:
+                retry = attempt < self.max_retries and is_retryable(e)
+                self._record(endpoint, started, 'retry' if retry else 'error')
+                if is_quota_exhausted(e):
+                    self._exhaust()
+                    raise QuotaExhausted(f"API повідомив про вичерпану денну квоту ({endpoint})") from e
+                if not retry:
+                    raise
+                _, reason, retry_after = _error_details(e)
+                delay = self._backoff(attempt, retry_after)
+                with self._lock:
+                    self.retries += 1
+                print(f"   ⏳ Тимчасова помилка {endpoint} ({reason or e}), повтор через {delay:.1f} с")
+                time.sleep(delay)
+                continue
+
+            cached = bool(self.cache and self.cache.served_from_cache())
+            self._record(endpoint, started, 'cached' if cached else 'ok')
+            if cached:
+                self._refund(endpoint, units)
+            return result
+
+    def _record(self, endpoint: str, started: float, outcome: str):
+        if self.metrics:
+            self.metrics.observe('api_request_seconds', time.perf_counter() - started, endpoint=endpoint)
+            self.metrics.inc('api_requests', endpoint=endpoint, outcome=outcome)
+
+    def stats(self) -> Dict:
+        return {
+            'units_used': self.units_used,
+            'units_by_endpoint': dict(self.units_by_endpoint),
+            'calls': self.calls,
+            'retries': self.retries,
+            'daily_used': self._day_units,
+            'daily_budget': self.daily_budget
+        }
+
+
+def add_quota_arguments(parser):
+    """Додає до argparse параметри планувальника квоти (спільні для збирачів з API)"""
+    parser.add_argument('--rps', type=float, default=None,
+                        help="Максимум запитів до API на секунду (за замовчуванням без обмеження)")
+    parser.add_argument('--daily-quota', type=int, default=DEFAULT_DAILY_QUOTA,
+                        help="Денний бюджет одиниць квоти YouTube Data API")
+    parser.add_argument('--quota-usage', default=os.getenv('YOUTUBE_QUOTA_USAGE'),
+                        help="JSON файл з витраченою за добу квотою (спільний для запусків cron)")
+    parser.add_argument('--max-retries', type=int, default=5,
+                        help="Скільки разів повторювати тимчасові помилки API")
+
+
+def scheduler_from_args(args, cache=None, metrics=None) -> QuotaScheduler:
+    return QuotaScheduler(requests_per_second=args.rps, daily_budget=args.daily_quota,
+                          usage_path=args.quota_usage, max_retries=args.max_retries, cache=cache,
+                          metrics=metrics)
+
+
+def format_quota_stats(stats: Dict) -> str:
+    by_endpoint = ', '.join(f"{name}: {units}" for name, units in stats['units_by_endpoint'].items())
+    return (f"🎫 Квота: {stats['units_used']} одиниць за запуск ({by_endpoint or '-'}), "
+            f"за добу {stats['daily_used']}/{stats['daily_budget']}, повторів: {stats['retries']}")
@@ -0,0 +1,180 @@
+"""
+Компактні записи коментарів для comments_data
+Замість окремого словника на кожен коментар - об'єкти з __slots__: поля відео
+(video_id, video_title, video_url) зберігаються один раз у VideoRef і спільні для
+всіх коментарів відео, а класифікація - у MarketingClassification.
+Записи поводяться як словники (comment['text'], get, in, dict(comment)), а у
+звичний JSON перетворюються лише під час серіалізації (json.dumps(..., default=to_json)).
+"""
+
+import sys
+import threading
+from collections.abc import Mapping
+from typing import Dict, Iterator
+
+_MISSING = object()
+
+
+class SlotRecord(Mapping):
+    """
+    Словникоподібний запис з фіксованим набором полів (FIELDS, у порядку ключів JSON).
+    Незаповнені поля відсутні серед ключів; невідомі ключі зберігаються в extra.
+    """
+
+    __slots__ = ('extra',)
+    FIELDS = ()
+    _field_set = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._field_set = frozenset(cls.FIELDS)
+
+    def __init__(self, **fields):
+        self.extra = None
+        for key, value in fields.items():
+            self[key] = value
+
+    def _get(self, key: str):
+        return getattr(self, key, _MISSING)
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            value = self._get(key)
+            if value is not _MISSING:
+                return value
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in self._field_set:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self.FIELDS:
+            if self._get(key) is not _MISSING:
+                yield key
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict:
+        """Звичайний словник у порядку ключів JSON (вкладені записи лишаються записами)"""
+        return {key: self[key] for key in self}
+
+
+class MarketingClassification(SlotRecord):
+    """marketing_classification (classify_for_marketing) без словника на кожен коментар"""
+
+    __slots__ = ('score', 'quality_level', 'categories', 'is_marketing_worthy')
+    FIELDS = __slots__
+
+    def __init__(self, score, quality_level: str, categories, is_marketing_worthy: bool):
+        self.extra = None
+        self.score = score
+        # Рівнів якості кілька, а рядки з numpy (tolist) щоразу нові
+        self.quality_level = sys.intern(quality_level)
+        self.categories = tuple(categories)
+        self.is_marketing_worthy = is_marketing_worthy
+
+    @classmethod
+    def from_dict(cls, classification: Dict) -> 'MarketingClassification':
+        return cls(classification['score'], classification['quality_level'],
+                   classification['categories'], classification['is_marketing_worthy'])
+
+
+class VideoRef:
+    """Поля відео, спільні для всіх його коментарів"""
+
+    __slots__ = ('video_id', 'video_title', 'video_url')
+
+    def __init__(self, video_id: str, video_title: str):
+        self.video_id = video_id
+        self.video_title = video_title
+        self.video_url = f"https://www.youtube.com/watch?v={video_id}"
+
+    def replace(self, **fields) -> 'VideoRef':
+        """Копія з іншими значеннями полів (спільний VideoRef не змінюється)"""
+        video = VideoRef.__new__(VideoRef)
+        for key in self.__slots__:
+            setattr(video, key, fields.get(key, getattr(self, key)))
+        return video
+
+
+class VideoTable:
+    """Один VideoRef на пару (video_id, назва) для всіх потоків збирача"""
+
+    def __init__(self):
+        self._videos = {}
+        self._lock = threading.Lock()
+
+    def get(self, video_id: str, video_title: str) -> VideoRef:
+        key = (video_id, video_title)
+        video = self._videos.get(key)
+        if video is None:
+            with self._lock:
+                video = self._videos.setdefault(key, VideoRef(video_id, video_title))
+        return video
+
+    def __len__(self) -> int:
+        return len(self._videos)
+
+
+class CommentRecord(SlotRecord):
+    """
+    Коментар збирачів з API (YouTubeAPICollector, SimpleYouTubeCollector).
+    Ключі video_id, video_title і video_url читаються з VideoRef; порядок ключів
+    у JSON такий самий, як у словників, що були до нього.
+    """
+
+    __slots__ = ('comment_id', 'author', 'author_channel_url', 'text', 'published_at', 'updated_at',
+                 'like_count', 'video', 'parent_id', 'marketing_classification', 'classification',
+                 'occurrences')
+    FIELDS = ('comment_id', 'author', 'author_channel_url', 'text', 'published_at', 'updated_at',
+              'like_count', 'video_id', 'video_title', 'video_url', 'parent_id',
+              'marketing_classification', 'classification', 'occurrences')
+    VIDEO_FIELDS = ('video_id', 'video_title', 'video_url')
+
+    def __init__(self, video: VideoRef, **fields):
+        self.video = video
+        super().__init__(**fields)
+
+    def _get(self, key: str):
+        if key in self.VIDEO_FIELDS:
+            return getattr(self.video, key)
+        return getattr(self, key, _MISSING)
+
+    def __setitem__(self, key, value):
+        if key in self.VIDEO_FIELDS:
+            if value != getattr(self.video, key):
+                self.video = self.video.replace(**{key: value})
+            return
+        super().__setitem__(key, value)
+
+    @classmethod
+    def from_dict(cls, comment: Dict, videos: VideoTable) -> 'CommentRecord':
+        """Запис зі словника (наприклад, з контрольної точки або JSONL)"""
+        fields = {key: value for key, value in comment.items() if key not in cls.VIDEO_FIELDS}
+        classification = fields.get('marketing_classification')
+        if isinstance(classification, dict):
+            fields['marketing_classification'] = MarketingClassification.from_dict(classification)
+        record = cls(videos.get(comment['video_id'], comment['video_title']), **fields)
+        if 'video_url' in comment:
+            record['video_url'] = comment['video_url']
+        return record
+
+
+def to_json(value):
+    """default для json.dumps: записи серіалізуються як звичайні словники"""
+    if isinstance(value, SlotRecord):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
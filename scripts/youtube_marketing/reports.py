@@ -0,0 +1,237 @@
+"""
+Генерація звітів за один прохід
+write_reports проходить по коментарях один раз і передає кожен коментар усім
+підключеним writer-ам (JSON, категорії, Markdown, CSV, лічильники).
+Топ-N відбирається обмеженою купою замість повного сортування.
+"""
+
+import os
+import csv
+import heapq
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .sink import JsonDocumentWriter, JsonGroupsWriter
+
+
+class TopN:
+    """
+    Обмежена купа для N найкращих елементів за ключем.
+    Порядок результату збігається з sorted(..., key=key, reverse=True)[:n]
+    (рівні елементи лишаються в порядку надходження). Без ключа - перші N.
+    """
+
+    def __init__(self, n: int, key: Optional[Callable] = None):
+        self.n = n
+        self.key = key
+        self._heap = []
+        self._seen = 0
+
+    def add(self, item):
+        index = self._seen
+        self._seen += 1
+
+        if self.key is None:
+            if len(self._heap) < self.n:
+                self._heap.append(item)
+            return
+
+        entry = (self.key(item), -index, item)
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List:
+        if self.key is None:
+            return list(self._heap)
+        return [item for _, _, item in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+
+
+class ReportWriter:
+    """Базовий writer: отримує коментарі по одному, записує файл у close()"""
+
+    path = None
+
+    def add(self, comment: Dict):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class JsonReportWriter(ReportWriter):
+    """JSON документ із заголовком і списком коментарів, що пройшли фільтр"""
+
+    def __init__(self, path: str, header: Dict, count_field: Optional[str] = None,
+                 accept: Optional[Callable[[Dict], bool]] = None,
+                 part: Optional[Callable[[Dict], int]] = None,
+                 counts: Optional[Dict[str, Callable[[Dict], bool]]] = None):
+        self.path = path
+        self.count_field = count_field
+        self.accept = accept
+        self.part = part
+        self.counts = counts or {}
+        self.total = 0
+        self.count_values = {field: 0 for field in self.counts}
+        self._writer = JsonDocumentWriter(path, header)
+
+    def add(self, comment: Dict):
+        if self.accept and not self.accept(comment):
+            return
+        self._writer.add(comment, self.part(comment) if self.part else 0)
+        self.total += 1
+        for field, predicate in self.counts.items():
+            if predicate(comment):
+                self.count_values[field] += 1
+
+    def close(self):
+        fields = dict(self.count_values)
+        if self.count_field:
+            fields[self.count_field] = self.total
+        self._writer.close(**fields)
+
+
+class TopJsonReportWriter(ReportWriter):
+    """JSON документ лише з топ-N коментарів"""
+
+    def __init__(self, path: str, header: Dict, n: int, key: Optional[Callable] = None):
+        self.path = path
+        self.header = header
+        self.top = TopN(n, key)
+
+    def add(self, comment: Dict):
+        self.top.add(comment)
+
+    def close(self):
+        writer = JsonDocumentWriter(self.path, self.header)
+        for comment in self.top.items():
+            writer.add(comment)
+        writer.close()
+
+
+class CategoryReportWriter(ReportWriter):
+    """Словник {категорія: [записи]} (коментар може належати кільком категоріям)"""
+
+    def __init__(self, path: str, categories: Callable[[Dict], Iterable[str]],
+                 entry: Callable[[Dict], Dict]):
+        self.path = path
+        self.categories = categories
+        self.entry = entry
+        self._writer = JsonGroupsWriter(path)
+
+    def add(self, comment: Dict):
+        for category in self.categories(comment):
+            self._writer.add(category, self.entry(comment))
+
+    def close(self):
+        self._writer.close()
+
+
+class MarkdownReportWriter(ReportWriter):
+    """
+    Markdown з топ-N коментарів у секціях.
+    sections: {ключ секції: заголовок} - порядок секцій у файлі; section(comment)
+    повертає ключ секції коментаря (None - коментар не потрапляє у звіт).
+    """
+
+    def __init__(self, path: str, header: str, render: Callable[[int, Dict], str],
+                 n: int, key: Optional[Callable] = None,
+                 section: Optional[Callable[[Dict], Optional[str]]] = None,
+                 sections: Optional[Dict[str, str]] = None):
+        self.path = path
+        self.header = header
+        self.render = render
+        self.section = section or (lambda comment: '')
+        self.sections = sections or {'': ''}
+        self._tops = {name: TopN(n, key) for name in self.sections}
+
+    def add(self, comment: Dict):
+        name = self.section(comment)
+        if name in self._tops:
+            self._tops[name].add(comment)
+
+    def close(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(self.header)
+            for name, title in self.sections.items():
+                comments = self._tops[name].items()
+                if not comments:
+                    continue
+                if title:
+                    f.write(title)
+                for i, comment in enumerate(comments, 1):
+                    f.write(self.render(i, comment))
+
+
+class CsvReportWriter(ReportWriter):
+    """CSV: рядкові поля в лапках, числові - без (csv.QUOTE_NONNUMERIC)"""
+
+    def __init__(self, path: str, columns: List[tuple]):
+        self.path = path
+        self.columns = columns
+        self._file = open(path, 'w', encoding='utf-8', newline='')
+        self._file.write(','.join(title for title, _ in columns) + '\n')
+        self._writer = csv.writer(self._file, quoting=csv.QUOTE_NONNUMERIC, lineterminator='\n')
+
+    def add(self, comment: Dict):
+        self._writer.writerow([value(comment) for _, value in self.columns])
+
+    def close(self):
+        self._file.close()
+
+
+class CountReportWriter(ReportWriter):
+    """Рахує коментарі за ключем (для статистики, без файлу)"""
+
+    def __init__(self, key: Callable[[Dict], Optional[str]]):
+        self.key = key
+        self.counts = {}
+
+    def add(self, comment: Dict):
+        value = self.key(comment)
+        self.counts[value] = self.counts.get(value, 0) + 1
+
+
+def writer_name(writer: ReportWriter) -> str:
+    """Назва writer-а для статистики: клас і файл"""
+    # Обгортки (наприклад, CanonicalWriter згортання) звітують під іменем свого writer-а
+    writer = getattr(writer, 'wrapped', writer)
+    name = type(writer).__name__
+    return f"{name}:{os.path.basename(writer.path)}" if writer.path else name
+
+
+def write_reports(comments: Iterable[Dict], writers: List[ReportWriter],
+                  timings: Optional[Dict[str, float]] = None) -> int:
+    """
+    Один прохід по коментарях з передачею кожного всім writer-ам; повертає кількість.
+    timings - словник, куди додається час кожного writer-а (add і close), у секундах.
+    """
+    if timings is None:
+        total = 0
+        for comment in comments:
+            for writer in writers:
+                writer.add(comment)
+            total += 1
+
+        for writer in writers:
+            writer.close()
+        return total
+
+    clock = time.perf_counter
+    spent = [0.0] * len(writers)
+    total = 0
+    for comment in comments:
+        for i, writer in enumerate(writers):
+            started = clock()
+            writer.add(comment)
+            spent[i] += clock() - started
+        total += 1
+
+    for i, writer in enumerate(writers):
+        started = clock()
+        writer.close()
+        spent[i] += clock() - started
+        name = writer_name(writer)
+        timings[name] = timings.get(name, 0.0) + spent[i]
+    return total
@@ -0,0 +1,164 @@
+"""
+Повторна оцінка вже зібраних коментарів без звернення до API
+Після зміни ключових слів чи ваг у classification.py коментарі з JSON/JSONL файлів
+діляться на shard-и, оцінюються в пулі процесів і повертаються в початковому порядку
+з новими полями класифікації.
+"""
+
+import json
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .batch import classify_batch_for_marketing
+from .classification import classify_simple, classify_quality
+
+# Модель класифікації -> поле коментаря, яке вона заповнює
+MODELS = {
+    'marketing': 'marketing_classification',
+    'simple': 'classification',
+    'quality': 'quality',
+}
+# Поле класифікації -> ключ рівня якості в ньому
+LEVEL_KEYS = {
+    'marketing_classification': 'quality_level',
+    'classification': 'quality',
+    'quality': 'category',
+}
+# Лічильники в заголовках JSON звітів збирачів -> чи враховується коментар
+HEADER_COUNTS = {
+    'total_comments': lambda comment: True,
+    'total_excellent': lambda comment: quality_level(
+        'marketing_classification', comment.get('marketing_classification')) == 'excellent',
+    'excellent_comments': lambda comment: quality_level('quality', comment.get('quality')) == 'excellent',
+    'good_comments': lambda comment: quality_level('quality', comment.get('quality')) == 'good',
+}
+DEFAULT_SHARD_SIZE = 20000
+
+
+def detect_models(comment: Dict) -> List[str]:
+    """Моделі, якими коментар уже оцінено (за замовчуванням - marketing)"""
+    return [model for model, field in MODELS.items() if field in comment] or ['marketing']
+
+
+def score_shard(comments: List[Dict], models: Optional[List[str]] = None,
+                categories: Optional[Dict] = None) -> List[Dict[str, Dict]]:
+    """
+    Нові класифікації для shard-а: для кожного коментаря {поле: результат}.
+    models=None - кожен коментар оцінюється тими моделями, що вже були в ньому;
+    categories - інший набір категорій для marketing (формат MARKETING_CATEGORIES).
+    Виконується в процесі пулу, тож повертає лише результати, а не коментарі.
+    """
+    results = [{} for _ in comments]
+    selected = {model: [] for model in MODELS}
+    for i, comment in enumerate(comments):
+        for model in models or detect_models(comment):
+            selected[model].append(i)
+
+    if selected['marketing']:
+        batch = classify_batch_for_marketing([comments[i] for i in selected['marketing']], categories)
+        for i, classification in zip(selected['marketing'], batch):
+            results[i][MODELS['marketing']] = classification
+    for i in selected['simple']:
+        results[i][MODELS['simple']] = classify_simple(comments[i])
+    for i in selected['quality']:
+        results[i][MODELS['quality']] = classify_quality(comments[i])
+    return results
+
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def quality_level(field: str, classification: Optional[Dict]) -> Optional[str]:
+    """Рівень якості з класифікації будь-якої моделі"""
+    if not classification:
+        return None
+    return classification.get(LEVEL_KEYS[field])
+
+
+def apply_scores(shard: List[Dict], results: List[Dict[str, Dict]], transitions: Counter) -> List[Dict]:
+    """Записує нові класифікації в коментарі і рахує зміни рівня (поле, було, стало)"""
+    for comment, fields in zip(shard, results):
+        for field, classification in fields.items():
+            before, after = quality_level(field, comment.get(field)), quality_level(field, classification)
+            if before != after:
+                transitions[(field, before or '-', after)] += 1
+        comment.update(fields)
+    return shard
+
+
+def rescore_lines(lines: List[str], models: Optional[List[str]] = None,
+                  categories: Optional[Dict] = None) -> Tuple[str, Counter]:
+    """
+    Shard рядків JSONL: розбір, оцінка і серіалізація цілком у процесі пулу,
+    тож головний процес лише читає і пише текст. Повертає (рядки, зміни рівнів).
+    """
+    comments = [json.loads(line) for line in lines if line.strip()]
+    transitions = Counter()
+    apply_scores(comments, score_shard(comments, models, categories), transitions)
+    return ''.join(json.dumps(comment, ensure_ascii=False) + '\n' for comment in comments), transitions
+
+
+def ordered_map(function: Callable, shards: Iterable[List], processes: int, *args) -> Iterator:
+    """
+    function(shard, *args) для кожного shard-а в пулі процесів; результати - у порядку
+    shard-ів. Одночасно в роботі не більше 2 * processes shard-ів, тож вхід читається
+    поступово, а не весь одразу.
+    """
+    if processes <= 1:
+        for shard in shards:
+            yield function(shard, *args)
+        return
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        pending = deque()
+        for shard in shards:
+            pending.append(executor.submit(function, shard, *args))
+            if len(pending) >= 2 * processes:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def rescore_jsonl(path: str, target: str, processes: int = 1, shard_size: int = DEFAULT_SHARD_SIZE,
+                  models: Optional[List[str]] = None,
+                  categories: Optional[Dict] = None) -> Tuple[int, Counter]:
+    """Переоцінює JSONL файл у target; повертає (кількість коментарів, зміни рівнів)"""
+    count = 0
+    transitions = Counter()
+    with open(path, encoding='utf-8') as source, open(target, 'w', encoding='utf-8') as output:
+        for text, shard_transitions in ordered_map(rescore_lines, chunked(source, shard_size),
+                                                   processes, models, categories):
+            output.write(text)
+            count += text.count('\n')
+            transitions.update(shard_transitions)
+    return count, transitions
+
+
+def rescore(comments: Iterable[Dict], processes: int = 1, shard_size: int = DEFAULT_SHARD_SIZE,
+            models: Optional[List[str]] = None, categories: Optional[Dict] = None,
+            transitions: Optional[Counter] = None) -> Iterator[Dict]:
+    """
+    Переоцінені коментарі (словники з JSON звітів) у початковому порядку;
+    у пул передаються коментарі, а назад повертаються лише нові класифікації.
+    """
+    transitions = Counter() if transitions is None else transitions
+    shards = chunked(comments, shard_size)
+    # Коментарі shard-ів чекають на свої результати в головному процесі
+    waiting = deque()
+
+    def submitted():
+        for shard in shards:
+            waiting.append(shard)
+            yield shard
+
+    for results in ordered_map(score_shard, submitted(), processes, models, categories):
+        yield from apply_scores(waiting.popleft(), results, transitions)
@@ -0,0 +1,234 @@
+"""
+Дисковий кеш HTTP відповідей для збирачів коментарів
+Ключ - URL без API ключа (параметри відсортовані), TTL, обмеження розміру з
+витісненням найдавніше використаних записів (LRU), умовні запити If-None-Match
+(незмінна сторінка коштує 304 замість повного тіла) та офлайн-режим повтору.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import time
+import urllib.parse
+from typing import Dict, Optional
+
+# Параметри, що не впливають на відповідь і не повинні потрапляти в ключ
+EXCLUDED_PARAMS = ('key',)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    cache_key TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    etag TEXT,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_responses_access ON responses (last_access);
+"""
+
+# Відповідь для запиту, якого немає в кеші в офлайн-режимі
+OFFLINE_MISS_STATUS = 504
+OFFLINE_MISS_BODY = json.dumps({
+    'error': {'code': OFFLINE_MISS_STATUS, 'message': 'Відповіді немає в кеші (офлайн-режим)'}
+}).encode('utf-8')
+
+
+def cache_key(url: str) -> str:
+    """Нормалізує URL: прибирає API ключ і сортує параметри запиту"""
+    parts = urllib.parse.urlsplit(url)
+    params = sorted(
+        (name, value) for name, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if name not in EXCLUDED_PARAMS
+    )
+    return urllib.parse.urlunsplit(
+        (parts.scheme, parts.netloc, parts.path, urllib.parse.urlencode(params), '')
+    )
+
+
+class ResponseCache:
+    """
+    Кеш відповідей у SQLite.
+    ttl - скільки секунд запис вважається свіжим без запиту до сервера
+    (None - завжди перевіряти через If-None-Match); max_bytes - ліміт розміру тіл.
+    offline=True - ніколи не звертатися до мережі, лише повторювати збережене.
+    """
+
+    def __init__(self, path: str, ttl: Optional[float] = 3600,
+                 max_bytes: int = 512 * 1024 * 1024, offline: bool = False):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, body, etag, stored_at FROM responses WHERE cache_key = ?",
+                (key,)
+            ).fetchone()
+            if row:
+                self._conn.execute(
+                    "UPDATE responses SET last_access = ? WHERE cache_key = ?", (time.time(), key)
+                )
+                self._conn.commit()
+
+        if not row:
+            return None
+        return {
+            'status': row[0],
+            'headers': json.loads(row[1]),
+            'body': bytes(row[2]),
+            'etag': row[3],
+            'stored_at': row[4]
+        }
+
+    def is_fresh(self, entry: Dict) -> bool:
+        return self.ttl is not None and time.time() - entry['stored_at'] < self.ttl
+
+    def store(self, key: str, status: int, headers: Dict[str, str], body: bytes):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(cache_key, status, headers, body, etag, size, stored_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, status, json.dumps(headers), body, headers.get('etag'), len(body), now, now)
+            )
+            self._evict()
+
+    def refresh(self, key: str):
+        """Сервер підтвердив (304), що збережена відповідь актуальна"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, last_access = ? WHERE cache_key = ?",
+                (now, now, key)
+            )
+
+    def _evict(self):
+        """Видаляє найдавніше використані записи, доки кеш не вкладеться в max_bytes"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT cache_key, size FROM responses ORDER BY last_access"
+        ).fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM responses WHERE cache_key = ?", evicted)
+
+    def served_from_cache(self) -> bool:
+        """Чи останній запит у цьому потоці обслужено з кешу без звернення до мережі"""
+        return getattr(self._local, 'from_cache', False)
+
+    def _count(self, name: str):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self) -> Dict:
+        return {'hits': self.hits, 'revalidated': self.revalidated, 'misses': self.misses}
+
+    def fetch(self, url: str, send, headers: Optional[Dict[str, str]] = None):
+        """
+        Повертає (status, headers, body, з_кешу) для GET запиту.
+        send(headers) виконує мережевий запит і повертає (status, headers, body);
+        до заголовків додається If-None-Match, якщо є збережений ETag.
+        """
+        key = cache_key(url)
+        entry = self.lookup(key)
+        self._local.from_cache = False
+
+        if entry and (self.offline or self.is_fresh(entry)):
+            self._local.from_cache = True
+            self._count('hits')
+            return entry['status'], entry['headers'], entry['body'], True
+        if self.offline:
+            self._count('misses')
+            return OFFLINE_MISS_STATUS, {'content-type': 'application/json'}, OFFLINE_MISS_BODY, True
+
+        request_headers = dict(headers or {})
+        if entry and entry['etag']:
+            request_headers['If-None-Match'] = entry['etag']
+
+        status, response_headers, body = send(request_headers)
+        if status == 304 and entry:
+            self._count('revalidated')
+            self.refresh(key)
+            return entry['status'], entry['headers'], entry['body'], True
+
+        self._count('misses')
+        if status == 200:
+            self.store(key, status, response_headers, body)
+        return status, response_headers, body, False
+
+
+class CachedHttplib2:
+    """
+    Обгортка над httplib2.Http для googleapiclient (build(..., http=CachedHttplib2(...))):
+    GET запити до API (і discovery документа) проходять через ResponseCache
+    """
+
+    def __init__(self, http, cache: ResponseCache):
+        self.http = http
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.http, name)
+
+    def request(self, uri, method='GET', body=None, headers=None, **kwargs):
+        import httplib2
+
+        if method != 'GET':
+            return self.http.request(uri, method, body=body, headers=headers, **kwargs)
+
+        def send(request_headers):
+            response, content = self.http.request(uri, method, body=body, headers=request_headers, **kwargs)
+            response_headers = {
+                name: value for name, value in response.items()
+                if name not in ('status', 'content-encoding', '-content-encoding', 'content-length')
+            }
+            return response.status, response_headers, content
+
+        status, response_headers, content, _ = self.cache.fetch(uri, send, headers)
+        response = httplib2.Response(dict(response_headers, status=str(status)))
+        return response, content
+
+
+def add_cache_arguments(parser):
+    """Додає до argparse параметри кешу відповідей (спільні для всіх збирачів)"""
+    parser.add_argument('--cache', default=os.getenv('YOUTUBE_RESPONSE_CACHE'),
+                        help="SQLite файл кешу HTTP відповідей (ключ - URL без API ключа)")
+    parser.add_argument('--cache-ttl', type=float, default=3600,
+                        help="Скільки секунд відповідь вважається свіжою без перевірки ETag")
+    parser.add_argument('--cache-max-mb', type=float, default=512,
+                        help="Максимальний розмір кешу, МБ (найдавніше використані записи витісняються)")
+    parser.add_argument('--offline', action='store_true',
+                        help="Не звертатися до мережі: лише повтор відповідей з кешу")
+
+
+def cache_from_args(args) -> Optional[ResponseCache]:
+    if args.offline and not args.cache:
+        raise ValueError("❌ Офлайн-режим потребує файлу кешу (--cache або YOUTUBE_RESPONSE_CACHE)")
+    if not args.cache:
+        return None
+    return ResponseCache(args.cache, ttl=args.cache_ttl,
+                         max_bytes=int(args.cache_max_mb * 1024 * 1024), offline=args.offline)
@@ -0,0 +1,158 @@
+"""
+Шаблони відгуків і синтетичні корпуси коментарів
+Ті самі шаблони, що й у collect-sample-comments.py, але генератор з власним seed
+дає відтворюваний корпус будь-якого розміру у формі записів YouTubeAPICollector
+(для бенчмарків і перевірок без мережі).
+"""
+
+import base64
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List
+
+# Шаблони відгуків на основі реальних патернів
+TESTIMONIAL_TEMPLATES = [
+    {
+        'text': 'Дякую за {topic}! Завдяки вашим порадам я {achievement}. Це реально працює! 🏍️',
+        'topics': ['урок про гальмування', 'відео про повороти', 'поради щодо безпеки', 'майстер-клас'],
+        'achievements': ['уникнув аварії минулого тижня', 'почуваюся впевненіше на дорозі', 
+                       'навчився правильно входити в повороти', 'подолав страх швидкості']
+    },
+    {
+        'text': 'Найкращий канал про мотобезпеку! {detail} Рекомендую всім {audience} 👍',
+        'details': ['Все пояснюєте простою мовою', 'Показуєте на реальних прикладах',
+                   'Даєте практичні поради', 'Ваші уроки врятували мені життя'],
+        'audiences': ['початківцям', 'мотоциклістам', 'хто хоче їздити безпечно', 'своїм друзям']
+    },
+    {
+        'text': '{timeframe} дивлюся ваш канал і {result}. {emotion}!',
+        'timeframes': ['Вже 3 місяці', 'Півроку тому почав', 'З минулого року', 'Кілька тижнів'],
+        'results': ['моя техніка значно покращилась', 'перестав боятися складних ситуацій',
+                   'навчився передбачати небезпеку', 'став досвідченішим водієм'],
+        'emotions': ['Дуже вдячний', 'Це неймовірно', 'Щиро дякую', 'Ви молодець']
+    },
+    {
+        'text': 'Після вашого відео про {topic} я зрозумів, що {realization}. Тепер {action} 💪',
+        'topics': ['контраварійне водіння', 'правильну посадку', 'вибір екіпіровки', 'погодні умови'],
+        'realizations': ['робив багато помилок', 'недооцінював важливість навчання',
+                       'потрібно постійно вдосконалюватись', 'безпека - це №1'],
+        'actions': ['завжди дотримуюсь ваших порад', 'практикую кожен день',
+                   'ділюся знаннями з друзями', 'їжджу набагато безпечніше']
+    }
+]
+
+# Імена коментаторів
+COMMENTER_NAMES = [
+    'Олександр М.', 'Марія К.', 'Петро В.', 'Анна С.', 'Іван П.',
+    'Оксана Д.', 'Михайло Б.', 'Юлія Т.', 'Андрій Л.', 'Наталія Р.',
+    'Віктор Ч.', 'Світлана Г.', 'Дмитро К.', 'Тетяна М.', 'Сергій О.'
+]
+
+# Назви відео (на основі типових тем)
+VIDEO_TITLES = [
+    'Правильне гальмування на мотоциклі - повний курс',
+    'Контраварійне водіння: 8 принципів безпеки',
+    'Як правильно входити в повороти на мотоциклі',
+    'Помилки початківців, які можуть коштувати життя',
+    'Екстрене гальмування: практичні вправи',
+    'Їзда в дощ: техніка безпеки та поради',
+    'Правильна посадка на мотоциклі',
+    'Як обирати першу екіпіровку',
+    'Психологія безпечного водіння',
+    'Огляд найчастіших причин ДТП з мотоциклістами'
+]
+
+POWER_TESTIMONIALS = [
+    {
+        'author': 'Володимир К.',
+        'text': 'Ваші уроки врятували мені життя! Місяць тому потрапив у критичну ситуацію - вантажівка різко повернула переді мною. Завдяки вашій техніці екстреного гальмування зміг зупинитись за метр до зіткнення. Дружина плакала від щастя, коли я повернувся додому. Дякую вам за те, що робите! 🙏',
+        'video_title': 'Екстрене гальмування: практичні вправи',
+        'date': '2024-01-28',
+        'likes': 342
+    },
+    {
+        'author': 'Катерина П.',
+        'text': 'Після 10 років водіння авто перейшла на мотоцикл. Було страшно! Але ваш систематичний підхід до навчання допоміг подолати всі страхи. За 3 місяці пройшла від повного початківця до впевненого водія. Вчора проїхала 500 км по Карпатах - це було неймовірно! Дякую за вашу працю! ❤️🏍️',
+        'video_title': 'Психологія безпечного водіння',
+        'date': '2024-02-10',
+        'likes': 256
+    },
+    {
+        'author': 'Максим Д.',
+        'text': 'Рік тому розбився через свою самовпевненість. Після відновлення боявся сідати на мотоцикл. Ваші відео допомогли зрозуміти мої помилки і повернути впевненість. Тепер їжджу з дотриманням всіх правил безпеки. Навчаю інших тому, чого навчився у вас. Ви робите світ безпечнішим!',
+        'video_title': 'Контраварійне водіння: 8 принципів безпеки',
+        'date': '2024-01-15',
+        'likes': 489
+    }
+]
+
+# Додаткові фрази: без них шаблони дають лише кілька сотень різних текстів
+SYNTHETIC_TAILS = [
+    '', '', '', ' Дякую!', ' 🔥🔥🔥', ' Підписався.', ' Чекаю наступне відео!',
+    ' Дуже корисно.', ' Ще б про зимову їзду.', ' А як щодо пасажира?', ' 👍👍', ' Респект!'
+]
+
+_BASE_DATE = datetime(2024, 1, 1)
+
+
+def fill_template(template: Dict, rng: random.Random) -> str:
+    """Підставляє у шаблон випадкові значення ({topic} береться зі списку topics і т.д.)"""
+    values = {
+        key[:-1]: rng.choice(options)
+        for key, options in template.items()
+        if key != 'text' and isinstance(options, list)
+    }
+    return template['text'].format(**values)
+
+
+def _youtube_id(rng: random.Random, length: int) -> str:
+    """Випадковий ID з алфавіту YouTube (base64url), по 6 біт на символ"""
+    size = (length * 3 + 3) // 4
+    return base64.urlsafe_b64encode(rng.getrandbits(size * 8).to_bytes(size, 'little')).decode('ascii')[:length]
+
+
+def synthetic_comments(n: int, seed: int = 0, videos: int = 200,
+                       reply_ratio: float = 0.1) -> Iterator[Dict]:
+    """
+    n коментарів у формі записів YouTubeAPICollector (comment_id, author, text,
+    published_at, like_count, video_id, ...); той самий seed - той самий корпус.
+    Частина коментарів - відповіді (parent_id), як при збиранні з --replies.
+    """
+    rng = random.Random(seed)
+    video_ids = [_youtube_id(rng, 11) for _ in range(videos)]
+    thread_id = None
+
+    for i in range(n):
+        video_index = rng.randrange(videos)
+        if rng.random() < 0.02:
+            power = rng.choice(POWER_TESTIMONIALS)
+            text, author = power['text'], power['author']
+        else:
+            text = (fill_template(rng.choice(TESTIMONIAL_TEMPLATES), rng)
+                    + rng.choice(SYNTHETIC_TAILS) + rng.choice(SYNTHETIC_TAILS))
+            author = rng.choice(COMMENTER_NAMES)
+
+        published_at = (_BASE_DATE + timedelta(seconds=rng.randrange(365 * 24 * 3600))).strftime('%Y-%m-%dT%H:%M:%SZ')
+        comment_id = 'Ug' + _youtube_id(rng, 24)
+        comment = {
+            'comment_id': comment_id,
+            'author': author,
+            'author_channel_url': f"http://www.youtube.com/channel/UC{_youtube_id(rng, 22)}",
+            'text': text,
+            'published_at': published_at,
+            'updated_at': published_at,
+            'like_count': int(rng.paretovariate(1.5)) - 1,
+            'video_id': video_ids[video_index],
+            'video_title': VIDEO_TITLES[video_index % len(VIDEO_TITLES)],
+            'video_url': f"https://www.youtube.com/watch?v={video_ids[video_index]}"
+        }
+        if thread_id and rng.random() < reply_ratio:
+            comment['comment_id'] = f"{thread_id}.{_youtube_id(rng, 22)}"
+            comment['parent_id'] = thread_id
+        else:
+            thread_id = comment_id
+        yield comment
+
+
+def synthetic_batch(n: int, seed: int = 0) -> List[Dict]:
+    return list(synthetic_comments(n, seed))
@@ -0,0 +1,284 @@
+"""
+Локальний пошуковий індекс зібраних коментарів (SQLite FTS5)
+Кожен запуск збирача дописує коментарі в одну базу (upsert за comment_id), тож
+повнотекстовий пошук і фільтри працюють по всій історії без читання JSON звітів.
+Текст індексується таблицею FTS5 із зовнішнім вмістом (comments). Її оновлює
+upsert_many одним INSERT ... SELECT на пачку, а не тригер на кожен рядок
+(так наповнення в кілька разів швидше); фільтри спираються на звичайні індекси.
+"""
+
+import os
+import re
+import html
+import json
+import hashlib
+import sqlite3
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .reports import ReportWriter
+from .records import to_json
+
+DEFAULT_INDEX_PATH = 'youtube_comments.sqlite'
+UPSERT_BATCH_SIZE = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS comments (
+    comment_id TEXT PRIMARY KEY,
+    video_id TEXT,
+    video_title TEXT,
+    video_url TEXT,
+    author TEXT,
+    text TEXT,
+    search_text TEXT,
+    published_at TEXT,
+    like_count INTEGER NOT NULL DEFAULT 0,
+    quality_level TEXT,
+    score REAL,
+    occurrences INTEGER NOT NULL DEFAULT 1,
+    duplicate_of TEXT,
+    source TEXT,
+    indexed_at TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS comment_categories (
+    category TEXT NOT NULL,
+    comment_id TEXT NOT NULL,
+    PRIMARY KEY (category, comment_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_comments_video ON comments (video_id);
+CREATE INDEX IF NOT EXISTS idx_comments_quality ON comments (quality_level, like_count);
+CREATE INDEX IF NOT EXISTS idx_comments_likes ON comments (like_count);
+CREATE INDEX IF NOT EXISTS idx_categories_comment ON comment_categories (comment_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS comments_fts USING fts5(
+    search_text, video_title, author,
+    content='comments', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+# Ваги bm25 для колонок search_text, video_title, author
+_RANK = "bm25(comments_fts, 1.0, 0.3, 0.1)"
+SORT_ORDERS = {
+    'rank': f"{_RANK}, c.like_count DESC",
+    'likes': "c.like_count DESC, c.published_at DESC",
+    'date': "c.published_at DESC",
+    'score': "c.score DESC, c.like_count DESC",
+}
+
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def plain_text(text: Optional[str]) -> str:
+    """Текст коментаря без HTML розмітки textDisplay (для індексу і сніпетів)"""
+    return html.unescape(_TAG_RE.sub(' ', text or '')).strip()
+
+
+def content_key(comment: Dict) -> str:
+    """Стабільний хеш вмісту коментаря (відео, автор, текст)"""
+    content = '\x1f'.join(str(comment.get(field) or '') for field in ('video_id', 'video_title', 'author', 'text'))
+    return 'sha1:' + hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def comment_key(comment: Dict) -> str:
+    """comment_id, а для записів без нього (збирач без API) - стабільний хеш вмісту"""
+    return comment.get('comment_id') or content_key(comment)
+
+
+def classification_fields(comment: Dict) -> Tuple[Optional[str], Optional[float], List[str]]:
+    """
+    (рівень якості, оцінка, категорії) з класифікації будь-якого збирача:
+    marketing_classification (API), classification (простий), quality (без API)
+    """
+    if 'marketing_classification' in comment:
+        result = comment['marketing_classification']
+        return result.get('quality_level'), result.get('score'), result.get('categories', [])
+    if 'classification' in comment:
+        result = comment['classification']
+        return result.get('quality'), result.get('score'), result.get('categories', [])
+    if 'quality' in comment:
+        result = comment['quality']
+        return result.get('category'), result.get('score'), []
+    return None, None, []
+
+
+class CommentSearchIndex:
+    """Пошукова база коментарів на SQLite, ключ - comment_id"""
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+            self._migrate()
+            # ID поточної пачки для оновлення FTS одним запитом
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS batch (comment_id TEXT PRIMARY KEY)")
+
+    def _migrate(self):
+        """Додає колонки, яких немає в базах, створених попередніми версіями"""
+        columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(comments)")}
+        if 'duplicate_of' not in columns:
+            self._conn.execute("ALTER TABLE comments ADD COLUMN duplicate_of TEXT")
+
+    def close(self):
+        self._conn.close()
+
+    def _row(self, comment: Dict, source: Optional[str], indexed_at: str) -> Tuple:
+        quality_level, score, _ = classification_fields(comment)
+        return (
+            comment_key(comment), comment.get('video_id'), comment.get('video_title'),
+            comment.get('video_url'), comment.get('author'), comment.get('text'),
+            plain_text(comment.get('text')), comment.get('published_at') or comment.get('date'),
+            comment.get('like_count') or 0, quality_level, score,
+            comment.get('occurrences', 1), comment.get('duplicate_of'), source, indexed_at,
+            json.dumps(comment, ensure_ascii=False, default=to_json)
+        )
+
+    def upsert_many(self, comments: Iterable[Dict], source: Optional[str] = None) -> int:
+        """
+        Додає або оновлює пачку коментарів однією транзакцією (executemany).
+        Повертає кількість записаних.
+        """
+        indexed_at = datetime.now().isoformat()
+        rows = []
+        categories = []
+        for comment in comments:
+            row = self._row(comment, source, indexed_at)
+            rows.append(row)
+            categories.extend((category, row[0]) for category in classification_fields(comment)[2])
+        if not rows:
+            return 0
+
+        with self._conn:
+            self._conn.execute("DELETE FROM batch")
+            self._conn.executemany("INSERT OR IGNORE INTO batch (comment_id) VALUES (?)",
+                                   [(row[0],) for row in rows])
+            # Старі версії оновлюваних коментарів прибираються з FTS до upsert
+            self._conn.execute(
+                "INSERT INTO comments_fts (comments_fts, rowid, search_text, video_title, author) "
+                "SELECT 'delete', c.rowid, c.search_text, c.video_title, c.author "
+                "FROM batch JOIN comments c USING (comment_id)"
+            )
+            self._conn.executemany(
+                "INSERT INTO comments (comment_id, video_id, video_title, video_url, author, text, "
+                "search_text, published_at, like_count, quality_level, score, occurrences, duplicate_of, "
+                "source, indexed_at, payload) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(comment_id) DO UPDATE SET video_title = excluded.video_title, "
+                "text = excluded.text, search_text = excluded.search_text, "
+                "like_count = excluded.like_count, quality_level = excluded.quality_level, "
+                "score = excluded.score, occurrences = excluded.occurrences, "
+                "duplicate_of = excluded.duplicate_of, source = excluded.source, "
+                "indexed_at = excluded.indexed_at, payload = excluded.payload",
+                rows
+            )
+            self._conn.execute(
+                "INSERT INTO comments_fts (rowid, search_text, video_title, author) "
+                "SELECT c.rowid, c.search_text, c.video_title, c.author "
+                "FROM batch JOIN comments c USING (comment_id)"
+            )
+            self._conn.execute(
+                "DELETE FROM comment_categories WHERE comment_id IN (SELECT comment_id FROM batch)"
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO comment_categories (category, comment_id) VALUES (?, ?)",
+                categories
+            )
+        return len(rows)
+
+    def search(self, query: Optional[str] = None, sort: str = 'rank', limit: int = 20,
+               video_id: Optional[str] = None, quality: Optional[str] = None,
+               category: Optional[str] = None, min_likes: Optional[int] = None) -> List[Dict]:
+        """
+        Пошук за синтаксисом FTS5 ("гальмування AND врятував", "гальму*", фрази в лапках)
+        з фільтрами. Без query - лише фільтри (sort='rank' тоді сортує за лайками).
+        """
+        if sort not in SORT_ORDERS:
+            raise ValueError(f"❌ Невідоме сортування {sort}, можливі: {', '.join(SORT_ORDERS)}")
+
+        where = []
+        params = []
+        if query:
+            select_from = "comments_fts JOIN comments c ON c.rowid = comments_fts.rowid"
+            snippet = "snippet(comments_fts, 0, '[', ']', '…', 16)"
+            where.append("comments_fts MATCH ?")
+            params.append(query)
+        else:
+            select_from = "comments c"
+            snippet = "substr(c.search_text, 1, 120)"
+            sort = 'likes' if sort == 'rank' else sort
+        if video_id:
+            where.append("c.video_id = ?")
+            params.append(video_id)
+        if quality:
+            where.append("c.quality_level = ?")
+            params.append(quality)
+        if category:
+            where.append("c.comment_id IN (SELECT comment_id FROM comment_categories WHERE category = ?)")
+            params.append(category)
+        if min_likes:
+            where.append("c.like_count >= ?")
+            params.append(min_likes)
+
+        sql = (f"SELECT c.comment_id, c.video_id, c.video_title, c.video_url, c.author, "
+               f"c.published_at, c.like_count, c.quality_level, c.score, c.occurrences, "
+               f"{snippet} AS snippet FROM {select_from}"
+               + (f" WHERE {' AND '.join(where)}" if where else '')
+               + f" ORDER BY {SORT_ORDERS[sort]} LIMIT ?")
+        params.append(limit)
+        return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def stats(self) -> Dict:
+        """Кількість коментарів, відео та розподіл за рівнем якості"""
+        total, videos = self._conn.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT video_id) FROM comments"
+        ).fetchone()
+        levels = dict(self._conn.execute(
+            "SELECT COALESCE(quality_level, '-'), COUNT(*) FROM comments GROUP BY quality_level"
+        ).fetchall())
+        return {'comments': total, 'videos': videos, 'quality_levels': levels}
+
+    def optimize(self):
+        """Зливає сегменти FTS5 (корисно після великого наповнення)"""
+        with self._conn:
+            self._conn.execute("INSERT INTO comments_fts (comments_fts) VALUES ('optimize')")
+
+
+class SearchIndexWriter(ReportWriter):
+    """Writer для write_reports: дописує коментарі в пошукову базу пачками"""
+
+    def __init__(self, path: str, source: Optional[str] = None, batch_size: int = UPSERT_BATCH_SIZE):
+        self.path = path
+        self.source = source
+        self.batch_size = batch_size
+        self.total = 0
+        self.elapsed = 0.0
+        self._index = CommentSearchIndex(path)
+        self._batch = []
+
+    def _flush(self):
+        started = time.perf_counter()
+        self.total += self._index.upsert_many(self._batch, self.source)
+        self.elapsed += time.perf_counter() - started
+        self._batch = []
+
+    def add(self, comment: Dict):
+        self._batch.append(comment)
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        self._index.close()
+
+
+def add_index_arguments(parser):
+    """Додає до argparse параметр пошукової бази (спільний для всіх збирачів)"""
+    parser.add_argument('--index', nargs='?', const=DEFAULT_INDEX_PATH,
+                        default=os.getenv('YOUTUBE_SEARCH_INDEX'),
+                        help="SQLite база з повнотекстовим індексом, куди дописуються коментарі "
+                             f"(без значення - {DEFAULT_INDEX_PATH})")
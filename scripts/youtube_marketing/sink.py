@@ -0,0 +1,283 @@
+"""
+Потоковий запис коментарів
+JsonlCommentStream дописує кожен класифікований коментар рядком JSONL одразу
+після оцінки, а JsonDocumentWriter/JsonGroupsWriter будують підсумкові JSON файли
+за один прохід по потоку з обмеженою пам'яттю
+"""
+
+import os
+import json
+import shutil
+import tempfile
+from typing import Dict, Iterator, Optional, Tuple
+
+from .records import to_json
+
+
+class JsonlCommentStream:
+    """
+    Заміна списку comments_data, що зберігає коментарі у JSONL файлі.
+    Підтримує append, len та повторну ітерацію (читає файл з диска).
+    resume=True - дописувати в наявний файл (len рахує і коментарі, що вже були в ньому).
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._count = 0
+        if resume and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self._count = sum(1 for line in f if line.strip())
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def append(self, comment: Dict):
+        self._file.write(json.dumps(comment, ensure_ascii=False, default=to_json) + '\n')
+        self._file.flush()
+        self._count += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Dict]:
+        if not self._file.closed:
+            self._file.flush()
+        return read_jsonl(self.path)
+
+    def close(self):
+        self._file.close()
+
+
+def read_jsonl(path: str) -> Iterator[Dict]:
+    """Читає JSONL файл по одному коментарю"""
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class _JsonReader:
+    """
+    Покроковий розбір JSON файлу: у пам'яті лише буфер і поточний елемент.
+    Значення, що не вмістилось у буфер, розбирається ще раз після дочитування.
+    """
+
+    _WHITESPACE = ' \t\r\n'
+    _DELIMITERS = _WHITESPACE + ',:]}'
+
+    def __init__(self, file, chunk_size: int = 1 << 16):
+        self._file = file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+
+    def _fill(self) -> bool:
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Наступний символ після пробілів ('' - кінець файлу)"""
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in self._WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"❌ Очікувався '{char}' у JSON файлі {self._file.name}")
+        self._pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # Число в кінці буфера могло обірватись на межі блоку ('2.' з '2.5')
+            if (end == len(self._buffer) or self._buffer[end] not in self._DELIMITERS) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def array(self) -> Iterator:
+        self.expect('[')
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            separator = self.peek()
+            self._pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f"❌ Пошкоджений масив у JSON файлі {self._file.name}")
+
+
+def iter_json_items(path: str, list_key: str = 'comments') -> Iterator:
+    """
+    Елементи JSON масиву по одному без завантаження всього файлу: список верхнього
+    рівня або поле list_key документа {заголовок..., list_key: [...]}
+    """
+    with open(path, encoding='utf-8') as f:
+        reader = _JsonReader(f)
+        if reader.peek() == '[':
+            yield from reader.array()
+            return
+        reader.expect('{')
+        while reader.peek() not in ('}', ''):
+            key = reader.value()
+            reader.expect(':')
+            if key == list_key:
+                yield from reader.array()
+                return
+            reader.value()
+            if reader.peek() == ',':
+                reader.expect(',')
+
+
+def read_json_header(path: str, list_key: str = 'comments') -> Tuple[Optional[Dict], bool]:
+    """
+    Заголовок JSON документа без завантаження списку: (поля крім list_key, чи є list_key зі
+    списком). Для списку верхнього рівня - (None, True). Елементи списку лише пропускаються.
+    """
+    with open(path, encoding='utf-8') as f:
+        reader = _JsonReader(f)
+        if reader.peek() == '[':
+            return None, True
+        reader.expect('{')
+        header, has_list = {}, False
+        while reader.peek() not in ('}', ''):
+            key = reader.value()
+            reader.expect(':')
+            if key == list_key and reader.peek() == '[':
+                has_list = True
+                for _ in reader.array():
+                    pass
+            else:
+                header[key] = reader.value()
+            if reader.peek() == ',':
+                reader.expect(',')
+        return header, has_list
+
+
+def read_comments(path: str) -> Iterator[Dict]:
+    """Коментарі з JSONL файлу або з JSON звіту ({"comments": [...]} чи список) по одному"""
+    if path.endswith('.jsonl'):
+        yield from read_jsonl(path)
+        return
+    yield from iter_json_items(path)
+
+
+def _dump_item(item, indent: str) -> str:
+    """Серіалізує елемент так само, як json.dump(..., indent=2) на заданій глибині"""
+    text = json.dumps(item, ensure_ascii=False, indent=2, default=to_json)
+    return indent + text.replace('\n', '\n' + indent)
+
+
+class JsonDocumentWriter:
+    """
+    Пише документ {поля заголовка..., list_key: [елементи]} потоково.
+    Елементи складаються у тимчасові файли (окремо для кожної частини, part),
+    а значення заголовка, відомі лише в кінці (лічильники), передаються в close().
+    Результат байт-у-байт збігається з json.dump(..., ensure_ascii=False, indent=2).
+    """
+
+    def __init__(self, path: str, header: Dict, list_key: str = 'comments'):
+        self.path = path
+        self.header = dict(header)
+        self.list_key = list_key
+        self._parts = {}
+
+    def add(self, item, part: int = 0):
+        body = self._parts.get(part)
+        if body is None:
+            body = self._parts[part] = [tempfile.TemporaryFile('w+', encoding='utf-8'), 0]
+        body[0].write((',\n' if body[1] else '') + _dump_item(item, '    '))
+        body[1] += 1
+
+    def close(self, **fields):
+        self.header.update(fields)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write('{\n')
+            for key, value in self.header.items():
+                f.write(f'  {json.dumps(key, ensure_ascii=False)}: '
+                        f'{_dump_item(value, "  ").lstrip()},\n')
+            f.write(f'  {json.dumps(self.list_key, ensure_ascii=False)}: ')
+            _write_list(f, [self._parts[part] for part in sorted(self._parts)], '  ')
+            f.write('\n}')
+
+
+class JsonListWriter:
+    """Пише JSON список верхнього рівня потоково, як json.dump(..., ensure_ascii=False, indent=2)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def add(self, item):
+        self._file.write((',\n' if self.count else '[\n') + _dump_item(item, '  '))
+        self.count += 1
+
+    def close(self):
+        self._file.write('\n]' if self.count else '[]')
+        self._file.close()
+
+
+class JsonGroupsWriter:
+    """Пише словник {група: [елементи]} потоково, групи - в порядку першої появи"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._groups = {}
+
+    def add(self, group: str, item):
+        body = self._groups.get(group)
+        if body is None:
+            body = self._groups[group] = [tempfile.TemporaryFile('w+', encoding='utf-8'), 0]
+        body[0].write((',\n' if body[1] else '') + _dump_item(item, '    '))
+        body[1] += 1
+
+    def close(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            if not self._groups:
+                f.write('{}')
+                return
+            f.write('{\n')
+            for i, (group, body) in enumerate(self._groups.items()):
+                f.write(('' if i == 0 else ',\n') + f'  {json.dumps(group, ensure_ascii=False)}: ')
+                _write_list(f, [body], '  ')
+            f.write('\n}')
+
+
+def _write_list(f, bodies, indent: str):
+    """Копіює тимчасові частини списку у файл і закриває їх"""
+    bodies = [body for body in bodies if body[1]]
+    if not bodies:
+        f.write('[]')
+        return
+
+    f.write('[\n')
+    for i, (body, _) in enumerate(bodies):
+        if i:
+            f.write(',\n')
+        body.seek(0)
+        shutil.copyfileobj(body, f)
+        body.close()
+    f.write('\n' + indent + ']')
+
+
+def open_comments_store(stream_path: Optional[str]):
+    """Повертає JSONL потік, якщо задано шлях, інакше звичайний список у пам'яті"""
+    return JsonlCommentStream(stream_path) if stream_path else []
@@ -0,0 +1,239 @@
+"""
+Різниця між двома знімками збору (JSON звіти або JSONL потоки)
+Обидва знімки впорядковуються за ключем коментаря зовнішнім сортуванням (відсортовані
+частини у тимчасових JSONL файлах і heapq.merge), а потім проходяться разом одним
+лінійним злиттям: нові, видалені й відредаговані коментарі, зміни лайків і рівня якості.
+Якщо хоч в одному знімку є коментарі без comment_id (старі збори без API), обидва
+зіставляються за хешем вмісту, інакше всі коментарі виглядали б видаленими й новими.
+У пам'яті - лише одна частина сортування і топ-N для Markdown підсумку.
+"""
+
+import os
+import json
+import heapq
+import tempfile
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .records import to_json
+from .reports import TopN
+from .search_index import classification_fields, comment_key, content_key
+from .sink import read_comments, read_jsonl
+
+# Коментарів в одній відсортованій частині (у пам'яті під час сортування)
+DEFAULT_RUN_SIZE = 100000
+DEFAULT_TOP_N = 10
+# Порядок рівнів якості всіх класифікаторів (для підвищень і понижень)
+QUALITY_RANK = {'low': 0, 'normal': 1, 'moderate': 1, 'good': 2, 'excellent': 3}
+
+
+def _write_run(items: List[Tuple[str, Dict]], directory: str) -> str:
+    items.sort(key=lambda item: item[0])
+    fd, path = tempfile.mkstemp(suffix='.jsonl', dir=directory)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        for key, comment in items:
+            f.write(json.dumps({'key': key, 'comment': comment}, ensure_ascii=False, default=to_json) + '\n')
+    return path
+
+
+def _read_run(path: str) -> Iterator[Tuple[str, Dict]]:
+    for item in read_jsonl(path):
+        yield item['key'], item['comment']
+
+
+def has_comment_ids(path: str) -> bool:
+    """Чи всі коментарі знімка мають comment_id (читання зупиняється на першому без нього)"""
+    return all(comment.get('comment_id') for comment in read_comments(path))
+
+
+def sorted_by_key(comments: Iterable[Dict], directory: str, run_size: int = DEFAULT_RUN_SIZE,
+                  key: Callable[[Dict], str] = comment_key) -> Iterator[Tuple[str, Dict]]:
+    """
+    (ключ, коментар) у порядку key; повторні ключі лишаються один раз (перший у файлі).
+    Частини по run_size сортуються в пам'яті й пишуться в directory; знімок, що вміщується
+    в одну частину, сортується без тимчасових файлів.
+    """
+    runs = []
+    items = []
+    for comment in comments:
+        items.append((key(comment), comment))
+        if len(items) >= run_size:
+            runs.append(_write_run(items, directory))
+            items = []
+
+    if runs:
+        if items:
+            runs.append(_write_run(items, directory))
+        items = []
+        # heapq.merge стабільний: з однаковими ключами першим іде елемент попередньої частини
+        merged = heapq.merge(*(_read_run(path) for path in runs), key=lambda item: item[0])
+    else:
+        items.sort(key=lambda item: item[0])
+        merged = iter(items)
+
+    try:
+        previous = None
+        for key, comment in merged:
+            if key != previous:
+                yield key, comment
+                previous = key
+    finally:
+        for path in runs:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def _quality(comment: Dict) -> Optional[str]:
+    return classification_fields(comment)[0]
+
+
+def compare(key: str, old: Optional[Dict], new: Optional[Dict]) -> Optional[Dict]:
+    """Зміна коментаря між знімками (None - без змін)"""
+    comment = new if new is not None else old
+    change = {
+        'key': key,
+        'status': 'new' if old is None else 'removed' if new is None else 'changed',
+        'author': comment.get('author'),
+        'video_title': comment.get('video_title'),
+        'text': comment.get('text'),
+        'likes_before': (old.get('like_count') or 0) if old is not None else None,
+        'likes_after': (new.get('like_count') or 0) if new is not None else None,
+        'quality_before': _quality(old) if old is not None else None,
+        'quality_after': _quality(new) if new is not None else None,
+        'text_changed': False
+    }
+    if old is not None and new is not None:
+        change['text_changed'] = old.get('text') != new.get('text')
+        if (not change['text_changed'] and change['likes_before'] == change['likes_after']
+                and change['quality_before'] == change['quality_after']):
+            return None
+    change['like_delta'] = (change['likes_after'] or 0) - (change['likes_before'] or 0)
+    return change
+
+
+def merge_join(old: Iterator[Tuple[str, Dict]], new: Iterator[Tuple[str, Dict]]) -> Iterator[Optional[Dict]]:
+    """
+    Злиття двох відсортованих за ключем потоків: зміна для кожного ключа
+    (None - коментар є в обох знімках без змін, щоб рахувати й незмінені)
+    """
+    old_item, new_item = next(old, None), next(new, None)
+    while old_item is not None or new_item is not None:
+        if new_item is None or (old_item is not None and old_item[0] < new_item[0]):
+            yield compare(old_item[0], old_item[1], None)
+            old_item = next(old, None)
+        elif old_item is None or new_item[0] < old_item[0]:
+            yield compare(new_item[0], None, new_item[1])
+            new_item = next(new, None)
+        else:
+            yield compare(new_item[0], old_item[1], new_item[1])
+            old_item, new_item = next(old, None), next(new, None)
+
+
+def diff_snapshots(old_path: str, new_path: str, directory: Optional[str] = None,
+                   run_size: int = DEFAULT_RUN_SIZE,
+                   by_content: Optional[bool] = None) -> Iterator[Optional[Dict]]:
+    """
+    Зміни між двома знімками (шляхи до JSON звітів або JSONL); тимчасові файли - в directory.
+    by_content - зіставляти обидва знімки за хешем вмісту (None - якщо в одному з них
+    немає comment_id); тоді відредагований текст - це видалений і новий коментар.
+    """
+    if by_content is None:
+        by_content = not (has_comment_ids(old_path) and has_comment_ids(new_path))
+    key = content_key if by_content else comment_key
+    with tempfile.TemporaryDirectory(dir=directory, prefix='youtube-diff-') as tmp_dir:
+        yield from merge_join(sorted_by_key(read_comments(old_path), tmp_dir, run_size, key),
+                              sorted_by_key(read_comments(new_path), tmp_dir, run_size, key))
+
+
+class DeltaSummary:
+    """Лічильники змін і топ-N для Markdown (пам'ять не залежить від розміру знімків)"""
+
+    def __init__(self, n: int = DEFAULT_TOP_N):
+        self.counts = {'new': 0, 'removed': 0, 'edited': 0, 'likes_changed': 0,
+                       'upgraded': 0, 'downgraded': 0, 'unchanged': 0}
+        self.transitions = {}
+        self.like_delta = 0
+        self.top_new = TopN(n, key=lambda change: change['likes_after'])
+        self.top_gains = TopN(n, key=lambda change: change['like_delta'])
+        self.top_upgrades = TopN(n, key=lambda change: (
+            QUALITY_RANK.get(change['quality_after'], -1) - QUALITY_RANK.get(change['quality_before'], -1),
+            change['likes_after']
+        ))
+        self.top_removed = TopN(n, key=lambda change: change['likes_before'])
+
+    def add(self, change: Optional[Dict]):
+        if change is None:
+            self.counts['unchanged'] += 1
+            return
+        status = change['status']
+        if status == 'new':
+            self.counts['new'] += 1
+            self.top_new.add(change)
+            return
+        if status == 'removed':
+            self.counts['removed'] += 1
+            self.top_removed.add(change)
+            return
+
+        self.like_delta += change['like_delta']
+        if change['text_changed']:
+            self.counts['edited'] += 1
+        if change['like_delta']:
+            self.counts['likes_changed'] += 1
+            if change['like_delta'] > 0:
+                self.top_gains.add(change)
+        before, after = change['quality_before'], change['quality_after']
+        if before != after:
+            transition = (before or '-', after or '-')
+            self.transitions[transition] = self.transitions.get(transition, 0) + 1
+            if QUALITY_RANK.get(after, -1) > QUALITY_RANK.get(before, -1):
+                self.counts['upgraded'] += 1
+                self.top_upgrades.add(change)
+            else:
+                self.counts['downgraded'] += 1
+
+    def markdown(self, old_path: str, new_path: str) -> str:
+        counts = self.counts
+        lines = [
+            "# YouTube Comments Delta\n",
+            f"Old snapshot: `{old_path}`  ",
+            f"New snapshot: `{new_path}`\n",
+            "| Change | Comments |",
+            "|---|---|",
+            f"| New | {counts['new']} |",
+            f"| Removed | {counts['removed']} |",
+            f"| Edited | {counts['edited']} |",
+            f"| Likes changed | {counts['likes_changed']} |",
+            f"| Quality upgraded | {counts['upgraded']} |",
+            f"| Quality downgraded | {counts['downgraded']} |",
+            f"| Unchanged | {counts['unchanged']} |",
+            f"\nNet like change (comments in both snapshots): {self.like_delta:+d}\n"
+        ]
+        if self.transitions:
+            lines.append("## Quality Level Changes\n")
+            for (before, after), count in sorted(self.transitions.items(), key=lambda item: -item[1]):
+                lines.append(f"- {before} → {after}: {count}")
+            lines.append("")
+
+        sections = [
+            ("## 🆕 Top New Comments", self.top_new,
+             lambda change: f"*Likes: {change['likes_after']}* · *Quality: {change['quality_after'] or '-'}*"),
+            ("## 📈 Top Like Gains", self.top_gains,
+             lambda change: f"*Likes: {change['likes_before']} → {change['likes_after']} "
+                            f"({change['like_delta']:+d})*"),
+            ("## ⭐ Top Quality Upgrades", self.top_upgrades,
+             lambda change: f"*Quality: {change['quality_before'] or '-'} → {change['quality_after']}* · "
+                            f"*Likes: {change['likes_after']}*"),
+            ("## 🗑️ Top Removed Comments", self.top_removed,
+             lambda change: f"*Likes: {change['likes_before']}*"),
+        ]
+        for title, top, details in sections:
+            changes = top.items()
+            if not changes:
+                continue
+            lines.append(f"{title}\n")
+            for i, change in enumerate(changes, 1):
+                lines.append(f"### {i}. {change['author']}")
+                lines.append(f"*Video: {change['video_title']}*  ")
+                lines.append(details(change))
+                lines.append(f"\n> {(change['text'] or '')[:300]}\n")
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,39 @@
+"""
+Накопичувальні сховища коментарів, спільні для всіх збирачів:
+пошукова база (SQLite FTS), база сайту (YouTubeComment) і колонковий корпус.
+Кожне отримує ті самі коментарі, що й повні звіти, через окремий writer.
+"""
+
+from typing import Dict, Optional
+
+from .app_database import AppDatabaseWriter
+from .corpus_store import CorpusStoreWriter
+from .reports import ReportWriter
+from .search_index import SearchIndexWriter
+
+
+def storage_writers(source: str, search_index: Optional[str] = None, app_database: Optional[str] = None,
+                    corpus_dir: Optional[str] = None, corpus_format: str = 'parquet') -> Dict[str, ReportWriter]:
+    """Writer-и заданих сховищ; source - збирач ('api', 'simple', 'scraper')"""
+    storage = {}
+    if search_index:
+        storage['index'] = SearchIndexWriter(search_index, source=source)
+    if app_database:
+        storage['app_database'] = AppDatabaseWriter(app_database, source=source)
+    if corpus_dir:
+        storage['corpus'] = CorpusStoreWriter(corpus_dir, corpus_format, source=source)
+    return storage
+
+
+def print_storage(storage: Dict[str, ReportWriter], indent: str = '   '):
+    """Підсумок запису в сховища: кількість коментарів і час"""
+    if 'index' in storage:
+        writer = storage['index']
+        print(f"{indent}🔎 Пошукова база: {writer.path} ({writer.total} коментарів за {writer.elapsed:.2f} с)")
+    if 'app_database' in storage:
+        writer = storage['app_database']
+        print(f"{indent}🗄️  База сайту: {writer.total} коментарів за {writer.elapsed:.2f} с")
+    if 'corpus' in storage:
+        writer = storage['corpus']
+        print(f"{indent}🧱 Корпус ({writer.format}): {writer.path} ({writer.total} коментарів "
+              f"за {writer.elapsed:.2f} с)")
@@ -0,0 +1,220 @@
+"""
+Адаптивний розклад опитування відео для режиму спостереження (--watch)
+Кожне відео має власний інтервал: нові відео й відео з частими коментарями
+перевіряються кожні кілька хвилин, старі й неактивні - рідко. Інтервал
+підлаштовується під спостережувану швидкість коментарів (commentCount з videos.list),
+а BudgetPacer розподіляє денний бюджет квоти рівномірно на всю добу.
+"""
+
+import os
+import json
+import math
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .metadata import VIDEOS_BATCH_SIZE
+from .quota import quota_day_progress
+
+DEFAULT_WATCH_STATE = 'youtube_watch_state.json'
+DEFAULT_WATCH_CHECKPOINT = 'youtube_watch.db'
+DEFAULT_WATCH_STREAM = 'youtube_watch.jsonl'
+DEFAULT_MIN_INTERVAL = 300
+DEFAULT_MAX_INTERVAL = 86400
+DEFAULT_PLAYLIST_REFRESH = 3600
+# Скільки нових коментарів в середньому має накопичитись між перевірками активного відео
+TARGET_NEW_COMMENTS = 3
+# Вік, за який інтервал нового відео подвоюється (у годинах)
+FRESH_HOURS = 24
+# Вага останнього спостереження в ковзному середньому швидкості
+RATE_SMOOTHING = 0.5
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def check_cost(videos: int) -> int:
+    """Одиниці квоти на перевірку commentCount для videos відео (videos.list по 50)"""
+    return math.ceil(videos / VIDEOS_BATCH_SIZE)
+
+
+class WatchSchedule:
+    """
+    Розклад опитування: запис на кожне відео плейлиста з інтервалом, часом
+    наступної перевірки і швидкістю коментарів (rate, коментарів на годину).
+    Зберігається в JSON файлі (path), тож перезапуск продовжує з того ж розкладу.
+    """
+
+    def __init__(self, path: Optional[str] = DEFAULT_WATCH_STATE,
+                 min_interval: float = DEFAULT_MIN_INTERVAL,
+                 max_interval: float = DEFAULT_MAX_INTERVAL,
+                 target_comments: float = TARGET_NEW_COMMENTS):
+        self.path = path
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.target_comments = target_comments
+        self.videos: Dict[str, Dict] = {}
+        self.playlist_refreshed_at = None
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+            self.videos = state.get('videos', {})
+            self.playlist_refreshed_at = state.get('playlist_refreshed_at')
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'playlist_refreshed_at': self.playlist_refreshed_at, 'videos': self.videos},
+                      f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _clamp(self, interval: float) -> float:
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def age_interval(self, published_at: Optional[str], now: float) -> float:
+        """Найдовший інтервал за віком відео: мінімальний для нового, подвоюється кожні FRESH_HOURS"""
+        published = _timestamp(published_at)
+        if published is None:
+            return self.max_interval
+        age_hours = max(0.0, now - published) / 3600
+        return self._clamp(self.min_interval * 2 ** min(age_hours / FRESH_HOURS, 64))
+
+    def update_playlist(self, videos: List[Dict], now: float) -> int:
+        """
+        Синхронізує розклад з плейлистом: нові відео перевіряються одразу,
+        видалені з плейлиста - більше не опитуються. Повертає кількість нових відео.
+        """
+        current = {}
+        added = 0
+        for video in videos:
+            entry = self.videos.get(video['video_id'])
+            if entry is None:
+                entry = {
+                    'video_id': video['video_id'],
+                    'title': video['title'],
+                    'published_at': video.get('published_at'),
+                    'comment_count': None,
+                    'rate': 0.0,
+                    'interval': self.age_interval(video.get('published_at'), now),
+                    'next_poll': now,
+                    'checked_at': None
+                }
+                added += 1
+            else:
+                entry['title'] = video['title'] or entry['title']
+            current[video['video_id']] = entry
+        self.videos = current
+        self.playlist_refreshed_at = now
+        return added
+
+    def playlist_due(self, now: float, refresh_interval: float) -> bool:
+        return self.playlist_refreshed_at is None or now - self.playlist_refreshed_at >= refresh_interval
+
+    def due(self, now: float) -> List[Dict]:
+        """Відео, час перевірки яких настав: спершу найшвидші, далі - найдовше прострочені"""
+        return sorted((entry for entry in self.videos.values() if entry['next_poll'] <= now),
+                      key=lambda entry: (-entry['rate'], entry['next_poll']))
+
+    def next_poll(self) -> Optional[float]:
+        return min((entry['next_poll'] for entry in self.videos.values()), default=None)
+
+    def observe(self, video_id: str, comment_count: Optional[int], now: float) -> Optional[int]:
+        """
+        Записує результат перевірки (commentCount) і планує наступну.
+        Швидкість - ковзне середнє приросту коментарів за годину; інтервал такий,
+        щоб між перевірками накопичувалось target_comments нових, але не довший
+        за вікове обмеження, а без приросту подвоюється. Повертає приріст (None - перша перевірка).
+        """
+        entry = self.videos[video_id]
+        previous, checked_at = entry['comment_count'], entry['checked_at']
+        delta = None
+        if comment_count is not None and previous is not None and checked_at is not None:
+            delta = max(0, comment_count - previous)
+            hours = max(now - checked_at, 1.0) / 3600
+            entry['rate'] = RATE_SMOOTHING * (delta / hours) + (1 - RATE_SMOOTHING) * entry['rate']
+
+        if entry['rate'] > 0.01:
+            interval = self.target_comments / entry['rate'] * 3600
+        else:
+            interval = entry['interval'] * 2
+        interval = self._clamp(min(interval, self.age_interval(entry['published_at'], now)))
+
+        entry.update(comment_count=comment_count, checked_at=now, interval=interval,
+                     next_poll=now + interval)
+        return delta
+
+    def postpone(self, video_id: str, now: float):
+        """Відео з новими коментарями, на які не вистачило бюджету, - до наступного циклу"""
+        entry = self.videos[video_id]
+        entry['next_poll'] = now + self.min_interval
+
+    def stats(self) -> Dict:
+        intervals = sorted(entry['interval'] for entry in self.videos.values())
+        return {
+            'videos': len(intervals),
+            'active': sum(1 for entry in self.videos.values() if entry['rate'] > 0.01),
+            'min_interval': intervals[0] if intervals else None,
+            'median_interval': intervals[len(intervals) // 2] if intervals else None
+        }
+
+
+class BudgetPacer:
+    """
+    Рівномірна витрата денного бюджету квоти: до моменту t доби доступно
+    daily_budget * t (+ burst - частка бюджету на сплески), мінус уже витрачене
+    (в тому числі іншими запусками зі спільним --quota-usage).
+    """
+
+    def __init__(self, quota, burst: float = 0.02):
+        self.quota = quota
+        self.burst = burst
+
+    def available(self) -> int:
+        allowance = self.quota.daily_budget * min(1.0, quota_day_progress() + self.burst)
+        return int(allowance - self.quota.refresh_usage())
+
+    def wait_seconds(self, units: int) -> float:
+        """Через скільки секунд стане доступно units одиниць"""
+        missing = units - self.available()
+        if missing <= 0:
+            return 0.0
+        return missing / self.quota.daily_budget * 86400
+
+
+def sleep_seconds(schedule: WatchSchedule, pacer: BudgetPacer, playlist_refresh: float, now: float) -> float:
+    """Пауза до наступного циклу: найближча перевірка відео чи плейлиста, але не раніше, ніж з'явиться бюджет"""
+    wake = [now + schedule.max_interval]
+    next_poll = schedule.next_poll()
+    if next_poll is not None:
+        wake.append(next_poll)
+    if schedule.playlist_refreshed_at is not None:
+        wake.append(schedule.playlist_refreshed_at + playlist_refresh)
+    delay = max(1.0, min(wake) - now)
+    # До кінця доби квоти бюджет може не накопичитись - тоді чекаємо на її скидання
+    until_reset = (1 - quota_day_progress()) * 86400 + 1
+    return max(delay, min(pacer.wait_seconds(1), until_reset))
+
+
+def add_watch_arguments(parser):
+    """Додає до argparse параметри режиму спостереження"""
+    parser.add_argument('--watch', action='store_true',
+                        help="Працювати постійно: опитувати відео за адаптивним розкладом у межах денної квоти")
+    parser.add_argument('--watch-state', default=os.getenv('YOUTUBE_WATCH_STATE') or DEFAULT_WATCH_STATE,
+                        help="JSON файл розкладу спостереження (інтервали і швидкості відео)")
+    parser.add_argument('--min-interval', type=float, default=DEFAULT_MIN_INTERVAL,
+                        help="Найкоротший інтервал перевірки відео, с")
+    parser.add_argument('--max-interval', type=float, default=DEFAULT_MAX_INTERVAL,
+                        help="Найдовший інтервал перевірки відео, с")
+    parser.add_argument('--playlist-refresh', type=float, default=DEFAULT_PLAYLIST_REFRESH,
+                        help="Як часто перевіряти плейлист на нові відео, с")
+    parser.add_argument('--watch-burst', type=float, default=0.02,
+                        help="Частка денної квоти, яку можна витратити наперед (сплески)")
+    parser.add_argument('--watch-cycles', type=int, default=0,
+                        help="Зупинитись після стількох циклів (0 - працювати до Ctrl+C)")